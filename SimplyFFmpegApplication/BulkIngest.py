@@ -0,0 +1,151 @@
+from SimplyFFmpegApplication.CommonHelpers import derive_output_path, print_error, print_log
+from SimplyFFmpegApplication.Jobs import Job
+from SimplyFFmpegApplication.MediaProbe import MediaInfo, MediaProber, get_media_prober
+from SimplyFFmpegApplication.WatchFolder import partial_file_suffixes
+
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterator
+
+
+# Files inside dropped directories are only probed if they carry one of these
+media_extensions: tuple[str, ...] = (
+    ".3gp", ".aac", ".aif", ".aiff", ".ape", ".asf", ".avi", ".flac", ".flv", ".gif", ".m2ts", ".m4a", ".m4v",
+    ".mka", ".mkv", ".mov", ".mp2", ".mp3", ".mp4", ".mpeg", ".mpg", ".mts", ".mxf", ".ogg", ".ogv", ".opus",
+    ".ts", ".vob", ".wav", ".webm", ".wma", ".wmv",
+)
+
+
+def iter_media_files(paths: list[str], extensions: tuple[str, ...] = media_extensions) -> Iterator[tuple[str, bool]]:
+    """
+    Lazily yields (file path, named explicitly) for every file in `paths`,
+    descending into directories one scandir at a time, so huge trees are never
+    listed up front. Files named explicitly are yielded whatever their
+    extension, the probe decides; files found in directories must match
+    `extensions`. Hidden and partially downloaded files are skipped.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield (path, True)
+            continue
+        pending_directories: list[str] = [path]
+        while pending_directories:
+            directory: str = pending_directories.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    sub_directories: list[str] = []
+                    for entry in entries:
+                        lowered: str = entry.name.lower()
+                        if entry.name.startswith("."):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            sub_directories.append(entry.path)
+                        elif entry.is_file() and lowered.endswith(extensions) and not lowered.endswith(partial_file_suffixes):
+                            yield (entry.path, False)
+            except OSError as error:
+                print_error(f"Cannot list {directory}: {error}")
+                continue
+            # Popped from the end, so directories are visited in listing order
+            pending_directories.extend(reversed(sub_directories))
+
+
+class BulkIngestResult:
+    def __init__(self) -> None:
+        self.accepted: int = 0
+        self.skipped: int = 0
+        self.failures: list[str] = []
+        self.cancelled: bool = False
+        self.elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        text: str = f"Queued {self.accepted} file(s), skipped {self.skipped} non-media file(s)"
+        if self.failures:
+            text += f", {len(self.failures)} failed:\n" + "\n".join(f"    {failure}" for failure in self.failures)
+        if self.cancelled:
+            text += " (cancelled)"
+        return f"{text} in {self.elapsed:.1f}s"
+
+
+class BulkIngester:
+    """
+    Turns dropped files and directory trees into jobs. The tree is walked
+    lazily while a bounded pool probes the files in parallel; at most
+    `max_pending` probes are in flight, so memory stays flat whatever the
+    number of files. Every file with an audio or video stream is handed to
+    `make_job` with its own output path, derived like a single input's.
+    """
+    def __init__(
+        self, make_job: Callable[[str, str, MediaInfo], Job], output_directory: str, extension: str,
+        worker_count: int = 4, max_pending: int = 64, extensions: tuple[str, ...] = media_extensions,
+        prober: MediaProber | None = None, report: Callable[[str], None] = print_log
+    ) -> None:
+        self.__make_job__: Callable[[str, str, MediaInfo], Job] = make_job
+        self.__output_directory__: str = output_directory
+        self.__extension__: str = extension
+        self.__worker_count__: int = max(1, worker_count)
+        self.__max_pending__: int = max(self.__worker_count__, max_pending)
+        self.__extensions__: tuple[str, ...] = extensions
+        self.__prober__: MediaProber = prober or get_media_prober()
+        self.__report__: Callable[[str], None] = report
+        # Output paths handed out in this run, two inputs never share one
+        self.__claimed_outputs__: set[str] = set()
+
+    def __outputPath__(self, input_file: str) -> str:
+        output_file: str = derive_output_path(input_file, self.__output_directory__, self.__extension__)
+        base, extension = os.path.splitext(output_file)
+        idx: int = 2
+        while os.path.normcase(output_file) in self.__claimed_outputs__:
+            output_file = f"{base}_{idx}{extension}"
+            idx += 1
+        self.__claimed_outputs__.add(os.path.normcase(output_file))
+        return output_file
+
+    def run(self, paths: list[str], on_job: Callable[[Job], None], stop_event: threading.Event | None = None) -> BulkIngestResult:
+        result: BulkIngestResult = BulkIngestResult()
+        started_at: float = time.monotonic()
+        last_report: float = 0.0
+
+        def accept(input_file: str, explicit: bool, info: MediaInfo | None) -> None:
+            if info is None or not (info.hasVideo() or info.hasAudio()):
+                # Dropped on purpose, so worth a message; found in a folder, just skipped
+                if explicit:
+                    result.failures.append(f"{input_file}: not a readable media file")
+                else:
+                    result.skipped += 1
+                return
+            try:
+                on_job(self.__make_job__(input_file, self.__outputPath__(input_file), info))
+            except Exception as error:
+                result.failures.append(f"{input_file}: {error}")
+                return
+            result.accepted += 1
+
+        ##### Walk and probe concurrently, never more than max_pending files ahead
+        pending: dict[Future[MediaInfo | None], tuple[str, bool]] = {}
+        probed_count: int = 0
+        with ThreadPoolExecutor(max_workers=self.__worker_count__, thread_name_prefix="ingest") as executor:
+            for input_file, explicit in iter_media_files(paths, self.__extensions__):
+                if stop_event is not None and stop_event.is_set():
+                    result.cancelled = True
+                    break
+                pending[executor.submit(self.__prober__.probe, input_file)] = (input_file, explicit)
+                if len(pending) < self.__max_pending__:
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    accept(*pending.pop(future), future.result())
+                    probed_count += 1
+                if time.monotonic() - last_report >= 0.2:
+                    last_report = time.monotonic()
+                    self.__report__(f"Probed {probed_count} file(s), queued {result.accepted}")
+            for future, (input_file, explicit) in pending.items():
+                if result.cancelled:
+                    future.cancel()
+                else:
+                    accept(input_file, explicit, future.result())
+
+        result.elapsed = time.monotonic() - started_at
+        return result
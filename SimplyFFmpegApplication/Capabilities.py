@@ -0,0 +1,227 @@
+from SimplyFFmpegApplication.CommonHelpers import get_cache_directory, print_error
+from SimplyFFmpegApplication.PersistentCache import PersistentCache
+
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from typing import Any
+
+
+# Options whose values name an encoder or a filter graph
+codec_flags: tuple[str, ...] = ("-c", "-codec", "-c:v", "-c:a", "-c:s", "-vcodec", "-acodec", "-scodec")
+filter_flags: tuple[str, ...] = ("-vf", "-af", "-filter:v", "-filter:a", "-filter_complex", "-lavfi")
+
+codec_line_pattern: re.Pattern[str] = re.compile(r"^\s*[A-Z.]{6}\s+(\S+)")
+muxer_line_pattern: re.Pattern[str] = re.compile(r"^\s*[DEd.]{1,3}\s+(?:d\s+)?(\S+)")
+filter_line_pattern: re.Pattern[str] = re.compile(r"^\s*[A-Z.|]{2,3}\s+(\w+)\s+\S*->\S*")
+encoder_codec_pattern: re.Pattern[str] = re.compile(r"\(codec (\w+)\)\s*$")
+filter_name_pattern: re.Pattern[str] = re.compile(r"^\s*(?:\[[^\]]*\]\s*)*(\w+)")
+
+
+def split_filter_graph(graph: str) -> list[str]:
+    """
+    Splits a filter graph into single filters on "," and ";", leaving quoted
+    and backslash-escaped separators alone, e.g. scale='min(480,iw)':-1.
+    """
+    filters: list[str] = []
+    current: list[str] = []
+    quoted: bool = False
+    escaped: bool = False
+    for character in graph:
+        if escaped:
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif character == "'":
+            quoted = not quoted
+        elif character in ",;" and not quoted:
+            filters.append("".join(current))
+            current = []
+            continue
+        current.append(character)
+    filters.append("".join(current))
+    return [item for item in filters if item.strip()]
+
+
+def parse_listing(text: str, pattern: re.Pattern[str], after_separator: bool) -> list[str]:
+    # Listings start with a legend; codecs and muxers end it with a " ---" line
+    names: list[str] = []
+    in_body: bool = not after_separator
+    for line in text.splitlines():
+        if not in_body:
+            in_body = line.strip().startswith("--")
+            continue
+        match: re.Match[str] | None = pattern.match(line)
+        if match:
+            names.extend(name for name in match.group(1).split(",") if name)
+    return names
+
+
+class FFmpegCapabilities:
+    """
+    What one FFmpeg binary supports, as listed by -encoders, -decoders,
+    -filters, -hwaccels and -muxers.
+    """
+    def __init__(self, ffmpeg_path: str, data: dict[str, Any]) -> None:
+        self.__ffmpeg_path__: str = ffmpeg_path
+        self.__version__: str = str(data.get("version", ""))
+        # "-c:v h264" picks an encoder for the codec, so codec names count too
+        self.__encoders__: set[str] = set(data.get("encoders", [])) | set(data.get("encoder_codecs", []))
+        self.__decoders__: set[str] = set(data.get("decoders", []))
+        self.__filters__: set[str] = set(data.get("filters", []))
+        self.__hwaccels__: set[str] = set(data.get("hwaccels", []))
+        self.__muxers__: set[str] = set(data.get("muxers", []))
+        # hwaccel -> whether its device could be opened; checked once per session
+        self.__usable_hwaccels__: dict[str, bool] = {}
+        self.__lock__: threading.Lock = threading.Lock()
+
+    def getVersion(self) -> str:
+        return self.__version__
+    def getHwAccels(self) -> list[str]:
+        return sorted(self.__hwaccels__)
+
+    def hasEncoder(self, name: str) -> bool:
+        return name in self.__encoders__
+    def hasDecoder(self, name: str) -> bool:
+        return name in self.__decoders__
+    def hasFilter(self, name: str) -> bool:
+        return name in self.__filters__
+    def hasMuxer(self, name: str) -> bool:
+        return name in self.__muxers__
+    def hasHwAccel(self, name: str) -> bool:
+        return name == "auto" or name in self.__hwaccels__
+
+    def isHwAccelUsable(self, name: str) -> bool:
+        """
+        A listed hwaccel can still lack a device or driver at runtime, so the
+        device is opened once with a tiny null encode before relying on it.
+        """
+        if name == "auto":
+            return True
+        if not self.hasHwAccel(name):
+            return False
+        with self.__lock__:
+            if name in self.__usable_hwaccels__:
+                return self.__usable_hwaccels__[name]
+        arguments: list[str] = [
+            self.__ffmpeg_path__, "-hide_banner", "-v", "error",
+            "-init_hw_device", name,
+            "-f", "lavfi", "-i", "nullsrc=s=64x64:d=0.04",
+            "-f", "null", "-"
+        ]
+        try:
+            usable: bool = subprocess.run(arguments, capture_output=True, timeout=30).returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            usable = False
+        with self.__lock__:
+            self.__usable_hwaccels__[name] = usable
+        return usable
+
+    def validateArguments(self, arguments: list[str]) -> list[str]:
+        """
+        Returns a message for every encoder, filter, hwaccel or muxer in the
+        arguments that this FFmpeg build does not provide.
+        """
+        problems: list[str] = []
+        last_input: int = max((idx for idx, argument in enumerate(arguments) if argument == "-i"), default=-1)
+        for idx, (flag, value) in enumerate(zip(arguments, arguments[1:])):
+            if flag in codec_flags and value != "copy" and not self.hasEncoder(value):
+                problems.append(f"Encoder {value!r} is not available in this FFmpeg build.")
+            elif flag in filter_flags:
+                for video_filter in split_filter_graph(value):
+                    match: re.Match[str] | None = filter_name_pattern.match(video_filter)
+                    if match and not self.hasFilter(match.group(1)):
+                        problems.append(f"Filter {match.group(1)!r} is not available in this FFmpeg build.")
+            elif flag == "-hwaccel" and not self.hasHwAccel(value):
+                problems.append(f"Hardware acceleration {value!r} is not supported by this FFmpeg build.")
+            elif flag == "-f" and idx > last_input and not self.hasMuxer(value):
+                problems.append(f"Output format {value!r} is not available in this FFmpeg build.")
+        return problems
+
+
+class CapabilityRegistry:
+    """
+    Lists the capabilities of an FFmpeg binary once, and caches them on disk
+    keyed by the binary's path and version.
+    """
+    def __init__(self, ffmpeg_path: str = "ffmpeg", cache_file: str | None = None) -> None:
+        self.__ffmpeg_path__: str = ffmpeg_path
+        if cache_file is None:
+            cache_file = os.path.join(get_cache_directory(), "capabilities_cache.json")
+        self.__cache__: PersistentCache = PersistentCache(cache_file, max_entries=8)
+        self.__capabilities__: FFmpegCapabilities | None = None
+        self.__lock__: threading.Lock = threading.Lock()
+
+    def __run__(self, binary_path: str, *arguments: str) -> str | None:
+        try:
+            result: subprocess.CompletedProcess[bytes] = subprocess.run([binary_path, "-hide_banner", *arguments], capture_output=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired) as error:
+            print_error(f"Could not run {binary_path} {' '.join(arguments)}: {error}")
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout.decode(errors="replace")
+
+    def getCached(self) -> FFmpegCapabilities | None:
+        # Never blocks, None until load() has finished once
+        return self.__capabilities__
+
+    def load(self) -> FFmpegCapabilities | None:
+        with self.__lock__:
+            if self.__capabilities__ is not None:
+                return self.__capabilities__
+
+            binary_path: str | None = shutil.which(self.__ffmpeg_path__)
+            if binary_path is None:
+                print_error(f"FFmpeg binary {self.__ffmpeg_path__!r} was not found.")
+                return None
+            version_output: str | None = self.__run__(binary_path, "-version")
+            if version_output is None:
+                return None
+            version_words: list[str] = version_output.split()
+            version: str = version_words[2] if len(version_words) > 2 else version_output.strip()
+
+            key: str = json.dumps([os.path.realpath(binary_path), version])
+            data: Any = self.__cache__.get(key)
+            if not isinstance(data, dict) or "encoder_codecs" not in data:
+                ##### Cache miss, list everything once
+                listings: dict[str, str | None] = {
+                    category: self.__run__(binary_path, f"-{category}")
+                    for category in ("encoders", "decoders", "filters", "hwaccels", "muxers")
+                }
+                if any(listing is None for listing in listings.values()):
+                    print_error(f"Could not list the capabilities of {binary_path}.")
+                    return None
+                data = {
+                    "version": version,
+                    "encoders": parse_listing(listings["encoders"] or "", codec_line_pattern, True),
+                    "encoder_codecs": [
+                        match.group(1) for match in map(encoder_codec_pattern.search, (listings["encoders"] or "").splitlines()) if match
+                    ],
+                    "decoders": parse_listing(listings["decoders"] or "", codec_line_pattern, True),
+                    "filters": parse_listing(listings["filters"] or "", filter_line_pattern, False),
+                    "hwaccels": [line.strip() for line in (listings["hwaccels"] or "").splitlines()[1:] if line.strip()],
+                    "muxers": parse_listing(listings["muxers"] or "", muxer_line_pattern, True),
+                }
+                self.__cache__.put(key, data)
+
+            self.__capabilities__ = FFmpegCapabilities(binary_path, data)
+            return self.__capabilities__
+
+    def loadInBackground(self) -> None:
+        threading.Thread(target=self.load, daemon=True).start()
+
+
+_default_registry: CapabilityRegistry | None = None
+_default_registry_lock: threading.Lock = threading.Lock()
+
+def get_capability_registry() -> CapabilityRegistry:
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = CapabilityRegistry()
+        return _default_registry
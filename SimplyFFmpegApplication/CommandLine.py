@@ -0,0 +1,303 @@
+from SimplyFFmpegApplication.Capabilities import get_capability_registry
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, Defaults, MultiOutputCompiler, Preset, extra_output_paths
+from SimplyFFmpegApplication.CommonHelpers import derive_output_path, is_fifo, is_output_path_valid, is_stream_target, print_error, print_log, uses_standard_stream
+from SimplyFFmpegApplication.HeadlessRunner import HeadlessJobRunner
+from SimplyFFmpegApplication.JobMetrics import JobMetricsRecorder, MetricsServer
+from SimplyFFmpegApplication.Jobs import Job, QueueStatistics, default_worker_count
+from SimplyFFmpegApplication.MediaProbe import get_media_prober
+from SimplyFFmpegApplication.ParallelEncode import ParallelEncodeResult, SegmentParallelEncoder
+from SimplyFFmpegApplication.ResultCache import get_result_cache
+from SimplyFFmpegApplication.SmartCut import SmartCutResult, SmartCutter
+from SimplyFFmpegApplication.WatchFolder import WatchFolder
+
+
+import argparse
+import contextlib
+import os
+import shlex
+import sys
+import threading
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m SimplyFFmpegApplication",
+        description="Compile and run SimplyFFmpeg conversions without the GUI."
+    )
+    parser.add_argument("inputs", nargs="*", help="Input files, named FIFOs, or - / pipe: for standard input")
+    parser.add_argument("-o", "--output", default="", help="Output file, or output directory for several inputs (default: next to each input); also a named FIFO, - / pipe: for standard output, or unix:SOCKET")
+    parser.add_argument("--preset", default="", help="Preset title, see --list-presets")
+    parser.add_argument("--list-presets", action="store_true", help="List the available presets and exit")
+    parser.add_argument("--also", action="append", default=[], metavar="PRESET", help="Also write an output with this preset, from the same decode (repeatable)")
+    parser.add_argument("--extension", default="", choices=Defaults.extensions_list, help="Output extension (default: the preset's, or mp4)")
+    parser.add_argument("--stream-format", default="", choices=list(Defaults.stream_formats), help="Muxer for a streamed output (default for pipe:, unix: and FIFO outputs: from the extension, or mpegts)")
+    parser.add_argument("-y", "--overwrite", action="store_true", help="Overwrite existing output files")
+    parser.add_argument("--hwaccel", default="", help="Hardware acceleration method, e.g. cuda")
+    parser.add_argument("--seek", default="", help="Input seek, e.g. 55 or 12:03:45")
+    parser.add_argument("--duration", default="", help="Output duration")
+    parser.add_argument("--smart-cut", action="store_true", help="Trim to --seek/--duration frame-accurately, re-encoding only the GOPs at the cut points")
+
+    video = parser.add_argument_group("video options")
+    video.add_argument("--copy-video", action="store_true")
+    rate_control = video.add_mutually_exclusive_group()
+    rate_control.add_argument("--crf", default="")
+    rate_control.add_argument("--abr", default="", help="Average video bitrate, e.g. 2500k")
+    rate_control.add_argument("--target-size", default="", help="Fit the output into this size with a two-pass encode, e.g. 8M or 8MiB")
+    video.add_argument("--video-preset", default="", choices=Defaults.video_presets_list)
+    video.add_argument("--fps", default="")
+    video.add_argument("--width", default="")
+    video.add_argument("--height", default="")
+
+    audio = parser.add_argument_group("audio options")
+    audio.add_argument("--copy-audio", action="store_true")
+    audio.add_argument("--audio-bitrate", default="")
+    audio.add_argument("--volume", default="")
+    audio.add_argument("--loudness", default="", metavar="LUFS", help="Normalize to this integrated loudness (EBU R128), e.g. -23; measured once per source and cached")
+
+    execution = parser.add_argument_group("execution")
+    execution.add_argument("-j", "--jobs", type=int, default=default_worker_count(), help="Number of concurrent FFmpeg processes")
+    execution.add_argument("--pin-cpus", action="store_true", help="Pin each concurrent FFmpeg process to its own share of the CPUs")
+    execution.add_argument("--segments", type=int, default=1, help="Encode each input as N keyframe-split segments in parallel")
+    execution.add_argument("--measure-baseline", action="store_true", help="With --segments, also time a single-process encode and report the speedup")
+    execution.add_argument("--no-probe", action="store_true", help="Skip ffprobe and the FFmpeg capability check (disables the stream copy fast path)")
+    execution.add_argument("--no-result-cache", action="store_true", help="Always encode, even if an identical conversion was done before")
+    execution.add_argument("-n", "--dry-run", action="store_true", help="Print the compiled commands without running them")
+    execution.add_argument("--estimate", action="store_true", help="Estimate output size and encode time from a few sample encodes, without converting")
+    execution.add_argument("--metrics-log", default="", metavar="FILE", help="Append per-job resource metrics to this JSONL file (default: in the cache directory)")
+    execution.add_argument("--metrics-port", type=int, default=0, metavar="PORT", help="Serve Prometheus-style job metrics on http://127.0.0.1:PORT/metrics")
+    execution.add_argument("-v", "--verbose", action="store_true", help="Stream FFmpeg's stderr")
+
+    watch = parser.add_argument_group("watch folder")
+    watch.add_argument("--watch", default="", metavar="DIRECTORY", help="Convert every file dropped into DIRECTORY until interrupted")
+    watch.add_argument("--watch-extensions", default="", help="Comma-separated input extensions to pick up (default: any)")
+    watch.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between checks of the watch folder")
+    watch.add_argument("--settle-time", type=float, default=2.0, help="Seconds a file's size must stay unchanged before it is picked up")
+    return parser
+
+
+def find_preset(title: str) -> Preset | None:
+    for preset in Defaults.presets_list:
+        if preset.getTitle().lower() == title.lower():
+            return preset
+    return None
+
+
+def resolve_output_path(input_file: str, output: str, extension: str, input_count: int) -> str:
+    # Streams are written as named, they have no extension to add
+    if output and is_stream_target(output):
+        return output
+    if output and (os.path.isdir(output) or input_count > 1):
+        return derive_output_path(input_file, output, extension)
+    if output:
+        return output if os.path.splitext(output)[1] else f"{output}.{extension}"
+    return derive_output_path(input_file, "", extension)
+
+
+def build_options(args: argparse.Namespace, preset: Preset | None, input_file: str, output_file: str) -> ConversionOptions:
+    options: ConversionOptions = ConversionOptions(input_file, output_file)
+    options.progress_pipe = True
+    options.overwrite = args.overwrite
+    options.stream_format = args.stream_format
+    options.preset = preset
+    options.hw_accel = args.hwaccel
+    options.seek = args.seek
+    options.duration = args.duration
+    options.copy_video = args.copy_video
+    options.video_crf = args.crf
+    options.video_bitrate = args.abr
+    options.target_size = args.target_size
+    options.video_preset = args.video_preset
+    options.fps = args.fps
+    options.video_width = args.width
+    options.video_height = args.height
+    options.copy_audio = args.copy_audio
+    options.audio_bitrate = args.audio_bitrate
+    options.volume = args.volume
+    options.loudness = args.loudness
+    if not args.no_probe:
+        options.input_info = get_media_prober().probe(input_file)
+        options.capabilities = get_capability_registry().load()
+    return options
+
+
+def make_job(args: argparse.Namespace, preset: Preset | None, input_file: str, output_file: str) -> Job:
+    options: ConversionOptions = build_options(args, preset, input_file, output_file)
+    if not args.dry_run:
+        # The audio-only analysis pass, skipped when the measurement is cached
+        options.analyzeLoudness(print_log)
+    extra_files: list[str] = extra_output_paths(output_file, args.extra_presets)
+    first_passes: list[list[str]] = []
+    temporary_files: list[str] = []
+    if extra_files:
+        # Every output comes out of one invocation, decoding the input once
+        compiler: MultiOutputCompiler = MultiOutputCompiler([
+            options,
+            *(build_options(args, extra_preset, input_file, extra_file) for extra_preset, extra_file in zip(args.extra_presets, extra_files))
+        ])
+        program, arguments = compiler.compile()
+        notes: list[str] = compiler.getNotes()
+    else:
+        states = options.buildStates()
+        program, passes = states.compilePasses()
+        *first_passes, arguments = passes
+        notes = states.getNotes()
+        temporary_files = states.getTemporaryFiles()
+    for note in notes:
+        print_log(f"{os.path.basename(input_file)}: {note}")
+    if options.capabilities:
+        problems: list[str] = [problem for pass_arguments in (*first_passes, arguments) for problem in options.capabilities.validateArguments(pass_arguments)]
+        if problems:
+            raise Exception(" ".join(dict.fromkeys(problems)))
+    job: Job = Job(program, arguments, input_file, output_file, extra_files, first_passes, temporary_files)
+    if options.input_info:
+        job.progress.setInputDuration(options.input_info.getDuration())
+    return job
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser: argparse.ArgumentParser = build_parser()
+    args: argparse.Namespace = parser.parse_args(argv)
+    # Logs would otherwise be muxed into the stream FFmpeg writes to stdout
+    if uses_standard_stream(args.output) and not args.dry_run:
+        with contextlib.redirect_stdout(sys.stderr):
+            return run(parser, args)
+    return run(parser, args)
+
+
+def run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    if args.list_presets:
+        for preset in Defaults.presets_list[1:]:
+            print(preset)
+        return 0
+    if not args.inputs and not args.watch:
+        parser.error("at least one input file is required")
+
+    ##### Resolve preset and extension
+    preset: Preset | None = None
+    if args.preset and args.preset.lower() != "none":
+        preset = find_preset(args.preset)
+        if preset is None:
+            parser.error(f"unknown preset {args.preset!r}, see --list-presets")
+    args.extra_presets = []
+    for title in args.also:
+        extra_preset: Preset | None = find_preset(title)
+        if extra_preset is None or extra_preset is Defaults.presets_list[0]:
+            parser.error(f"unknown preset {title!r} for --also, see --list-presets")
+        args.extra_presets.append(extra_preset)
+    if args.extra_presets and args.segments > 1:
+        parser.error("--also cannot be combined with --segments")
+    if args.measure_baseline and args.segments <= 1:
+        parser.error("--measure-baseline needs --segments")
+    if args.target_size and (args.extra_presets or args.segments > 1):
+        parser.error("--target-size cannot be combined with --also or --segments")
+    if args.smart_cut and not (args.seek or args.duration):
+        parser.error("--smart-cut needs --seek and/or --duration")
+    if args.smart_cut and (args.extra_presets or args.segments > 1 or args.target_size):
+        parser.error("--smart-cut cannot be combined with --also, --segments or --target-size")
+    ##### Streams are read and written once, as they come
+    stream_input: bool = any(uses_standard_stream(input_file) or is_fifo(input_file) for input_file in args.inputs)
+    stream_output: bool = bool(args.output) and is_stream_target(args.output)
+    if any(uses_standard_stream(input_file) for input_file in args.inputs) and not args.output:
+        parser.error("standard input has no name to derive an output from, set --output")
+    if stream_input and (args.target_size or args.loudness):
+        parser.error("--target-size and --loudness read the input twice, they need a file input")
+    if (stream_input or stream_output) and (args.smart_cut or args.segments > 1 or args.estimate):
+        parser.error("--smart-cut, --segments and --estimate need file inputs and outputs")
+    if stream_output and (args.extra_presets or args.watch):
+        parser.error("--also and --watch need a file or directory output, not a stream")
+    extension: str = preset.getExtension() if preset else args.extension
+    if not extension:
+        output_extension: str = os.path.splitext(args.output)[1][1:] if len(args.inputs) == 1 else ""
+        extension = output_extension or "mp4"
+
+    metrics: JobMetricsRecorder = JobMetricsRecorder(args.metrics_log or None)
+    if args.metrics_port and not args.dry_run:
+        try:
+            MetricsServer(metrics, args.metrics_port).start()
+        except OSError as error:
+            parser.error(f"cannot serve metrics on port {args.metrics_port}: {error}")
+
+    ##### Watch folder mode
+    if args.watch:
+        if args.inputs:
+            parser.error("input files cannot be combined with --watch")
+        if not os.path.isdir(args.watch):
+            parser.error(f"watch folder {args.watch} doesn't exist")
+        watch_extensions: tuple[str, ...] | None = tuple(filter(None, args.watch_extensions.split(","))) or None
+        watch_folder: WatchFolder = WatchFolder(
+            args.watch, lambda input_file, output_file: make_job(args, preset, input_file, output_file), extension,
+            args.output, args.jobs, args.poll_interval, args.settle_time, watch_extensions,
+            pin_affinity=args.pin_cpus, result_cache=None if args.no_result_cache else get_result_cache(),
+            metrics=metrics
+        )
+        stop_event: threading.Event = threading.Event()
+        try:
+            watch_folder.run(stop_event)
+        except KeyboardInterrupt:
+            stop_event.set()
+        print_log(metrics.getSummary())
+        return 0
+
+    if len(args.inputs) > 1 and args.output and not os.path.isdir(args.output):
+        parser.error("--output must be an existing directory when converting several inputs")
+
+    ##### Compile one job per input
+    jobs: list[Job] = []
+    for input_file in args.inputs:
+        if not (os.path.isfile(input_file) or uses_standard_stream(input_file) or is_fifo(input_file)):
+            print_error(f"Skipping {input_file}: input file doesn't exist!")
+            continue
+        output_file: str = resolve_output_path(input_file, args.output, extension, len(args.inputs))
+        if not is_output_path_valid(output_file):
+            print_error(f"Skipping {input_file}: output path {output_file} is invalid!")
+            continue
+        if os.path.isfile(output_file) and not args.overwrite:
+            print_error(f"Skipping {input_file}: {output_file} already exists (use --overwrite)")
+            continue
+
+        try:
+            jobs.append(make_job(args, preset, input_file, output_file))
+        except Exception as error:
+            print_error(f"Skipping {input_file}: {error}")
+
+    # Every input was skipped, nothing to do is a failure
+    if not jobs:
+        return 1
+    if args.dry_run:
+        for job in jobs:
+            for pass_arguments in job.getPasses():
+                print(shlex.join([job.getProgram(), *pass_arguments]))
+        return 0
+    if args.estimate:
+        # Deferred, only needed for estimates
+        from SimplyFFmpegApplication.Estimator import EncodeEstimate, SampleEstimator
+        estimated: bool = True
+        for job in jobs:
+            estimate: EncodeEstimate = SampleEstimator(build_options(args, preset, job.getInputFile(), job.getOutputFile())).estimate()
+            print_log(f"{job.getInputFile()}:\n{estimate}")
+            estimated = estimated and estimate.success
+        return 0 if estimated else 1
+
+    ##### Run
+    if args.smart_cut:
+        cut_success: bool = True
+        for job in jobs:
+            cut_result: SmartCutResult = SmartCutter(build_options(args, preset, job.getInputFile(), job.getOutputFile())).run()
+            print_log(f"{job.getInputFile()}:\n{cut_result}")
+            cut_success = cut_success and cut_result.success
+        return 0 if cut_success else 1
+    if args.segments > 1:
+        success: bool = True
+        for job in jobs:
+            result: ParallelEncodeResult = SegmentParallelEncoder(job.getProgram(), job.getArguments(), args.segments).run(measure_baseline=args.measure_baseline)
+            print_log(f"{job.getInputFile()}:\n{result}")
+            success = success and result.success and result.duration_ok
+        return 0 if success else 1
+
+    statistics: QueueStatistics = HeadlessJobRunner(
+        args.jobs, args.verbose, pin_affinity=args.pin_cpus,
+        result_cache=None if args.no_result_cache else get_result_cache(), metrics=metrics
+    ).run(jobs)
+    print_log(str(statistics))
+    print_log(f"{metrics.getSummary()} (logged to {metrics.getLogFile()})")
+    return 0 if statistics.failed == 0 and statistics.cancelled == 0 else 1
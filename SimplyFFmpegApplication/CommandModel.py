@@ -0,0 +1,1030 @@
+from SimplyFFmpegApplication.Capabilities import FFmpegCapabilities
+from SimplyFFmpegApplication.CommonHelpers import is_stream_target, parse_bitrate, parse_size, parse_time_to_seconds, uses_standard_stream
+from SimplyFFmpegApplication.Loudness import LoudnessMeasurement, build_loudnorm_filter, get_loudness_analyzer
+from SimplyFFmpegApplication.MediaProbe import MediaInfo, get_media_prober
+
+
+import copy
+import hashlib
+import math
+import os
+import re
+import tempfile
+from typing import Callable
+
+
+class Argument:
+    # Flags that never take a value
+    valueless_flags: tuple[str, ...] = ("-y", "-n", "-nostats", "-hide_banner", "-vn", "-an", "-sn", "-dn", "-shortest")
+    
+    def __init__(self, flag: str, value: str | None = None) -> None:
+        # If value is None, the Argument does not take any value
+        self.__flag__: str = flag
+        self.__value__: str | None = value
+    
+    def getFlag(self) -> str:
+        return self.__flag__
+    def setFlag(self, flag: str) -> None:
+        self.__flag__ = flag
+    
+    def getValue(self) -> str | None:
+        return self.__value__
+    def setValue(self, value: str) -> None:
+        self.__value__ = value
+    def appendValue(self, value: str) -> None:
+        if not self.__value__:
+            self.__value__ = value
+            return
+        self.__value__ += f",{value}"
+        
+    def toList(self) -> list[str]:
+        if self.__value__:
+            return [self.__flag__, self.__value__]
+        return [self.__flag__]
+    
+    def getStreamType(self) -> str | None:
+        """
+        Output Codes:
+            "video" -> Flag only affects the video stream
+            "audio" -> Flag only affects the audio stream
+            None    -> Flag affects both or neither
+        """
+        flag: str = self.__flag__
+        # -filter_complex only ever carries video filters in this application
+        if flag.endswith(":v") or flag in ("-vf", "-filter_complex", "-vcodec", "-crf", "-preset", "-r", "-s", "-pix_fmt", "-sws_flags", "-sws_dither"):
+            return "video"
+        if flag.endswith(":a") or flag in ("-af", "-acodec", "-ar", "-ac"):
+            return "audio"
+        return None
+    
+    def __str__(self) -> str:
+        string: str = self.__flag__
+        if self.__value__:
+            string += f" {self.__value__}"
+        return string
+    
+    @staticmethod
+    def parseList(arguments: list[str]) -> list["Argument"]:
+        # Inverse of toList(), for compiled argument lists. Positionals (the
+        # output file) become value-less Arguments.
+        parsed: list[Argument] = []
+        idx: int = 0
+        while idx < len(arguments):
+            flag: str = arguments[idx]
+            if flag.startswith("-") and flag not in Argument.valueless_flags and idx + 1 < len(arguments):
+                parsed.append(Argument(flag, arguments[idx + 1]))
+                idx += 2
+            else:
+                parsed.append(Argument(flag))
+                idx += 1
+        return parsed
+
+class StreamTarget:
+    # Describes an output stream that an input stream may be copied into as-is
+    def __init__(self, codecs: list[str], max_bitrate: str | None = None, frame_rate: float | None = None) -> None:
+        self.__codecs__: list[str] = codecs
+        self.__max_bitrate__: int | None = parse_bitrate(max_bitrate) if max_bitrate else None
+        self.__frame_rate__: float | None = frame_rate
+    
+    def getCodecs(self) -> list[str]:
+        return self.__codecs__
+    def getMaxBitrate(self) -> int | None:
+        return self.__max_bitrate__
+    def getFrameRate(self) -> float | None:
+        return self.__frame_rate__
+    
+    def explainMismatch(self, codec: str | None, bitrate: int | None, frame_rate: float | None) -> str | None:
+        # Returns None if the stream satisfies the target
+        if codec not in self.__codecs__:
+            return f"codec {codec} is not {'/'.join(self.__codecs__)}"
+        if self.__max_bitrate__ is not None:
+            if bitrate is None:
+                return "bitrate is unknown"
+            if bitrate > self.__max_bitrate__:
+                return f"bitrate {bitrate // 1000}k exceeds {self.__max_bitrate__ // 1000}k"
+        if self.__frame_rate__ is not None:
+            if frame_rate is None:
+                return "frame rate is unknown"
+            if abs(frame_rate - self.__frame_rate__) > 0.01:
+                return f"frame rate {frame_rate:.3g} is not {self.__frame_rate__:.3g}"
+        return None
+    
+    def describe(self, codec: str | None, bitrate: int | None, frame_rate: float | None) -> str:
+        parts: list[str] = [str(codec)]
+        if bitrate is not None:
+            parts.append(f"{bitrate // 1000}k")
+        if frame_rate is not None:
+            parts.append(f"{frame_rate:.3g} fps")
+        return ", ".join(parts)
+
+class Preset:
+    def __init__(
+        self, title: str, extension: str, options: list[Argument],
+        video_target: StreamTarget | None = None, audio_target: StreamTarget | None = None
+    ) -> None:
+        self.__title__: str = title
+        self.__extension__: str = extension
+        self.__options__: list[Argument] = options
+        self.__video_target__: StreamTarget | None = video_target
+        self.__audio_target__: StreamTarget | None = audio_target
+    
+    def getTitle(self) -> str:
+        return self.__title__
+    def getExtension(self) -> str:
+        return self.__extension__
+    def getOptions(self) -> list[Argument]:
+        return self.__options__
+    def getVideoTarget(self) -> StreamTarget | None:
+        return self.__video_target__
+    def getAudioTarget(self) -> StreamTarget | None:
+        return self.__audio_target__
+    def getOptionsAsStr(self, skip_video: bool = False, skip_audio: bool = False) -> list[str]:
+        options: list[str] = []
+        for option in self.__options__:
+            stream_type: str | None = option.getStreamType()
+            if (skip_video and stream_type == "video") or (skip_audio and stream_type == "audio"):
+                continue
+            flag: str = option.getFlag()
+            value: str | None = option.getValue()
+            options.append(flag)
+            if value:
+                options.append(value)
+        return options
+    
+    def __str__(self) -> str:
+        return f"{self.__title__ } ({self.__extension__}, {[str(i) for i in self.__options__]})"
+
+def build_gif_filter(
+    reduction_filters: list[str], max_colors: int = 256,
+    stats_mode: str = "diff", dither: str = "sierra2_4a"
+) -> str:
+    """
+    Single-decode palette pipeline for GIF output: the reduced frames are split,
+    one branch feeds palettegen and the other waits for the palette in
+    paletteuse. fps/scale run before the split so every later stage sees the
+    fewest pixels.
+    """
+    reduced: str = ",".join([*reduction_filters, "split[gif_frames][gif_palette_source]"])
+    return (
+        f"{reduced};"
+        f"[gif_palette_source]palettegen=max_colors={max_colors}:stats_mode={stats_mode}[gif_palette];"
+        f"[gif_frames][gif_palette]paletteuse=dither={dither}:diff_mode=rectangle"
+    )
+
+class Defaults:
+    presets_list: list[Preset] = [
+        Preset("None", "mp4", []),
+        Preset("Twitter Video", "mp4", [
+            Argument("-b:v", "2500k"),
+            Argument("-filter:v", "fps=60"), 
+            Argument("-c:a", "copy")
+        ], video_target=StreamTarget(["h264"], "2500k", 60)),
+        Preset("To mp3 (192k)", "mp3", [
+            Argument("-b:a", "192k")
+        ], audio_target=StreamTarget(["mp3"], "192k")),
+        Preset("To GIF", "gif", [
+            Argument("-filter_complex", build_gif_filter(["fps=15", "scale='min(480,iw)':-1:flags=lanczos"])),
+        ]),
+    ]
+    
+    extensions_list: list[str] = [
+        "mp4",
+        "mp3",
+        "gif",
+        "jpg",
+        "png",
+        "webp"
+    ]
+    
+    # Codecs FFmpeg picks by default for each extension, as (video, audio)
+    default_codecs: dict[str, tuple[str | None, str | None]] = {
+        "mp4": ("h264", "aac"),
+        "mp3": (None, "mp3"),
+        "gif": ("gif", None),
+        "jpg": ("mjpeg", None),
+        "png": ("png", None),
+        "webp": ("webp", None),
+    }
+    
+    # Target size mode: the share of the file kept for container overhead, the
+    # audio bitrate assumed when none is set (FFmpeg's AAC default) and the
+    # lowest video bitrate worth encoding, in bit/s
+    container_overhead: float = 0.02
+    default_audio_bitrate: int = 128000
+    min_video_bitrate: int = 32000
+    
+    # Encoders for the default video codecs that support two-pass rate control
+    two_pass_encoders: dict[str, str] = {
+        "h264": "libx264",
+    }
+    
+    # Smart cut: encoders that can re-encode boundary GOPs to match a source
+    # codec, and the CRF used for them when none is set
+    smart_cut_encoders: dict[str, str] = {
+        "h264": "libx264",
+        "hevc": "libx265",
+    }
+    smart_cut_crf: str = "18"
+    
+    # Muxers for outputs that can't seek back to finish a header. Fragmented
+    # MP4 writes an empty moov up front, then a self-contained fragment at
+    # every keyframe; MPEG-TS has no index at all. Both carry mp4's codecs
+    stream_formats: dict[str, list[str]] = {
+        "fmp4": ["-f", "mp4", "-movflags", "frag_keyframe+empty_moov+default_base_moof"],
+        "mpegts": ["-f", "mpegts"],
+    }
+    stream_format_extensions: dict[str, str] = {
+        ".mp4": "fmp4",
+        ".m4v": "fmp4",
+        ".mov": "fmp4",
+        ".ts": "mpegts",
+        ".m2ts": "mpegts",
+    }
+    default_stream_format: str = "mpegts"
+    stream_codec_extension: str = "mp4"
+    
+    video_presets_list: list[str] = [
+        "ultrafast",
+        "superfast",
+        "veryfast",
+        "faster",
+        "fast",
+        "medium",
+        "slow",
+        "slower",
+        "veryslow"
+    ]
+
+class States:
+    def __init__(self) -> None:
+        self.input_file: Argument | None = None
+        self.output_file: Argument | None = None
+        # Muxer named for a streamed output, and its options
+        self.output_format: str | None = None
+        self.output_format_options: list[str] = []
+        self.overwrite_flag: Argument = Argument("-n")
+        self.progress_output: Argument | None = None
+        self.stats_flag: Argument | None = None
+        self.preset: Preset | None = None
+        
+        # self.extension: str | None = None
+        self.copy_video: Argument | None = None
+        self.copy_audio: Argument | None = None
+        
+        self.hw_accel: Argument | None = None
+        
+        self.seek: Argument | None = None
+        self.duration: Argument | None = None
+        # Last keyframe at or before the seek point, if it was looked up
+        self.seek_keyframe: float | None = None
+        
+        self.video_crf: Argument | None = None
+        self.video_bitrate: Argument | None = None
+        self.video_preset: Argument | None = None
+        self.video_filters: Argument | None = None
+        # Log file prefix of a two-pass encode, None for a single pass
+        self.two_pass_log: str | None = None
+        
+        self.audio_bitrate: Argument | None = None
+        self.audio_filters: Argument | None = None
+        # Target of the loudness normalization, and the measurement it uses if any
+        self.loudness_target: float | None = None
+        self.loudness_measurement: LoudnessMeasurement | None = None
+        
+        # Probed input, used to skip re-encoding streams that already match
+        self.input_info: MediaInfo | None = None
+        # What the FFmpeg binary supports, used to fall back to software decoding
+        self.capabilities: FFmpegCapabilities | None = None
+        self.notes: list[str] = []
+    
+    def setIO(self, input_file: str, output_file: str) -> None:
+        self.input_file = Argument("-i", input_file)
+        self.output_file = Argument(output_file)
+    def setOutputFormat(self, output_format: str) -> None:
+        self.output_format = output_format
+        self.output_format_options = Defaults.stream_formats[output_format]
+    def setPreset(self, preset: Preset) -> None:
+        self.preset = preset
+    # def setExtension(self, extension: str) -> None:
+    #     self.extension = extension
+    def toggleOverwrite(self) -> None:
+        self.overwrite_flag.setFlag("-y")
+    def setProgressPipe(self) -> None:
+        # Machine-readable progress on stdout replaces the stderr stats line
+        self.progress_output = Argument("-progress", "pipe:1")
+        self.stats_flag = Argument("-nostats")
+    def setCopyVideo(self) -> None:
+        self.copy_video = Argument("-c:v", "copy")
+    def setCopyAudio(self) -> None:
+        self.copy_audio = Argument("-c:a", "copy")
+        
+    def setHwAccel(self, hwaccel: str) -> None:
+        self.hw_accel = Argument("-hwaccel", hwaccel)
+    
+    def setSeek(self, seek: str) -> None:
+        self.seek = Argument("-ss", seek)
+    def setDuration(self, duration: str) -> None:
+        self.duration = Argument("-t", duration)
+    def setSeekKeyframe(self, keyframe: float | None) -> None:
+        self.seek_keyframe = keyframe
+        
+    def setVideoCRF(self, video_crf: str) -> None:
+        self.video_crf = Argument("-crf", video_crf)
+    def setVideoBitrate(self, video_bitrate: str) -> None:
+        self.video_bitrate = Argument("-b:v", video_bitrate)
+    def setVideoPreset(self, video_preset: str) -> None:
+        self.video_preset = Argument("-preset", video_preset)
+    def setTwoPass(self, passlog_prefix: str) -> None:
+        self.two_pass_log = passlog_prefix
+    def addVideoFilter(self, video_filter: str) -> None:
+        if self.video_filters is None:
+            self.video_filters = Argument("-filter_complex", "")
+        self.video_filters.appendValue(video_filter)
+        
+    def setInputInfo(self, input_info: MediaInfo | None) -> None:
+        self.input_info = input_info
+    def setCapabilities(self, capabilities: FFmpegCapabilities | None) -> None:
+        self.capabilities = capabilities
+    def getNotes(self) -> list[str]:
+        return self.notes
+        
+    def setAudioBitrate(self, audio_bitrate: str) -> None:
+        self.audio_bitrate = Argument("-b:a", audio_bitrate)
+    def addAudioFilter(self, audio_filter: str) -> None:
+        if self.audio_filters is None:
+            self.audio_filters = Argument("-filter:a", "")
+        self.audio_filters.appendValue(audio_filter)
+    def setLoudnessNormalization(self, target: float, measurement: LoudnessMeasurement | None, sample_rate: int) -> None:
+        self.loudness_target = target
+        self.loudness_measurement = measurement
+        self.addAudioFilter(build_loudnorm_filter(target, measurement))
+        # loudnorm resamples to 192 kHz internally, go back to the source rate
+        self.addAudioFilter(f"aresample={sample_rate}")
+        
+    # Stream copy fast path
+    def getOutputExtension(self) -> str:
+        if not self.output_file:
+            return ""
+        if self.output_format:
+            return Defaults.stream_codec_extension
+        return os.path.splitext(self.output_file.getFlag())[1][1:].lower()
+    
+    def getStreamTargets(self) -> tuple[StreamTarget | None, StreamTarget | None]:
+        if self.preset:
+            return (self.preset.getVideoTarget(), self.preset.getAudioTarget())
+        
+        # Without a preset, only explicitly requested bitrates can be compared
+        video_codec, audio_codec = Defaults.default_codecs.get(self.getOutputExtension(), (None, None))
+        video_target: StreamTarget | None = None
+        if (
+            video_codec and self.video_bitrate and not self.video_crf
+            and not self.video_filters and not self.seek
+        ):
+            video_target = StreamTarget([video_codec], self.video_bitrate.getValue())
+        
+        audio_target: StreamTarget | None = None
+        if audio_codec and not self.audio_filters and (self.audio_bitrate or not video_codec):
+            audio_target = StreamTarget([audio_codec], self.audio_bitrate.getValue() if self.audio_bitrate else None)
+        return (video_target, audio_target)
+    
+    def resolveStreamCopy(self) -> tuple[bool, bool]:
+        """
+        Compares the probed input against the requested output.
+        Returns whether the video and audio streams can be copied as-is.
+        """
+        if not self.input_info:
+            return (False, False)
+        info: MediaInfo = self.input_info
+        video_target, audio_target = self.getStreamTargets()
+        
+        copy_video: bool = False
+        if video_target and not self.copy_video and info.hasVideo():
+            video_stream: tuple[str | None, int | None, float | None] = (info.getVideoCodec(), info.getVideoBitrate(), info.getFrameRate())
+            mismatch: str | None = video_target.explainMismatch(*video_stream)
+            copy_video = mismatch is None
+            if copy_video:
+                self.notes.append(f"Video is stream-copied: the source ({video_target.describe(*video_stream)}) already matches the target.")
+            else:
+                self.notes.append(f"Video is re-encoded: {mismatch}.")
+        
+        copy_audio: bool = False
+        if audio_target and not self.copy_audio and info.hasAudio():
+            audio_stream: tuple[str | None, int | None, float | None] = (info.getAudioCodec(), info.getAudioBitrate(), None)
+            mismatch = audio_target.explainMismatch(*audio_stream)
+            copy_audio = mismatch is None
+            if copy_audio:
+                self.notes.append(f"Audio is stream-copied: the source ({audio_target.describe(*audio_stream)}) already matches the target.")
+            else:
+                self.notes.append(f"Audio is re-encoded: {mismatch}.")
+        
+        return (copy_video, copy_audio)
+        
+    # Hybrid seeking
+    def resolveSeek(self) -> tuple[Argument | None, Argument | None, Argument | None]:
+        """
+        Splits the seek into a fast input seek to the preceding keyframe and a
+        short, accurate output seek for the rest.
+        Returns the (input seek, output seek, duration) arguments.
+        """
+        if not self.seek:
+            return (None, None, self.duration)
+        seek_seconds: float | None = parse_time_to_seconds(str(self.seek.getValue()))
+        keyframe: float | None = self.seek_keyframe
+        if seek_seconds is None or keyframe is None or not 0 < keyframe <= seek_seconds:
+            # Nothing to gain, or no keyframe known: plain output seek
+            return (None, self.seek, self.duration)
+        
+        remainder: float = seek_seconds - keyframe
+        input_seek: Argument = Argument("-ss", f"{keyframe:.3f}")
+        if self.copy_video:
+            # Copied video can only start on a keyframe, so the cut starts early
+            # and the duration grows to still cover the requested span
+            duration: Argument | None = self.duration
+            duration_seconds: float | None = parse_time_to_seconds(str(duration.getValue())) if duration else None
+            if duration_seconds is not None and remainder > 0:
+                duration = Argument("-t", f"{duration_seconds + remainder:.3f}")
+            if remainder > 0:
+                self.notes.append(f"Stream copy starts at the keyframe at {keyframe:.3f}s, {remainder:.3f}s before the requested seek.")
+            return (input_seek, None, duration)
+        
+        self.notes.append(f"Input seeks to the keyframe at {keyframe:.3f}s, then decodes {remainder:.3f}s to the exact position.")
+        output_seek: Argument | None = Argument("-ss", f"{remainder:.3f}") if remainder > 0 else None
+        return (input_seek, output_seek, self.duration)
+    
+    # Compiler
+    def compileState(self) -> tuple[str, list[str]]:
+        program: str = "ffmpeg"
+        arguments: list[str] = []
+        self.notes = []
+        auto_copy_video, auto_copy_audio = self.resolveStreamCopy()
+        copy_video: Argument | None = self.copy_video or (Argument("-c:v", "copy") if auto_copy_video else None)
+        copy_audio: Argument | None = self.copy_audio or (Argument("-c:a", "copy") if auto_copy_audio else None)
+        
+        # Progress reporting
+        if self.progress_output:
+            arguments.extend(self.progress_output.toList())
+        if self.stats_flag:
+            arguments.extend(self.stats_flag.toList())
+        
+        # hwaccel, unless the FFmpeg build or the machine cannot provide it
+        if self.hw_accel:
+            hw_accel: str = str(self.hw_accel.getValue())
+            if self.capabilities and not self.capabilities.isHwAccelUsable(hw_accel):
+                self.notes.append(f"Hardware acceleration {hw_accel!r} is unavailable, decoding in software instead.")
+            else:
+                arguments.extend(self.hw_accel.toList())
+        
+        # Fast input seek, only used without a preset like the other seek options
+        input_seek, output_seek, duration = self.resolveSeek() if not self.preset else (None, None, None)
+        if input_seek:
+            arguments.extend(input_seek.toList())
+        
+        # Input
+        if not self.input_file:
+            raise Exception("Missing input file value. If you're seeing this, the initial verification failed.")
+        arguments.extend(self.input_file.toList())
+        
+        # Overwrite
+        arguments.extend(self.overwrite_flag.toList())
+        
+        # Preset
+        if self.preset:
+            arguments.extend(self.preset.getOptionsAsStr(skip_video=auto_copy_video, skip_audio=auto_copy_audio))
+            if auto_copy_video and copy_video:
+                arguments.extend(copy_video.toList())
+            if auto_copy_audio and copy_audio:
+                arguments.extend(copy_audio.toList())
+            
+        # Options (No Preset)
+        if not self.preset:
+            # if self.extension:
+            #     arguments.append(self.extension)
+            if copy_video:
+                arguments.extend(copy_video.toList())
+            if copy_audio:
+                arguments.extend(copy_audio.toList())
+            
+            if output_seek:
+                arguments.extend(output_seek.toList())
+            if duration:
+                arguments.extend(duration.toList())
+        
+        if not self.preset and not copy_video:
+            if self.video_crf:
+                arguments.extend(self.video_crf.toList())
+            if self.video_bitrate:
+                arguments.extend(self.video_bitrate.toList())
+            if self.video_preset:
+                arguments.extend(self.video_preset.toList())
+            if self.video_filters:
+                arguments.extend(self.video_filters.toList())
+        
+        if not self.preset and not copy_audio:
+            if self.audio_bitrate:
+                arguments.extend(self.audio_bitrate.toList())
+            if self.audio_filters:
+                arguments.extend(self.audio_filters.toList())
+            if self.loudness_target is not None:
+                if self.loudness_measurement:
+                    self.notes.append(f"Loudness is normalized linearly to {self.loudness_target:g} LUFS from the measured {self.loudness_measurement}.")
+                else:
+                    self.notes.append(f"Loudness is not measured yet, so it is normalized to {self.loudness_target:g} LUFS with a dynamic gain.")
+        
+        # Audio extraction into an audio-only container
+        if auto_copy_audio and Defaults.default_codecs.get(self.getOutputExtension(), (None, None))[0] is None:
+            arguments.append("-vn")
+        
+        # Streamed output: the muxer is named instead of guessed from an
+        # extension, and so are the codecs it would have picked
+        if self.output_format:
+            video_codec, audio_codec = Defaults.default_codecs[Defaults.stream_codec_extension]
+            # A two-pass encode names its own video encoder
+            if video_codec and "-c:v" not in arguments and not self.two_pass_log:
+                arguments.extend(["-c:v", video_codec])
+            if audio_codec and "-c:a" not in arguments:
+                arguments.extend(["-c:a", audio_codec])
+            arguments.extend(self.output_format_options)
+            self.notes.append(f"Output is streamed as {self.output_format}, a muxer that never seeks back.")
+        
+        # Output
+        if not self.output_file:
+            raise Exception("Missing output file value. If you're seeing this, the initial verification failed.")
+        arguments.extend(self.output_file.toList())
+        
+        # Finally
+        return (program, arguments)
+    
+    def compilePasses(self) -> tuple[str, list[list[str]]]:
+        """
+        Compiles every FFmpeg run of the conversion, in order. A two-pass
+        encode first analyzes the video alone, as cheaply as possible (fast
+        preset, no audio, null muxer), then encodes with the gathered stats.
+        """
+        program, arguments = self.compileState()
+        if not self.two_pass_log or self.preset or self.copy_video or not self.video_bitrate or "-c:v" in arguments:
+            return (program, [arguments])
+        # The null muxer of the first pass would otherwise pick a raw encoder
+        encoder: str | None = Defaults.two_pass_encoders.get(Defaults.default_codecs.get(self.getOutputExtension(), (None, None))[0] or "")
+        if encoder is None:
+            self.notes.append(f"Two-pass encoding is not supported for .{self.getOutputExtension()}, encoding once at {self.video_bitrate.getValue()}.")
+            return (program, [arguments])
+        
+        pass_arguments: list[str] = ["-c:v", encoder, "-passlogfile", self.two_pass_log, "-pass"]
+        first_pass: list[str] = []
+        for argument in Argument.parseList(arguments[:-1]):
+            if argument.getStreamType() == "audio" or argument.getFlag() in ("-preset", "-vn"):
+                continue
+            first_pass.extend(argument.toList())
+        first_pass.extend(["-preset", "veryfast", "-an", *pass_arguments, "1", "-f", "null", "-"])
+        final_pass: list[str] = [*arguments[:-1], *pass_arguments, "2", arguments[-1]]
+        self.notes.append(f"Two-pass encode at {self.video_bitrate.getValue()}: a fast analysis pass without audio, then the real encode.")
+        return (program, [first_pass, final_pass])
+    
+    def getTemporaryFiles(self) -> list[str]:
+        # Glob patterns of files left behind by the FFmpeg runs
+        return [f"{self.two_pass_log}*"] if self.two_pass_log else []
+
+def format_command_preview(program: str, arguments: list[str]) -> str:
+    """
+    Human-readable command: one option per line, flags in brackets, and the
+    output file on its own line.
+    """
+    preview: list[str] = [program]
+    prev_argument: str = ""
+    for argument in arguments[:-1]:
+        if argument[:1] == "-" or (prev_argument and prev_argument[0] != "-"):
+            preview.append("\n    ")
+        else:
+            preview.append(" ")
+        preview.append(f"[{argument}]" if argument[:1] == "-" else argument)
+        prev_argument = argument
+    if arguments:
+        preview.append(f"\n    {arguments[-1]}")
+    return "".join(preview)
+
+class ConversionOptions:
+    """
+    Plain values of every user-facing option, as entered in the GUI or on the
+    command line. Empty strings mean "not set".
+    """
+    def __init__(self, input_file: str = "", output_file: str = "") -> None:
+        self.input_file: str = input_file
+        self.output_file: str = output_file
+        self.overwrite: bool = False
+        self.progress_pipe: bool = False
+        # Muxer of a streamed output, one of Defaults.stream_formats; picked from
+        # the extension for pipes, FIFOs and sockets when not set
+        self.stream_format: str = ""
+        self.input_info: MediaInfo | None = None
+        self.capabilities: FFmpegCapabilities | None = None
+        
+        self.preset: Preset | None = None
+        self.hw_accel: str = ""
+        self.seek: str = ""
+        self.duration: str = ""
+        # Look up the keyframe before the seek point (needs a probed input)
+        self.keyframe_seek: bool = True
+        
+        self.copy_video: bool = False
+        self.copy_audio: bool = False
+        
+        self.video_crf: str = ""
+        self.video_bitrate: str = ""
+        # e.g. "8M", replaces CRF and ABR with a two-pass encode that fits the size
+        self.target_size: str = ""
+        self.video_preset: str = ""
+        self.fps: str = ""
+        self.video_width: str = ""
+        self.video_height: str = ""
+        
+        self.audio_bitrate: str = ""
+        self.volume: str = ""
+        # Integrated loudness target in LUFS, e.g. "-23" (EBU R128), replaces the volume
+        self.loudness: str = ""
+    
+    def buildStates(self) -> States:
+        states: States = States()
+        states.setIO(self.input_file, self.output_file)
+        # Progress on stdout would be muxed into a stream written there
+        if self.progress_pipe and not uses_standard_stream(self.output_file):
+            states.setProgressPipe()
+        states.setInputInfo(self.input_info)
+        states.setCapabilities(self.capabilities)
+        
+        ##### Streamed output
+        stream_format: str = self.getStreamFormat()
+        if stream_format:
+            states.setOutputFormat(stream_format)
+        
+        ##### Overwrite
+        # An existing FIFO is the stream's endpoint, FFmpeg only opens it with -y
+        if self.overwrite or (stream_format and is_stream_target(self.output_file)):
+            states.toggleOverwrite()
+        
+        ##### hwaccel
+        if self.hw_accel:
+            states.setHwAccel(self.hw_accel)
+        
+        ##### Presets
+        if self.preset:
+            states.setPreset(self.preset)
+        
+        ##### Seek and Duration
+        if self.seek:
+            states.setSeek(self.seek)
+            seek_seconds: float | None = parse_time_to_seconds(self.seek)
+            if self.keyframe_seek and not self.preset and self.input_info and self.input_info.hasVideo() and seek_seconds:
+                states.setSeekKeyframe(get_media_prober().findKeyframeBefore(self.input_file, seek_seconds))
+        if self.duration:
+            states.setDuration(self.duration)
+        
+        ##### Video Options
+        if not self.preset and not self.copy_video:
+            # Video CRF and ABR, or the bitrate that fits the target size
+            if self.target_size:
+                states.setVideoBitrate(f"{self.getTargetVideoBitrate() // 1000}k")
+                states.setTwoPass(self.getPassLogPrefix())
+            else:
+                if self.video_crf:
+                    states.setVideoCRF(self.video_crf)
+                if self.video_bitrate:
+                    states.setVideoBitrate(self.video_bitrate)
+            
+            # Video Preset
+            if self.video_preset:
+                states.setVideoPreset(self.video_preset)
+            
+            # Video filters
+            video_filters: list[str] = []
+            if self.fps:
+                video_filters.append(f"fps={self.fps}")
+            if self.video_width or self.video_height:
+                video_filters.append(f"scale={self.video_width or '-2'}:{self.video_height or '-2'}")
+            if os.path.splitext(self.output_file)[1].lower() == ".gif":
+                states.addVideoFilter(build_gif_filter(video_filters))
+            else:
+                for video_filter in video_filters:
+                    states.addVideoFilter(video_filter)
+        elif not self.preset:
+            states.setCopyVideo()
+        
+        ##### Audio Options
+        if not self.preset and not self.copy_audio:
+            if self.audio_bitrate:
+                states.setAudioBitrate(self.audio_bitrate)
+            # The loudness is measured on the source, so a volume change would void it
+            if self.loudness:
+                if self.input_info is None or self.input_info.hasAudio():
+                    sample_rate: int = (self.input_info.getSampleRate() if self.input_info else None) or 48000
+                    states.setLoudnessNormalization(self.getLoudnessTarget(), self.getLoudnessMeasurement(), sample_rate)
+            elif self.volume:
+                states.addAudioFilter(f"volume={self.volume}")
+        elif not self.preset:
+            states.setCopyAudio()
+        
+        return states
+    
+    def compile(self) -> tuple[str, list[str]]:
+        return self.buildStates().compileState()
+    
+    def getStreamFormat(self) -> str:
+        # The muxer of a streamed output, "" for a regular file
+        if self.stream_format:
+            return self.stream_format
+        if not self.output_file or not is_stream_target(self.output_file):
+            return ""
+        return Defaults.stream_format_extensions.get(os.path.splitext(self.output_file)[1].lower(), Defaults.default_stream_format)
+    
+    def getOutputDuration(self) -> float | None:
+        # Length of the output, from the probed input and the seek and duration
+        duration: float | None = self.input_info.getDuration() if self.input_info else None
+        if duration is None:
+            return parse_time_to_seconds(self.duration)
+        duration = max(0.0, duration - max(0.0, parse_time_to_seconds(self.seek) or 0.0))
+        requested_duration: float | None = parse_time_to_seconds(self.duration)
+        return min(duration, requested_duration) if requested_duration else duration
+    
+    def getTargetVideoBitrate(self) -> int:
+        """
+        The video bitrate, in bit/s, that fills the target size over the output
+        duration next to the audio, keeping a margin for container overhead.
+        Raises ValueError if the size or duration is unusable.
+        """
+        target_bytes: int | None = parse_size(self.target_size)
+        if not target_bytes or target_bytes <= 0:
+            raise ValueError(f"Invalid target size {self.target_size!r}, expected e.g. 8M or 500k.")
+        duration: float | None = self.getOutputDuration()
+        if not duration:
+            raise ValueError("A target size needs the input duration, which could not be probed.")
+        
+        audio_bitrate: int = 0
+        if self.input_info is None or self.input_info.hasAudio():
+            if self.copy_audio:
+                audio_bitrate = (self.input_info.getAudioBitrate() if self.input_info else None) or Defaults.default_audio_bitrate
+            else:
+                audio_bitrate = (parse_bitrate(self.audio_bitrate) if self.audio_bitrate else None) or Defaults.default_audio_bitrate
+        
+        total_bitrate: float = target_bytes * 8 * (1 - Defaults.container_overhead) / duration
+        video_bitrate: int = int(total_bitrate - audio_bitrate)
+        if video_bitrate < Defaults.min_video_bitrate:
+            raise ValueError(
+                f"Target size {self.target_size} leaves {max(0, video_bitrate) // 1000}k for the video over {duration:.1f}s; "
+                f"raise the size, shorten the duration or lower the audio bitrate."
+            )
+        return video_bitrate
+    
+    def getLoudnessTarget(self) -> float:
+        # Raises ValueError outside the range loudnorm accepts
+        try:
+            target: float = float(self.loudness)
+        except ValueError:
+            target = math.nan
+        if not -70.0 <= target <= -5.0:
+            raise ValueError(f"Invalid loudness target {self.loudness!r}, expected LUFS between -70 and -5, e.g. -23.")
+        return target
+    
+    def probeInput(self) -> MediaInfo | None:
+        """
+        Fills input_info unless it is already set. Blocks for ffprobe when the
+        input isn't cached.
+        """
+        if self.input_info is None:
+            self.input_info = get_media_prober().probe(self.input_file)
+        return self.input_info
+    
+    def needsLoudnessAnalysis(self) -> bool:
+        # Whether the conversion normalizes loudness and no measurement is cached yet
+        if not self.loudness or self.preset or self.copy_audio or (self.input_info and not self.input_info.hasAudio()):
+            return False
+        return self.getLoudnessMeasurement() is None
+    
+    def getLoudnessMeasurement(self) -> LoudnessMeasurement | None:
+        return get_loudness_analyzer().getCached(self.input_file, self.getLoudnessTarget(), self.seek, self.duration)
+    
+    def analyzeLoudness(self, report: Callable[[str], None] | None = None) -> LoudnessMeasurement | None:
+        """
+        Measures the input for a linear loudness normalization, unless the
+        measurement is cached. Blocks for an audio-only decode of the input.
+        """
+        if not self.needsLoudnessAnalysis():
+            return self.getLoudnessMeasurement() if self.loudness else None
+        return get_loudness_analyzer().analyze(self.input_file, self.getLoudnessTarget(), self.seek, self.duration, report)
+    
+    def getPassLogPrefix(self) -> str:
+        # One per output, concurrent jobs never write the same output
+        output_hash: str = hashlib.sha256(os.path.abspath(self.output_file).encode()).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), f"simplyffmpeg_2pass_{output_hash}")
+
+
+def extra_output_paths(output_file: str, presets: list[Preset]) -> list[str]:
+    # "clip_ed.mp4" + [mp3, gif, gif] -> "clip_ed.mp3", "clip_ed.gif", "clip_ed_2.gif"
+    base: str = os.path.splitext(output_file)[0]
+    taken: set[str] = {output_file}
+    paths: list[str] = []
+    for preset in presets:
+        path: str = f"{base}.{preset.getExtension()}"
+        idx: int = 2
+        while path in taken:
+            path = f"{base}_{idx}.{preset.getExtension()}"
+            idx += 1
+        taken.add(path)
+        paths.append(path)
+    return paths
+
+
+class MultiOutputCompiler:
+    """
+    Compiles several ConversionOptions that share one input into a single
+    FFmpeg invocation, so the input is demuxed and decoded once.
+    
+    Filtered outputs get their own branch of a split/asplit graph, unfiltered
+    outputs map the decoded streams directly, and outputs whose encodes are
+    identical share one encoder through the tee muxer.
+    
+    The seek and duration of the first target apply to every output, as one
+    input seek and a -t per output, since presets ignore both on their own.
+    """
+    # Per-output options that are moved into the shared filter graph
+    video_filter_flags: tuple[str, ...] = ("-filter_complex", "-filter:v", "-vf")
+    audio_filter_flags: tuple[str, ...] = ("-filter:a", "-af")
+    
+    def __init__(self, targets: list[ConversionOptions]) -> None:
+        if not targets:
+            raise ValueError("A multi-output job needs at least one output.")
+        if len({target.input_file for target in targets}) != 1:
+            raise ValueError("All outputs of a multi-output job must share the same input file.")
+        self.__targets__: list[ConversionOptions] = targets
+        self.notes: list[str] = []
+    
+    def getNotes(self) -> list[str]:
+        return self.notes
+    
+    @staticmethod
+    def __labelChain__(chain: str, source: str, sink: str, suffix: str) -> str:
+        # Internal labels get a per-output suffix so that two outputs using the
+        # same preset don't clash inside the combined graph
+        chain = re.sub(r"\[(\w+)\]", lambda match: f"[{match.group(1)}_{suffix}]", chain)
+        return f"[{source}]{chain}[{sink}]"
+    
+    @staticmethod
+    def __splitGraph__(stream: str, split_filter: str, chains: dict[int, str], sink_prefix: str) -> list[str]:
+        if not chains:
+            return []
+        if len(chains) == 1:
+            idx, chain = next(iter(chains.items()))
+            return [MultiOutputCompiler.__labelChain__(chain, stream, f"{sink_prefix}{idx}", f"o{idx}")]
+        branches: list[str] = [f"{sink_prefix}split{idx}" for idx in chains]
+        graph: list[str] = [f"[{stream}]{split_filter}={len(chains)}" + "".join(f"[{branch}]" for branch in branches)]
+        for branch, (idx, chain) in zip(branches, chains.items()):
+            graph.append(MultiOutputCompiler.__labelChain__(chain, branch, f"{sink_prefix}{idx}", f"o{idx}"))
+        return graph
+    
+    @staticmethod
+    def __escapeTeePath__(path: str) -> str:
+        return re.sub(r"([\\|\[\]])", r"\\\1", path)
+    
+    def compile(self) -> tuple[str, list[str]]:
+        self.notes = []
+        head: list[str] | None = None
+        overwrite_flags: set[str] = set()
+        
+        ##### One trim for every output, a preset target doesn't seek like a single output
+        main_target: ConversionOptions = self.__targets__[0]
+        seek: str = main_target.seek if not main_target.preset else ""
+        duration: str = main_target.duration if not main_target.preset else ""
+        if seek and main_target.copy_video:
+            self.notes.append("Copied video starts at the keyframe before the seek, as all outputs share one input seek.")
+        
+        ##### Compile every target on its own and untrimmed, then take the per-output part
+        outputs: list[dict] = []
+        for idx, target in enumerate(self.__targets__):
+            untrimmed_target: ConversionOptions = copy.copy(target)
+            untrimmed_target.seek = ""
+            untrimmed_target.duration = ""
+            states: States = untrimmed_target.buildStates()
+            program, arguments = states.compileState()
+            self.notes.extend(f"{os.path.basename(target.output_file)}: {note}" for note in states.getNotes())
+            
+            input_index: int = arguments.index("-i")
+            target_head: list[str] = arguments[:input_index + 2]
+            if head is None:
+                head = target_head
+            elif target_head != head:
+                raise ValueError("All outputs of a multi-output job must share the hardware acceleration options.")
+            overwrite_flags.add(arguments[input_index + 2])
+            
+            options: list[str] = ["-t", duration] if duration else []
+            video_chain: str = ""
+            audio_chain: str = ""
+            for argument in Argument.parseList(arguments[input_index + 3:-1]):
+                flag: str = argument.getFlag()
+                if flag in self.video_filter_flags:
+                    video_chain = ",".join(filter(None, [video_chain, str(argument.getValue())]))
+                elif flag in self.audio_filter_flags:
+                    audio_chain = ",".join(filter(None, [audio_chain, str(argument.getValue())]))
+                else:
+                    options.extend(argument.toList())
+            
+            extension: str = os.path.splitext(target.output_file)[1][1:].lower()
+            video_codec, audio_codec = Defaults.default_codecs.get(extension, ("", ""))
+            outputs.append({
+                "idx": idx,
+                "path": target.output_file,
+                "extension": extension,
+                "options": options,
+                "video": video_codec is not None and "-vn" not in options,
+                "audio": audio_codec is not None and "-an" not in options,
+                "video_chain": video_chain,
+                "audio_chain": audio_chain,
+                "default_codecs": (video_codec, audio_codec),
+            })
+        assert head is not None
+        
+        ##### Outputs with identical encodes share one encoder through tee
+        groups: dict[tuple, list[dict]] = {}
+        for output in outputs:
+            key: tuple = (output["extension"], tuple(output["options"]), output["video"], output["audio"], output["video_chain"], output["audio_chain"])
+            groups.setdefault(key, []).append(output)
+        
+        ##### One split/asplit branch per distinct filter chain
+        encodes: list[list[dict]] = list(groups.values())
+        video_chains: dict[int, str] = {idx: group[0]["video_chain"] for idx, group in enumerate(encodes) if group[0]["video"] and group[0]["video_chain"]}
+        audio_chains: dict[int, str] = {idx: group[0]["audio_chain"] for idx, group in enumerate(encodes) if group[0]["audio"] and group[0]["audio_chain"]}
+        graph: list[str] = [
+            *self.__splitGraph__("0:v:0", "split", video_chains, "v"),
+            *self.__splitGraph__("0:a:0", "asplit", audio_chains, "a"),
+        ]
+        
+        arguments: list[str] = list(head)
+        if seek:
+            arguments[arguments.index("-i"):arguments.index("-i")] = ["-ss", seek]
+        arguments.append("-y" if overwrite_flags == {"-y"} else "-n")
+        if graph:
+            arguments.extend(["-filter_complex", ";".join(graph)])
+        
+        for idx, group in enumerate(encodes):
+            output: dict = group[0]
+            if output["video"]:
+                arguments.extend(["-map", f"[v{idx}]" if idx in video_chains else "0:v:0?"])
+            if output["audio"]:
+                arguments.extend(["-map", f"[a{idx}]" if idx in audio_chains else "0:a:0?"])
+            arguments.extend(output["options"])
+            
+            if len(group) == 1:
+                arguments.append(output["path"])
+                continue
+            # tee can't pick encoders from a file name, so name them explicitly
+            video_codec, audio_codec = output["default_codecs"]
+            if output["video"] and video_codec and not any(flag in output["options"] for flag in ("-c:v", "-vcodec")):
+                arguments.extend(["-c:v", video_codec])
+            if output["audio"] and audio_codec and not any(flag in output["options"] for flag in ("-c:a", "-acodec")):
+                arguments.extend(["-c:a", audio_codec])
+            # Headers go in the stream extradata, since every tee slave writes its own
+            arguments.extend(["-flags", "+global_header"])
+            arguments.extend(["-f", "tee", "|".join(self.__escapeTeePath__(member["path"]) for member in group)])
+            self.notes.append(f"{', '.join(os.path.basename(member['path']) for member in group)} share one encode through the tee muxer.")
+        
+        if len(encodes) > 1:
+            self.notes.append(f"{len(outputs)} outputs are produced from a single decode of the input.")
+        return ("ffmpeg", arguments)
+
+
+def compile_conversion(options: ConversionOptions, extra_presets: list[Preset] | None = None) -> tuple[str, list[list[str]], list[str], list[str], list[str]]:
+    """
+    The commands for `options` as (program, arguments of every pass, notes,
+    extra output files, temporary files). Extra presets are compiled into the
+    same invocation, so the input is decoded once for all of them.
+    Raises ValueError with a user-facing message if the options can't run.
+    """
+    extra_presets = extra_presets or []
+    extra_files: list[str] = extra_output_paths(options.output_file, extra_presets)
+    temporary_files: list[str] = []
+    if extra_files:
+        if is_stream_target(options.output_file):
+            raise ValueError("Extra outputs need a file output, not a stream.")
+        if options.target_size:
+            raise ValueError("A target size can't be combined with extra outputs.")
+        if not options.overwrite and any(os.path.exists(extra_file) for extra_file in extra_files):
+            raise ValueError("An extra output file already exists!\nTick \"Overwrite?\" to replace it.")
+        targets: list[ConversionOptions] = [options]
+        for extra_preset, extra_file in zip(extra_presets, extra_files):
+            target: ConversionOptions = copy.copy(options)
+            target.preset = extra_preset
+            target.output_file = extra_file
+            targets.append(target)
+        compiler: MultiOutputCompiler = MultiOutputCompiler(targets)
+        program, arguments = compiler.compile()
+        passes: list[list[str]] = [arguments]
+        notes: list[str] = compiler.getNotes()
+    else:
+        states: States = options.buildStates()
+        program, passes = states.compilePasses()
+        notes = states.getNotes()
+        temporary_files = states.getTemporaryFiles()
+
+    ##### Reject what this FFmpeg build can't do before starting a process
+    if options.capabilities:
+        problems: list[str] = [problem for pass_arguments in passes for problem in options.capabilities.validateArguments(pass_arguments)]
+        if problems:
+            raise ValueError("\n".join(dict.fromkeys(problems)))
+    return (program, passes, notes, extra_files, temporary_files)
@@ -1,5 +1,6 @@
 import os
-from typing import Any
+import stat
+from typing import Any, Callable
 from sys import stderr
 
 custom_CSS = """
@@ -52,7 +53,31 @@ def print_error(*message: Any) -> None:
     print(*message, sep=" ", file=stderr)
     return
 
-def is_output_path_valid(output_path: str) -> bool:
+# Outputs FFmpeg streams to rather than writes as a file: pipe:[N] and unix:<socket path>
+stream_protocols: tuple[str, ...] = ("pipe:", "unix:")
+
+def is_stream_url(path: str) -> bool:
+    # "-" is FFmpeg's shorthand for standard input or output
+    return path == "-" or path.startswith(stream_protocols)
+
+def uses_standard_stream(path: str) -> bool:
+    return path == "-" or path.startswith("pipe:")
+
+def is_fifo(path: str) -> bool:
+    try:
+        return stat.S_ISFIFO(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return False
+
+def is_stream_target(path: str, is_fifo_path: Callable[[str], bool] = is_fifo) -> bool:
+    # Outputs that can't seek back, and must not be probed, hashed or replaced
+    return is_stream_url(path) or is_fifo_path(path)
+
+def is_output_path_valid(output_path: str, is_directory: Callable[[str], bool] = os.path.isdir, is_fifo_path: Callable[[str], bool] = is_fifo) -> bool:
+    # Streams have no directory or extension to check
+    if is_stream_target(output_path, is_fifo_path):
+        return True
+    
     output_directory: str
     output_file: str
     output_directory, output_file = os.path.split(output_path)
@@ -61,4 +86,99 @@ def is_output_path_valid(output_path: str) -> bool:
     output_file_extension: str
     output_file_name, output_file_extension = os.path.splitext(output_file)
     
-    return os.path.isdir(output_directory) and len(output_file_name) > 0 and len(output_file_extension) > 0
\ No newline at end of file
+    # A bare file name is relative to the working directory
+    return len(output_file_name) > 0 and len(output_file_extension) > 0 and is_directory(output_directory or os.curdir)
+
+def parse_time_to_seconds(time_value: str) -> float | None:
+    """
+    Parses an FFmpeg time duration into seconds. Supported forms:
+        [-][HH:]MM:SS[.m...]
+        [-]S+[.m...][s|ms|us]
+    Returns None if the value cannot be parsed.
+    """
+    value: str = time_value.strip()
+    if not value:
+        return None
+
+    sign: float = 1.0
+    if value.startswith("-"):
+        sign = -1.0
+        value = value[1:]
+
+    try:
+        if ":" in value:
+            parts: list[str] = value.split(":")
+            if len(parts) > 3:
+                return None
+            seconds: float = 0.0
+            for part in parts:
+                seconds = seconds * 60 + float(part)
+            return sign * seconds
+
+        for suffix, scale in (("ms", 1e-3), ("us", 1e-6), ("s", 1.0)):
+            if value.endswith(suffix):
+                return sign * float(value[:-len(suffix)]) * scale
+        return sign * float(value)
+    except ValueError:
+        return None
+
+def format_seconds(seconds: float) -> str:
+    seconds = max(0, int(round(seconds)))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+def get_cache_directory(*sub_directories: str) -> str:
+    if os.name == "nt":
+        base_directory: str = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base_directory = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    cache_directory: str = os.path.join(base_directory, "SimplyFFmpeg", *sub_directories)
+    os.makedirs(cache_directory, exist_ok=True)
+    return cache_directory
+
+def get_file_identity(file_path: str) -> tuple[str, int, int] | None:
+    """
+    Identifies a file by (absolute path, size, mtime in ns), so that caches
+    keyed on it are invalidated whenever the file is modified. Only regular
+    files have one: reading ahead from a FIFO would steal its stream.
+    """
+    try:
+        stat_result: os.stat_result = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    if not stat.S_ISREG(stat_result.st_mode):
+        return None
+    return (os.path.abspath(file_path), stat_result.st_size, stat_result.st_mtime_ns)
+
+def parse_bitrate(bitrate: str) -> int | None:
+    # e.g. "2500k" -> 2500000, "1.5M" -> 1500000
+    value: str = bitrate.strip()
+    scale: int = 1
+    if value and value[-1] in "kKmMgG":
+        scale = {"k": 10**3, "m": 10**6, "g": 10**9}[value[-1].lower()]
+        value = value[:-1]
+    try:
+        return int(float(value) * scale)
+    except ValueError:
+        return None
+
+def parse_size(size: str) -> int | None:
+    # e.g. "8M" or "8MB" -> 8000000, "8MiB" -> 8388608, "500k" -> 500000
+    value: str = size.strip()
+    binary: bool = value.lower().endswith("ib")
+    value = value[:-2] if binary else value.rstrip("bB")
+    scale: int = 1
+    if value and value[-1] in "kKmMgG":
+        scale = (1024 if binary else 1000) ** ("kmg".index(value[-1].lower()) + 1)
+        value = value[:-1]
+    try:
+        return int(float(value) * scale)
+    except ValueError:
+        return None
+
+def derive_output_path(input_path: str, output_directory: str, extension: str) -> str:
+    # "<dir>/clip.mov" -> "<output dir or dir>/clip_ed.<extension>"
+    input_file_name: str = os.path.splitext(os.path.basename(input_path))[0]
+    final_directory: str = output_directory if os.path.isdir(output_directory) else os.path.dirname(input_path)
+    return os.path.join(final_directory, f"{input_file_name}_ed.{extension}")
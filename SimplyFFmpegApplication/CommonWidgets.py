@@ -1,118 +1,42 @@
 from SimplyFFmpegApplication.CommonHelpers import print_error, print_log
+from SimplyFFmpegApplication.LogPipeline import LogBuffer
+# The argument model is Qt-free; re-exported here for existing imports
+from SimplyFFmpegApplication.CommandModel import Argument, Defaults, Preset, States, StreamTarget
 
 
 from PyQt6.QtWidgets import (
     QWidget, 
+    QGroupBox,
     QHBoxLayout, 
+    QVBoxLayout,
     QLabel, 
     QLineEdit, 
+    QPlainTextEdit,
     QRadioButton
 )
-from PyQt6.QtCore import QProcess, pyqtSignal
+from PyQt6.QtCore import QObject, QProcess, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont
 
 
-class Argument:
-    def __init__(self, flag: str, value: str | None = None) -> None:
-        # If value is None, the Argument does not take any value
-        self.__flag__: str = flag
-        self.__value__: str | None = value
-    
-    def getFlag(self) -> str:
-        return self.__flag__
-    def setFlag(self, flag: str) -> None:
-        self.__flag__ = flag
-    
-    def getValue(self) -> str | None:
-        return self.__value__
-    def setValue(self, value: str) -> None:
-        self.__value__ = value
-    def appendValue(self, value: str) -> None:
-        if not self.__value__:
-            self.__value__ = value
-            return
-        self.__value__ += f",{value}"
-        
-    def toList(self) -> list[str]:
-        if self.__value__:
-            return [self.__flag__, self.__value__]
-        return [self.__flag__]
-    
-    def __str__(self) -> str:
-        string: str = self.__flag__
-        if self.__value__:
-            string += f" {self.__value__}"
-        return string
+import threading
+from typing import Any, Callable, Hashable
 
-class Preset:
-    def __init__(self, title: str, extension: str, options: list[Argument]) -> None:
-        self.__title__: str = title
-        self.__extension__: str = extension
-        self.__options__: list[Argument] = options
-    
-    def getTitle(self) -> str:
-        return self.__title__
-    def getExtension(self) -> str:
-        return self.__extension__
-    def getOptions(self) -> list[Argument]:
-        return self.__options__
-    def getOptionsAsStr(self) -> list[str]:
-        options: list[str] = []
-        for option in self.__options__:
-            flag: str = option.getFlag()
-            value: str | None = option.getValue()
-            options.append(flag)
-            if value:
-                options.append(value)
-        return options
-    
-    def __str__(self) -> str:
-        return f"{self.__title__ } ({self.__extension__}, {[str(i) for i in self.__options__]})"
-
-class Defaults:
-    presets_list: list[Preset] = [
-        Preset("None", "mp4", []),
-        Preset("Twitter Video", "mp4", [
-            Argument("-b:v", "2500k"),
-            Argument("-filter:v", "fps=60"), 
-            Argument("-c:a", "copy")
-        ]),
-        Preset("To mp3 (192k)", "mp3", [
-            Argument("-b:a", "192k")
-        ]),
-        Preset("To GIF", "gif", [
-            Argument("-sws_flags", "neighbor+full_chroma_int+accurate_rnd"),
-            Argument("-sws_dither", "a_dither"),
-        ]),
-    ]
-    
-    extensions_list: list[str] = [
-        "mp4",
-        "mp3",
-        "gif",
-        "jpg",
-        "png",
-        "webp"
-    ]
-    
-    video_presets_list: list[str] = [
-        "ultrafast",
-        "superfast",
-        "veryfast",
-        "faster",
-        "fast",
-        "medium",
-        "slow",
-        "slower",
-        "veryslow"
-    ]
 
 class GlobalSignals(QWidget):
     extensionChanged: pyqtSignal = pyqtSignal(str)
+    # Several files or directories picked at once, each becomes its own job
+    pathsDropped: pyqtSignal = pyqtSignal(list)
+    # What the FFmpeg binary supports, once listed in the background
+    capabilitiesLoaded: pyqtSignal = pyqtSignal(object)
     def __init__(self) -> None:
         super().__init__()
     
     def emitExtensionChanged(self, value: str) -> None:
         self.extensionChanged.emit(value)
+    def emitPathsDropped(self, paths: list[str]) -> None:
+        self.pathsDropped.emit(paths)
+    def emitCapabilitiesLoaded(self, capabilities: object) -> None:
+        self.capabilitiesLoaded.emit(capabilities)
 
 class SharedStates:
     def __init__(self) -> None:
@@ -126,130 +50,45 @@ class SharedStates:
         self.extension = newExtension
         return
 
-class States(QWidget):
-    def __init__(self) -> None:
-        super().__init__()
-        
-        self.input_file: Argument | None = None
-        self.output_file: Argument | None = None
-        self.overwrite_flag: Argument = Argument("-n")
-        self.preset: Preset | None = None
-        
-        # self.extension: str | None = None
-        self.copy_video: Argument | None = None
-        self.copy_audio: Argument | None = None
-        
-        self.hw_accel: Argument | None = None
-        
-        self.seek: Argument | None = None
-        self.duration: Argument | None = None
-        
-        self.video_crf: Argument | None = None
-        self.video_bitrate: Argument | None = None
-        self.video_preset: Argument | None = None
-        self.video_filters: Argument | None = None
-        
-        self.audio_bitrate: Argument | None = None
-        self.audio_filters: Argument | None = None
-    
-    def setIO(self, input_file: str, output_file: str) -> None:
-        self.input_file = Argument("-i", input_file)
-        self.output_file = Argument(output_file)
-    def setPreset(self, preset: Preset) -> None:
-        self.preset = preset
-    # def setExtension(self, extension: str) -> None:
-    #     self.extension = extension
-    def toggleOverwrite(self) -> None:
-        self.overwrite_flag.setFlag("-y")
-    def setCopyVideo(self) -> None:
-        self.copy_video = Argument("-c:v", "copy")
-    def setCopyAudio(self) -> None:
-        self.copy_audio = Argument("-c:a", "copy")
-        
-    def setHwAccel(self, hwaccel: str) -> None:
-        self.hw_accel = Argument("-hwaccel", hwaccel)
-    
-    def setSeek(self, seek: str) -> None:
-        self.seek = Argument("-ss", seek)
-    def setDuration(self, duration: str) -> None:
-        self.duration = Argument("-t", duration)
-        
-    def setVideoCRF(self, video_crf: str) -> None:
-        self.video_crf = Argument("-crf", video_crf)
-    def setVideoBitrate(self, video_bitrate: str) -> None:
-        self.video_bitrate = Argument("-b:v", video_bitrate)
-    def setVideoPreset(self, video_preset: str) -> None:
-        self.video_preset = Argument("-preset", video_preset)
-    def addVideoFilter(self, video_filter: str) -> None:
-        if self.video_filters is None:
-            self.video_filters = Argument("-filter_complex", "")
-        self.video_filters.appendValue(video_filter)
-        
-    def setAudioBitrate(self, audio_bitrate: str) -> None:
-        self.audio_bitrate = Argument("-b:a", audio_bitrate)
-    def addAudioFilter(self, audio_filter: str) -> None:
-        if self.audio_filters is None:
-            self.audio_filters = Argument("-filter:a", "")
-        self.audio_filters.appendValue(audio_filter)
-        
-    # Compiler
-    def compileState(self) -> tuple[str, list[str]]:
-        program: str = "ffmpeg"
-        arguments: list[str] = []
-        
-        # hwaccel
-        if self.hw_accel:
-            arguments.extend(self.hw_accel.toList())
-        
-        # Input
-        if not self.input_file:
-            raise Exception("Missing input file value. If you're seeing this, the initial verification failed.")
-        arguments.extend(self.input_file.toList())
-        
-        # Overwrite
-        arguments.extend(self.overwrite_flag.toList())
-        
-        # Preset
-        if self.preset:
-            arguments.extend(self.preset.getOptionsAsStr())
-            
-        # Options (No Preset)
-        if not self.preset:
-            # if self.extension:
-            #     arguments.append(self.extension)
-            if self.copy_video:
-                arguments.extend(self.copy_video.toList())
-            if self.copy_audio:
-                arguments.extend(self.copy_audio.toList())
-            
-            if self.seek:
-                arguments.extend(self.seek.toList())
-            if self.duration:
-                arguments.extend(self.duration.toList())
-        
-        if not self.preset and not self.copy_video:
-            if self.video_crf:
-                arguments.extend(self.video_crf.toList())
-            if self.video_bitrate:
-                arguments.extend(self.video_bitrate.toList())
-            if self.video_preset:
-                arguments.extend(self.video_preset.toList())
-            if self.video_filters:
-                arguments.extend(self.video_filters.toList())
-        
-        if not self.preset and not self.copy_audio:
-            if self.audio_bitrate:
-                arguments.extend(self.audio_bitrate.toList())
-            if self.audio_filters:
-                arguments.extend(self.audio_filters.toList())
-        
-        # Output
-        if not self.output_file:
-            raise Exception("Missing output file value. If you're seeing this, the initial verification failed.")
-        arguments.extend(self.output_file.toList())
-        
-        # Finally
-        return (program, arguments)
+class BackgroundTask(QObject):
+    """
+    Runs a blocking callable on a Python thread. The callable receives a
+    report(str) function; reports, the result and errors are delivered back
+    on the GUI thread through signals.
+    """
+    reported: pyqtSignal = pyqtSignal(str)
+    succeeded: pyqtSignal = pyqtSignal(object)
+    failed: pyqtSignal = pyqtSignal(str)
+    
+    def __init__(self, task: Callable[[Callable[[str], None]], Any], *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.__task__: Callable[[Callable[[str], None]], Any] = task
+        self.__thread__: threading.Thread = threading.Thread(target=self.__run__, daemon=True)
+    
+    def start(self) -> None:
+        self.__thread__.start()
+    def isRunning(self) -> bool:
+        return self.__thread__.is_alive()
+    
+    def __run__(self) -> None:
+        try:
+            result: Any = self.__task__(self.__report__)
+        except Exception as error:
+            print_error(f"Background task failed: {error}")
+            self.__emit__(lambda: self.failed.emit(str(error)))
+            return
+        self.__emit__(lambda: self.succeeded.emit(result))
+    
+    def __report__(self, message: str) -> None:
+        self.__emit__(lambda: self.reported.emit(message))
+    
+    @staticmethod
+    def __emit__(emit: Callable[[], None]) -> None:
+        try:
+            emit()
+        except RuntimeError:
+            # The owner, and this task with it, was destroyed while it ran, e.g. on quit
+            pass
 
 class FFmpegWorkerProcess(QProcess):
     def __init__(self, *args, **kwargs) -> None:
@@ -308,4 +147,80 @@ class QRadioTextButton(QRadioButton):
     def getParent(self) -> QRadioText:
         return self.__parent_radio__
     def getValue(self) -> str:
-        return self.__parent_radio__.getValue()
\ No newline at end of file
+        return self.__parent_radio__.getValue()
+
+class QBufferedConsole(QPlainTextEdit):
+    """
+    Read-only console fed through a LogBuffer. Text is batched and flushed to
+    the widget by a timer, and the widget never holds more than `line_cap` lines.
+    """
+    def __init__(self, line_cap: int = 5000, flush_interval_ms: int = 250, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.setFont(QFont("Lucida Console"))
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(line_cap)
+
+        self.__log_buffer__: LogBuffer = LogBuffer(line_cap)
+        self.__flush_timer__: QTimer = QTimer(self)
+        self.__flush_timer__.setInterval(flush_interval_ms)
+        self.__flush_timer__.timeout.connect(self.flush)
+        self.__flush_timer__.start()
+
+    def getLogBuffer(self) -> LogBuffer:
+        return self.__log_buffer__
+
+    def setLineCap(self, line_cap: int) -> None:
+        self.__log_buffer__.setLineCap(line_cap)
+        self.setMaximumBlockCount(line_cap)
+
+    def write(self, data: bytes, source: Hashable = None, label: str | None = None) -> None:
+        self.__log_buffer__.write(data, source, label)
+    def writeText(self, text: str, source: Hashable = None, label: str | None = None) -> None:
+        self.__log_buffer__.writeText(text, source, label)
+    def finishSource(self, source: Hashable = None, label: str | None = None) -> None:
+        self.__log_buffer__.finishSource(source, label)
+
+    def flush(self) -> None:
+        lines: list[str] = self.__log_buffer__.takePending()
+        if not lines:
+            return
+        scroll_bar = self.verticalScrollBar()
+        at_bottom: bool = scroll_bar is None or scroll_bar.value() == scroll_bar.maximum()
+        self.appendPlainText("\n".join(lines))
+        if at_bottom and scroll_bar is not None:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def clearLog(self) -> None:
+        self.__log_buffer__.clear()
+        self.clear()
+
+class QLazyGroupBox(QGroupBox):
+    """
+    Collapsible group box whose contents are only built the first time it is
+    expanded. While collapsed, its options are ignored.
+    """
+    def __init__(self, title: str, builder: Callable[[QWidget], None], *args, **kwargs) -> None:
+        super().__init__(title, *args, **kwargs)
+        self.__builder__: Callable[[QWidget], None] | None = builder
+        self.__content__: QWidget | None = None
+        
+        self.__main_layout__ = QVBoxLayout(self)
+        self.__main_layout__.setContentsMargins(0,0,0,0)
+        self.setCheckable(True)
+        self.setChecked(False)
+        self.toggled.connect(self.__onToggled__)
+    
+    def isExpanded(self) -> bool:
+        return self.isChecked() and self.__content__ is not None
+    
+    def getContent(self) -> QWidget | None:
+        return self.__content__
+    
+    def __onToggled__(self, checked: bool) -> None:
+        if checked and self.__builder__ is not None:
+            self.__content__ = QWidget(self)
+            self.__builder__(self.__content__)
+            self.__builder__ = None
+            self.__main_layout__.addWidget(self.__content__)
+        if self.__content__ is not None:
+            self.__content__.setVisible(checked)
@@ -1,12 +1,29 @@
 from SimplyFFmpegApplication.WidgetFFmpegOptions import Widget_FFmpegOptions
 from SimplyFFmpegApplication.WidgetInputOutput import Widget_InputOutput
-from SimplyFFmpegApplication.CommonHelpers import print_error, print_log, custom_CSS
-from SimplyFFmpegApplication.CommonWidgets import FFmpegWorkerProcess, GlobalSignals, Preset, QRadioTextButton, SharedStates, States
+from SimplyFFmpegApplication.Capabilities import get_capability_registry
+from SimplyFFmpegApplication.CommonHelpers import print_error, custom_CSS
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, Preset, compile_conversion, format_command_preview
+from SimplyFFmpegApplication.CommonWidgets import BackgroundTask, GlobalSignals, QBufferedConsole, QRadioTextButton, SharedStates
+from SimplyFFmpegApplication.JobQueue import FFmpegJobQueue
+from SimplyFFmpegApplication.Jobs import Job, QueueStatistics
+from SimplyFFmpegApplication.MediaProbe import MediaInfo, get_media_prober
+from SimplyFFmpegApplication.ResultCache import get_result_cache
 
 
-from PyQt6.QtCore import QProcess
-from PyQt6.QtGui import QFont, QTextCursor
-from PyQt6.QtWidgets import QAbstractButton, QButtonGroup, QGroupBox, QHBoxLayout, QMainWindow, QMessageBox, QPlainTextEdit, QPushButton, QStatusBar, QVBoxLayout, QWidget
+from PyQt6.QtCore import QProcess, QTimer
+from PyQt6.QtGui import QFont, QPaintEvent
+from PyQt6.QtWidgets import QAbstractButton, QAbstractItemView, QButtonGroup, QCheckBox, QDialog, QFileDialog, QGroupBox, QHBoxLayout, QHeaderView, QLabel, QMainWindow, QMessageBox, QPlainTextEdit, QProgressBar, QPushButton, QSpinBox, QStatusBar, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+
+import copy
+import os
+import queue
+import threading
+from typing import TYPE_CHECKING, Callable
+if TYPE_CHECKING:
+    from SimplyFFmpegApplication.BulkIngest import BulkIngestResult
+    from SimplyFFmpegApplication.ParallelEncode import ParallelEncodeResult
+    from SimplyFFmpegApplication.SmartCut import SmartCutResult
 
 
 class SimplyFFmpeg(QMainWindow):
@@ -84,8 +101,18 @@ class SimplyFFmpeg(QMainWindow):
         # preview_button.setStyleSheet("padding: 1em;")
         preview_button.clicked.connect(self.previewCommand)
         
+        estimate_button = QPushButton("Estimate")
+        estimate_button.setToolTip("Encode a few short samples to estimate the output size and encode time")
+        estimate_button.clicked.connect(self.estimateConversion)
+        self.estimate_task: BackgroundTask | None = None
+        self.loudness_task: BackgroundTask | None = None
+        self.compile_task: BackgroundTask | None = None
+
+        preview_buttons_layout = QHBoxLayout(None)
+        preview_buttons_layout.addWidget(preview_button)
+        preview_buttons_layout.addWidget(estimate_button)
         preview_layout.addWidget(self.command_preview)
-        preview_layout.addWidget(preview_button)
+        preview_layout.addLayout(preview_buttons_layout)
 
         ##############################
         # Convert Section
@@ -96,29 +123,136 @@ class SimplyFFmpeg(QMainWindow):
         convert_button.clicked.connect(self.convertVideo)
         # right_central_layout.addSpacing(50)
 
-        ##### Initialize FFmpeg worker
-        self.worker_process = FFmpegWorkerProcess()
-        self.worker_process.readyReadStandardOutput.connect(self.onStdoutSignal)
-        self.worker_process.readyReadStandardError.connect(self.onStderrSignal)
-        self.worker_process.started.connect(self.onStartedSignal)
-        self.worker_process.finished.connect(self.onFinishedSignal)
+        ##### Initialize FFmpeg job queue
+        self.job_queue = FFmpegJobQueue(parent=self)
+        self.job_queue.jobStderr.connect(self.onStderrSignal)
+        self.job_queue.jobStatusChanged.connect(self.onJobStatusChanged)
+        self.job_queue.jobProgress.connect(self.onJobProgress)
+        self.job_queue.queueDrained.connect(self.onQueueDrained)
+
+        ##### Multiple dropped files and folders are probed and queued in the background
+        self.shared_states.signals.pathsDropped.connect(self.ingestPaths)
+        self.ingest_task: BackgroundTask | None = None
+        self.ingest_stop: threading.Event = threading.Event()
+        self.ingested_jobs: queue.SimpleQueue[Job] = queue.SimpleQueue()
+
+        ##### Job queue section
+        queue_widget = QGroupBox("Job Queue")
+        queue_layout = QVBoxLayout(queue_widget)
+        right_central_layout.addWidget(queue_widget)
+
+        self.queue_table = QTableWidget(0, 5, queue_widget)
+        self.queue_table.setHorizontalHeaderLabels(["#", "Output", "Status", "Progress", "ETA / Speed"])
+        self.queue_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        queue_header: QHeaderView | None = self.queue_table.horizontalHeader()
+        if queue_header:
+            queue_header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        vertical_header: QHeaderView | None = self.queue_table.verticalHeader()
+        if vertical_header:
+            vertical_header.setVisible(False)
+        self.queue_rows: dict[int, int] = {}
+        queue_layout.addWidget(self.queue_table)
+
+        queue_controls_layout = QHBoxLayout(None)
+        queue_layout.addLayout(queue_controls_layout)
+
+        queue_controls_layout.addWidget(QLabel("Workers:"))
+        self.worker_count = QSpinBox(queue_widget)
+        self.worker_count.setRange(1, 64)
+        self.worker_count.setValue(self.job_queue.getWorkerCount())
+        self.worker_count.valueChanged.connect(self.job_queue.setWorkerCount)
+        queue_controls_layout.addWidget(self.worker_count)
+
+        self.pin_cpus = QCheckBox("Pin CPUs", queue_widget)
+        self.pin_cpus.setToolTip("Give each running job its own share of the CPU cores")
+        self.pin_cpus.toggled.connect(self.job_queue.setAffinityPinning)
+        queue_controls_layout.addWidget(self.pin_cpus)
+
+        self.reuse_results = QCheckBox("Reuse Results", queue_widget)
+        self.reuse_results.setToolTip("Copy the output of an identical earlier conversion instead of encoding again")
+        # The result cache loads its disk index, finishStartup attaches it
+        self.reuse_results.setChecked(True)
+        self.reuse_results.toggled.connect(lambda checked: self.job_queue.setResultCache(get_result_cache() if checked else None))
+        queue_controls_layout.addWidget(self.reuse_results)
+
+        queue_controls_layout.addWidget(QLabel("Segments:"))
+        self.segment_count = QSpinBox(queue_widget)
+        self.segment_count.setRange(1, 64)
+        self.segment_count.setToolTip("Split the input at keyframes and encode the segments in parallel (1 = off)")
+        queue_controls_layout.addWidget(self.segment_count)
+        self.measure_baseline = QCheckBox("Measure Speedup", queue_widget)
+        self.measure_baseline.setToolTip("After a parallel encode, time a single-process encode of the same input to report the speedup")
+        queue_controls_layout.addWidget(self.measure_baseline)
+        self.parallel_tasks: list[BackgroundTask] = []
+
+        self.queue_statistics = QLabel("")
+        queue_controls_layout.addWidget(self.queue_statistics, 1)
+
+        metrics_button = QPushButton("Metrics...")
+        metrics_button.setToolTip("Resource usage of finished jobs")
+        metrics_button.clicked.connect(self.showMetrics)
+        queue_controls_layout.addWidget(metrics_button)
+
+        cancel_button = QPushButton("Cancel All")
+        cancel_button.clicked.connect(self.cancelAll)
+        queue_controls_layout.addWidget(cancel_button)
 
         ##### Console output area
-        self.output_area = QPlainTextEdit()
-        self.output_area.setFont(QFont("Lucida Console"))
-        self.output_area.setReadOnly(True)
-        self.output_area.ensureCursorVisible()
-        # self.output_area.setCenterOnScroll(True)
+        self.output_area = QBufferedConsole(parent=self)
         
         right_central_layout.addWidget(self.output_area)
+
+        self.log_file_button = QPushButton("Save Full Log to File...")
+        self.log_file_button.setCheckable(True)
+        self.log_file_button.toggled.connect(self.toggleLogFile)
+        right_central_layout.addWidget(self.log_file_button)
         right_central_layout.addWidget(convert_button)
 
+        ##### Everything the first paint doesn't need waits until it is on screen
+        # A zero timer set here would still fire before the first paint
+        self.capabilities_task: BackgroundTask | None = None
+        self.startup_pending: bool = True
+
         ##### Status Bar
         self.setStatusBarStatus("Ready")
 
+    def paintEvent(self, a0: QPaintEvent | None) -> None:
+        super().paintEvent(a0)
+        if self.startup_pending:
+            self.startup_pending = False
+            QTimer.singleShot(0, self.finishStartup)
+
+    def finishStartup(self) -> None:
+        # Deferred, the metrics module pulls in the HTTP server
+        from SimplyFFmpegApplication.JobMetrics import get_metrics_recorder
+        self.job_queue.setMetricsRecorder(get_metrics_recorder())
+        if self.reuse_results.isChecked():
+            self.job_queue.setResultCache(get_result_cache())
+
+        ##### List what the FFmpeg binary supports
+        self.capabilities_task = BackgroundTask(lambda report: get_capability_registry().load(), self)
+        self.capabilities_task.succeeded.connect(self.shared_states.signals.emitCapabilitiesLoaded)
+        self.capabilities_task.start()
+        return
+
     def appendOutput(self, text: str | None) -> None:
-        self.output_area.moveCursor(QTextCursor.MoveOperation.End)
-        self.output_area.insertPlainText(text)
+        if text:
+            self.output_area.writeText(text)
+        return
+
+    def toggleLogFile(self, checked: bool) -> None:
+        log_buffer = self.output_area.getLogBuffer()
+        if not checked:
+            log_buffer.stopSpill()
+            self.log_file_button.setText("Save Full Log to File...")
+            return
+
+        file_name: str = QFileDialog.getSaveFileName(self, "Save Log File", "ffmpeg.log", "Log files (*.log *.txt)")[0]
+        if not (file_name and log_buffer.startSpill(file_name)):
+            self.log_file_button.setChecked(False)
+            return
+        self.log_file_button.setText(f"Logging to {file_name}")
         return
 
     def displayCriticalError(self, text: str | None) -> None:
@@ -130,9 +264,51 @@ class SimplyFFmpeg(QMainWindow):
     def displayInfo(self, text: str | None) -> None:
         QMessageBox.information(self, "Information", text)
 
-    def compileCommand(self) -> tuple[str, list[str]] | None:
-        states: States = States()
-        
+    def compileCommand(self, then: Callable[[ConversionOptions, tuple[str, list[list[str]], list[str], list[str], list[str]]], None]) -> None:
+        """
+        Compiles the commands for the current options as (program, arguments
+        of every pass, notes, extra output files, temporary files) and hands
+        them to `then`. Checked extra outputs are compiled into the same
+        invocation, so the input is decoded once for all of them. Compiling
+        may run ffprobe on an uncached input and to find the keyframe before
+        the seek point, so it happens in the background.
+        """
+        if self.compile_task is not None:
+            self.displayInfo("The command is still being compiled.")
+            return
+        options: ConversionOptions | None = self.collectOptions()
+        if options is None:
+            return
+        extra_presets: list[Preset] = self.options_widget.getExtraPresets()
+        def compile_in_background(report: Callable[[str], None]) -> tuple[str, list[list[str]], list[str], list[str], list[str]]:
+            options.capabilities = options.capabilities or get_capability_registry().load()
+            options.probeInput()
+            return compile_conversion(options, extra_presets)
+
+        task = BackgroundTask(compile_in_background, self)
+        task.succeeded.connect(lambda full_command: self.onCommandCompiled(options, full_command, None, then))
+        task.failed.connect(lambda message: self.onCommandCompiled(options, None, message, then))
+        self.compile_task = task
+        self.setStatusBarStatus("Compiling the command...")
+        task.start()
+        return
+
+    def onCommandCompiled(
+        self, options: ConversionOptions, full_command: tuple[str, list[list[str]], list[str], list[str], list[str]] | None,
+        error: str | None, then: Callable[[ConversionOptions, tuple[str, list[list[str]], list[str], list[str], list[str]]], None]
+    ) -> None:
+        if self.compile_task is not None:
+            self.compile_task.deleteLater()
+            self.compile_task = None
+        if not self.job_queue.isActive():
+            self.setStatusBarStatus("Ready")
+        if full_command is None:
+            self.displayError(error or "The command could not be compiled.")
+            return
+        then(options, full_command)
+        return
+
+    def collectOptions(self) -> ConversionOptions | None:
         ##### Validate IO
         input_file: str = self.io_widget.input_field.text()
         output_file: str = self.io_widget.output_field.text()
@@ -153,16 +329,29 @@ class SimplyFFmpeg(QMainWindow):
             elif output_file_validity == -1 and not self.options_widget.overwrite.isChecked():
                 self.displayError("Please fix the output field.\nOutput file already exists!")
                 return
-            
-        states.setIO(input_file, output_file)
+
+        options: ConversionOptions | None = self.readOptions(input_file, output_file)
+        # Probing may run ffprobe, the background tasks probe on a cache miss
+        if options is not None:
+            options.input_info = get_media_prober().getCached(input_file)
+        return options
+
+    def readOptions(self, input_file: str, output_file: str) -> ConversionOptions | None:
+        """
+        The options set in the options panel for the given files, without
+        validating or probing them.
+        """
+        options: ConversionOptions = ConversionOptions(input_file, output_file)
+        options.progress_pipe = True
+        # Loaded in the background at startup, compiling waits for it off the GUI thread
+        options.capabilities = get_capability_registry().getCached()
         
         ##### Overwrite
-        if self.options_widget.overwrite.isChecked():
-            states.toggleOverwrite()
+        options.overwrite = self.options_widget.overwrite.isChecked()
+        options.stream_format = self.options_widget.getStreamFormat()
             
         ##### hwaccel
-        if self.options_widget.hwaccel.getValue():
-            states.setHwAccel(self.options_widget.hwaccel.getValue())
+        options.hw_accel = self.options_widget.getHwAccel()
         
         ##### Check for presets
         has_selected_preset: bool = self.options_widget.preset.currentIndex() != 0
@@ -171,148 +360,442 @@ class SimplyFFmpeg(QMainWindow):
             if type(preset) is not Preset or not preset:
                 QMessageBox.warning(self, "Error", "FATAL ERROR! Preset data is invalid.")
                 return
-            states.setPreset(preset)
+            options.preset = preset
             
         ##### Seek and Duration
-        seek: str = self.options_widget.seek.getValue()
-        if seek:
-            states.setSeek(seek)
-        duration: str = self.options_widget.duration.getValue()
-        if duration:
-            states.setDuration(duration)
+        options.seek = self.options_widget.getSeek()
+        options.duration = self.options_widget.getDuration()
         
         ##### Get values from options
         # Video Options
+        options.copy_video = self.options_widget.copy_video.isChecked()
+
+        # Video CRF and ABR
+        crf_radio_button: QAbstractButton | None = self.options_widget.video_bitrate_form.button(0)
         if (
-            not has_selected_preset
-            and not self.options_widget.copy_video.isChecked()
+            crf_radio_button is not None
+            and crf_radio_button.isChecked()
+            and type(crf_radio_button) is QRadioTextButton
         ):
-            # Video CRF and ABR
-            crf_radio_button: QAbstractButton | None = self.options_widget.video_bitrate_form.button(0)
-            if (
-                crf_radio_button is not None
-                and crf_radio_button.isChecked()
-                and type(crf_radio_button) is QRadioTextButton
-                and crf_radio_button.getValue() != ""
-            ):
-                states.setVideoCRF(crf_radio_button.getValue())
-
-            abr_radio_button: QAbstractButton | None = self.options_widget.video_bitrate_form.button(1)
-            if (
-                abr_radio_button is not None
-                and abr_radio_button.isChecked()
-                and type(abr_radio_button) is QRadioTextButton
-                and abr_radio_button.getValue() != ""
-            ):
-                states.setVideoBitrate(abr_radio_button.getValue())
-                
-            # Video Preset
-            video_preset: str = self.options_widget.video_preset.currentData()
-            states.setVideoPreset(video_preset)
-
-            # Video filters
-            fps: str = self.options_widget.fps.getValue()
-            if (fps):
-                states.addVideoFilter(f"fps={fps}")
-                
-            video_width: str = self.options_widget.video_width.getValue()
-            video_height: str = self.options_widget.video_height.getValue()
-            if (video_width or video_height):
-                if not video_height:
-                    video_height = "-2"
-                if not video_width:
-                    video_width = "-2"
-                states.addVideoFilter(f"scale={video_width}:{video_height}")
-
-        elif (self.options_widget.preset.currentIndex() == 0):
-            states.setCopyVideo()
+            options.video_crf = crf_radio_button.getValue()
 
-        # Audio Options
+        abr_radio_button: QAbstractButton | None = self.options_widget.video_bitrate_form.button(1)
+        if (
+            abr_radio_button is not None
+            and abr_radio_button.isChecked()
+            and type(abr_radio_button) is QRadioTextButton
+        ):
+            options.video_bitrate = abr_radio_button.getValue()
+
+        target_size_radio_button: QAbstractButton | None = self.options_widget.video_bitrate_form.button(2)
         if (
-            not has_selected_preset
-            and not self.options_widget.copy_audio.isChecked()
+            target_size_radio_button is not None
+            and target_size_radio_button.isChecked()
+            and type(target_size_radio_button) is QRadioTextButton
         ):
-            audio_bitrate: str = self.options_widget.audio_bitrate.getValue()
-            if (audio_bitrate):
-                states.setAudioBitrate(audio_bitrate)
-            volume: str = self.options_widget.volume.getValue()
-            if (volume):
-                states.addAudioFilter(f"volume={volume}")
+            options.target_size = target_size_radio_button.getValue()
+            
+        # Video Preset
+        options.video_preset = self.options_widget.video_preset.currentData()
+
+        # Video filters
+        options.fps = self.options_widget.fps.getValue()
+        options.video_width = self.options_widget.video_width.getValue()
+        options.video_height = self.options_widget.video_height.getValue()
 
-        elif (self.options_widget.preset.currentIndex() == 0):
-            states.setCopyAudio()
+        # Audio Options
+        options.copy_audio = self.options_widget.copy_audio.isChecked()
+        options.audio_bitrate = self.options_widget.audio_bitrate.getValue()
+        options.volume = self.options_widget.volume.getValue()
+        options.loudness = self.options_widget.loudness.getValue()
 
-        ##### Set FFmpeg command
-        return states.compileState()
+        return options
 
     def previewCommand(self) -> None:
-        full_command: tuple[str, list[str]] | None = self.compileCommand()
-        if full_command is None:
-            return
-        program, arguments = full_command
+        self.compileCommand(self.showCommandPreview)
+        return
+
+    def showCommandPreview(self, options: ConversionOptions, full_command: tuple[str, list[list[str]], list[str], list[str], list[str]]) -> None:
+        program, passes, notes, _, _ = full_command
         
         self.command_preview.clear()
-        self.command_preview.appendPlainText(program)
-        
-        prev_argument: str = ""
-        for argument in arguments[:-1]:
-            if argument[0] == "-" or (prev_argument and prev_argument[0] != "-"):
-                self.command_preview.insertPlainText("\n    ")
-            else:
-                self.command_preview.insertPlainText(" ")
-                
-            if argument[0] == "-":
-                self.command_preview.insertPlainText("[" + argument + "]")
-            else:
-                self.command_preview.insertPlainText(argument)
-            self.command_preview.moveCursor(QTextCursor.MoveOperation.End)
-            prev_argument = argument
-        self.command_preview.appendPlainText("    " + arguments[-1])
+        for arguments in passes:
+            self.command_preview.appendPlainText(format_command_preview(program, arguments))
+
+        ##### Explain automatic choices, e.g. the stream copy fast path
+        for note in notes:
+            self.command_preview.appendPlainText(f"# {note}")
+
+    def estimateConversion(self) -> None:
+        if self.estimate_task is not None:
+            self.displayInfo("An estimate is already running.")
+            return
+        options: ConversionOptions | None = self.collectOptions()
+        if options is None:
+            return
+
+        # Deferred, only needed once an estimate is requested
+        from SimplyFFmpegApplication.Estimator import SampleEstimator
+        task = BackgroundTask(lambda report: SampleEstimator(options, report=report).estimate(), self)
+        task.reported.connect(lambda message: self.setStatusBarStatus(f"Estimating: {message}"))
+        task.succeeded.connect(lambda result: self.onEstimateFinished(str(result)))
+        task.failed.connect(lambda message: self.onEstimateFinished(f"Estimate failed: {message}"))
+        self.estimate_task = task
+        task.start()
+        return
+
+    def onEstimateFinished(self, text: str) -> None:
+        if self.estimate_task is not None:
+            self.estimate_task.deleteLater()
+            self.estimate_task = None
+        for line in text.splitlines():
+            self.command_preview.appendPlainText(f"# {line}")
+        if not self.job_queue.isActive():
+            self.setStatusBarStatus("Ready")
+        return
 
     def convertVideo(self) -> None:
-        ##### Check if there is an existing FFmpeg process
-        if self.worker_process.processId():
-            QMessageBox.critical(self, "Error", "Already active")
+        output_file: str = self.io_widget.output_field.text()
+        if self.job_queue.hasActiveOutput(output_file):
+            self.displayError("A queued job is already writing to this output file.")
             return
+        if self.options_widget.isSmartCut():
+            options: ConversionOptions | None = self.collectOptions()
+            if options is not None:
+                self.startSmartCut(options)
+            return
+        if not self.ensureLoudnessAnalyzed(self.convertVideo):
+            return
+        self.compileCommand(self.queueConversion)
+        return
 
-        full_command: tuple[str, list[str]] | None = self.compileCommand()
-        if full_command is None:
+    def queueConversion(self, options: ConversionOptions, full_command: tuple[str, list[list[str]], list[str], list[str], list[str]]) -> None:
+        program, passes, _, extra_files, temporary_files = full_command
+        *first_passes, arguments = passes
+        # The output may have been queued while the command was compiled
+        if self.job_queue.hasActiveOutput(options.output_file):
+            self.displayError("A queued job is already writing to this output file.")
+            return
+        if any(self.job_queue.hasActiveOutput(extra_file) for extra_file in extra_files):
+            self.displayError("A queued job is already writing to one of the extra output files.")
+            return
+
+        ##### Segment-parallel mode bypasses the queue
+        if self.segment_count.value() > 1:
+            if extra_files or first_passes:
+                self.displayError("Extra outputs and target sizes can't be combined with segment-parallel encoding.")
+                return
+            self.startParallelEncode(program, arguments, self.segment_count.value())
             return
-        program, arguments = full_command
 
-        ##### Execute FFmpeg command
-        self.output_area.clear()
+        ##### Queue FFmpeg command
+        if not self.job_queue.isActive():
+            self.output_area.clearLog()
         print(arguments)
-        self.worker_process.start(program, arguments)
+        job: Job = Job(program, arguments, options.input_file, options.output_file, extra_files, first_passes, temporary_files)
+        if options.input_info:
+            job.progress.setInputDuration(options.input_info.getDuration())
+        self.job_queue.addJob(job)
 
         return
 
-    def onStdoutSignal(self) -> None:
-        self.appendOutput(self.worker_process.readAllStandardOutput().data().decode())
+    def ingestPaths(self, paths: list[str]) -> None:
+        """
+        Queues one job per media file in `paths`, walking directories and
+        probing files in the background. Every job is compiled from a snapshot
+        of the options taken now, with its output path derived from its input.
+        """
+        if self.ingest_task is not None:
+            self.displayInfo("Files are still being added to the queue.")
+            return
+        if self.segment_count.value() > 1:
+            self.displayError("Segment-parallel encoding can't be used for multiple inputs.")
+            return
+        template: ConversionOptions | None = self.readOptions("", "")
+        if template is None:
+            return
+        extra_presets: list[Preset] = self.options_widget.getExtraPresets()
+        output_field: str = self.io_widget.output_field.text()
+        extension: str = self.shared_states.extension
+        stop_event: threading.Event = threading.Event()
+        self.ingest_stop = stop_event
+
+        def make_job(input_file: str, output_file: str, info: MediaInfo) -> Job:
+            options: ConversionOptions = copy.copy(template)
+            options.input_file = input_file
+            options.output_file = output_file
+            options.input_info = info
+            options.capabilities = options.capabilities or get_capability_registry().load()
+            options.analyzeLoudness()
+            if not options.overwrite and os.path.exists(output_file):
+                raise ValueError(f"{output_file} already exists")
+            program, passes, _, extra_files, temporary_files = compile_conversion(options, extra_presets)
+            *first_passes, arguments = passes
+            job: Job = Job(program, arguments, input_file, output_file, extra_files, first_passes, temporary_files)
+            job.progress.setInputDuration(info.getDuration())
+            return job
+
+        # Deferred, only needed once files are dropped
+        from SimplyFFmpegApplication.BulkIngest import BulkIngester
+
+        def ingest(report: Callable[[str], None]) -> "BulkIngestResult":
+            # Output folder checks stat the disk, so they stay off the GUI thread too
+            output_directory: str = output_field if os.path.isdir(output_field) else os.path.dirname(output_field)
+            ingester: BulkIngester = BulkIngester(make_job, output_directory, extension, report=report)
+            return ingester.run(paths, self.ingested_jobs.put, stop_event)
+
+        if not self.job_queue.isActive():
+            self.output_area.clearLog()
+        task = BackgroundTask(ingest, self)
+        task.reported.connect(self.onIngestProgress)
+        task.succeeded.connect(lambda result: self.onIngestFinished(str(result)))
+        task.failed.connect(lambda message: self.onIngestFinished(f"Adding files failed: {message}"))
+        self.ingest_task = task
+        self.setStatusBarStatus(f"Adding {len(paths)} item(s) to the queue...")
+        task.start()
         return
 
-    def onStderrSignal(self) -> None:
-        self.appendOutput(self.worker_process.readAllStandardError().data().decode())
+    def onIngestProgress(self, message: str) -> None:
+        self.setStatusBarStatus(f"Adding files: {message}")
+        self.drainIngestedJobs()
         return
 
-    def onStartedSignal(self) -> None:
-        print_log(f"Worker {id(self.worker_process)} started.")
-        self.setStatusBarStatus("Working")
+    def drainIngestedJobs(self) -> None:
+        # A bounded batch per event loop turn, so thousands of jobs don't freeze the window
+        for _ in range(100):
+            try:
+                job: Job = self.ingested_jobs.get_nowait()
+            except queue.Empty:
+                return
+            if self.job_queue.hasActiveOutput(job.getOutputFile()):
+                self.appendOutput(f"Skipped {job.getInputFile()}: a queued job is already writing to {job.getOutputFile()}\n")
+                continue
+            self.job_queue.addJob(job)
+        QTimer.singleShot(0, self.drainIngestedJobs)
         return
 
-    def onFinishedSignal(self) -> None:
-        print_log(f"Worker {id(self.worker_process)} finished!")
+    def onIngestFinished(self, text: str) -> None:
+        if self.ingest_task is not None:
+            self.ingest_task.deleteLater()
+            self.ingest_task = None
+        self.drainIngestedJobs()
+        self.appendOutput(text + "\n")
+        if not self.job_queue.isActive():
+            self.setStatusBarStatus("Ready")
+        return
 
-        if self.worker_process.exitCode() == 0:
-            self.displayInfo("FFmpeg task completed successfully.")
-            self.setStatusBarStatus("Previous task was successful! Ready.")
-        else:
-            self.displayCriticalError("FFmpeg encountered an error.")
+    def cancelAll(self) -> None:
+        ##### Stop adding files first, so nothing is queued after the cancel
+        self.ingest_stop.set()
+        while not self.ingested_jobs.empty():
+            self.ingested_jobs.get_nowait()
+        self.job_queue.cancelAll()
+        return
+
+    def ensureLoudnessAnalyzed(self, then: Callable[[], None]) -> bool:
+        """
+        Returns True if the conversion can be compiled right away. Otherwise
+        the input's loudness is measured in the background first, and `then`
+        is called once the measurement is cached.
+        """
+        if self.loudness_task is not None:
+            self.displayInfo("The loudness of the input is still being measured.")
+            return False
+        options: ConversionOptions | None = self.collectOptions()
+        if options is None:
+            return False
+        try:
+            if not options.needsLoudnessAnalysis():
+                return True
+        except ValueError as error:
+            self.displayError(str(error))
+            return False
+
+        def analyze(report: Callable[[str], None]) -> bool:
+            # The input may not have been probed yet, and turn out to have no audio
+            options.probeInput()
+            return not options.needsLoudnessAnalysis() or options.analyzeLoudness(report) is not None
+
+        task = BackgroundTask(analyze, self)
+        task.reported.connect(self.setStatusBarStatus)
+        task.succeeded.connect(lambda success: self.onLoudnessAnalyzed(bool(success), then))
+        task.failed.connect(lambda message: self.onLoudnessAnalyzed(False, then))
+        self.loudness_task = task
+        self.setStatusBarStatus("Measuring loudness...")
+        task.start()
+        return False
+
+    def onLoudnessAnalyzed(self, success: bool, then: Callable[[], None]) -> None:
+        if self.loudness_task is not None:
+            self.loudness_task.deleteLater()
+            self.loudness_task = None
+        if not success:
+            self.displayError("The loudness of the input could not be measured, see the log for details.")
+            self.setStatusBarStatus("Ready")
+            return
+        then()
+        return
+
+    def startSmartCut(self, options: ConversionOptions) -> None:
+        # Deferred, only needed once a smart cut is requested
+        from SimplyFFmpegApplication.SmartCut import SmartCutter
+        task = BackgroundTask(lambda report: SmartCutter(options, report).run(), self)
+        task.reported.connect(lambda message: self.appendOutput(message + "\n"))
+        task.succeeded.connect(lambda result: self.onSmartCutFinished(task, result))
+        task.failed.connect(lambda message: self.onSmartCutFinished(task, None, message))
+        self.parallel_tasks.append(task)
+
+        self.appendOutput("===== Smart cut =====\n")
+        self.setStatusBarStatus("Working (smart cut)")
+        task.start()
+        return
+
+    def startParallelEncode(self, program: str, arguments: list[str], segment_count: int) -> None:
+        # Deferred, only needed once a parallel encode is requested
+        from SimplyFFmpegApplication.ParallelEncode import SegmentParallelEncoder
+        measure_baseline: bool = self.measure_baseline.isChecked()
+        task = BackgroundTask(lambda report: SegmentParallelEncoder(program, arguments, segment_count, report).run(measure_baseline), self)
+        task.reported.connect(lambda message: self.appendOutput(message + "\n"))
+        task.succeeded.connect(lambda result: self.onParallelEncodeFinished(task, result))
+        task.failed.connect(lambda message: self.onParallelEncodeFinished(task, None, message))
+        self.parallel_tasks.append(task)
+
+        self.appendOutput(f"===== Parallel encode ({segment_count} segments) =====\n")
+        self.setStatusBarStatus(f"Working (parallel encode, {segment_count} segments)")
+        task.start()
+        return
+
+    def onParallelEncodeFinished(self, task: BackgroundTask, result: "ParallelEncodeResult | None", error: str = "") -> None:
+        self.parallel_tasks.remove(task)
+        task.deleteLater()
+        if result is not None:
+            self.appendOutput(str(result) + "\n")
+        if result is None or not result.success:
+            self.displayCriticalError(str(result) if result else f"Parallel encode failed: {error}")
             self.setStatusBarStatus("Previous task failed! Ready.")
+        else:
+            self.displayInfo(str(result))
+            self.setStatusBarStatus("Previous task was successful! Ready.")
+        self.io_widget.output_field.textChanged.emit(self.io_widget.output_field.text())
+        return
 
-        self.io_widget.input_field.textChanged.emit(self.io_widget.input_field.text())
+    def onSmartCutFinished(self, task: BackgroundTask, result: "SmartCutResult | None", error: str = "") -> None:
+        self.parallel_tasks.remove(task)
+        task.deleteLater()
+        if result is not None:
+            self.appendOutput(str(result) + "\n")
+        if result is None or not result.success:
+            self.displayCriticalError(str(result) if result else f"Smart cut failed: {error}")
+            self.setStatusBarStatus("Previous task failed! Ready.")
+        else:
+            self.setStatusBarStatus("Previous task was successful! Ready.")
         self.io_widget.output_field.textChanged.emit(self.io_widget.output_field.text())
+        return
+
+    def showMetrics(self) -> None:
+        # Deferred, like at startup
+        from SimplyFFmpegApplication.JobMetrics import get_metrics_recorder
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Job Metrics")
+        dialog.resize(900, 400)
+        dialog_layout = QVBoxLayout(dialog)
+
+        summary_label = QLabel(f"{get_metrics_recorder().getSummary()}\nLog: {get_metrics_recorder().getLogFile()}", dialog)
+        summary_label.setWordWrap(True)
+        dialog_layout.addWidget(summary_label)
+
+        columns: list[str] = ["#", "Input", "Status", "Wall", "CPU user/sys", "Peak RSS", "Read", "Written", "FPS", "Speed"]
+        records = get_metrics_recorder().getRecords()
+        metrics_table = QTableWidget(len(records), len(columns), dialog)
+        metrics_table.setHorizontalHeaderLabels(columns)
+        metrics_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        for row, record in enumerate(reversed(records)):
+            values: list[str] = [
+                str(record["job_id"]),
+                os.path.basename(record["input"]),
+                f"{record['status']}{' (cache)' if record['from_cache'] else ''}",
+                f"{record['wall_time']:.1f}s",
+                f"{record['cpu_user']:.1f}s / {record['cpu_system']:.1f}s",
+                f"{record['peak_rss'] / 2**20:.0f} MiB",
+                f"{record['read_bytes'] / 1e6:.1f} MB",
+                f"{record['write_bytes'] / 1e6:.1f} MB",
+                f"{record['fps']:.1f}",
+                f"{record['speed']:.2f}x",
+            ]
+            for column, value in enumerate(values):
+                metrics_table.setItem(row, column, QTableWidgetItem(value))
+        metrics_header: QHeaderView | None = metrics_table.horizontalHeader()
+        if metrics_header:
+            metrics_header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        dialog_layout.addWidget(metrics_table)
+        dialog.show()
+        return
 
+    def onStderrSignal(self, job: Job, data: bytes) -> None:
+        # Concurrent jobs are interleaved line by line, labelled on every switch
+        self.output_area.write(data, job.getId(), f"===== Job {job.getId()} =====")
+        return
+
+    def onJobStatusChanged(self, job: Job) -> None:
+        ##### Update queue table
+        row: int | None = self.queue_rows.get(job.getId())
+        if row is None:
+            row = self.queue_table.rowCount()
+            self.queue_table.insertRow(row)
+            self.queue_rows[job.getId()] = row
+            self.queue_table.setItem(row, 0, QTableWidgetItem(str(job.getId())))
+            self.queue_table.setItem(row, 1, QTableWidgetItem(job.getOutputFile()))
+            progress_bar = QProgressBar(self.queue_table)
+            progress_bar.setRange(0, 1000)
+            progress_bar.setTextVisible(True)
+            self.queue_table.setCellWidget(row, 3, progress_bar)
+        status: str = job.status
+        wall_time: float | None = job.getWallTime()
+        if job.isFinished() and wall_time is not None:
+            status += f" ({wall_time:.1f}s)"
+        self.queue_table.setItem(row, 2, QTableWidgetItem(status))
+
+        ##### Update aggregate statistics
+        statistics: QueueStatistics = self.job_queue.getStatistics()
+        self.queue_statistics.setText(str(statistics))
+        if self.job_queue.isActive():
+            self.setStatusBarStatus(f"Working ({statistics.running} running, {statistics.queued} queued)")
+
+        if job.isFinished():
+            self.output_area.finishSource(job.getId(), f"===== Job {job.getId()} =====")
+            self.io_widget.input_field.textChanged.emit(self.io_widget.input_field.text())
+            self.io_widget.output_field.textChanged.emit(self.io_widget.output_field.text())
+        return
+
+    def onJobProgress(self, job: Job) -> None:
+        row: int | None = self.queue_rows.get(job.getId())
+        if row is None:
+            return
+
+        ##### Progress bar, or a busy indicator while the duration is unknown
+        progress_bar = self.queue_table.cellWidget(row, 3)
+        if type(progress_bar) is QProgressBar:
+            fraction: float | None = job.progress.getFraction()
+            if fraction is None:
+                progress_bar.setRange(0, 0)
+            else:
+                progress_bar.setRange(0, 1000)
+                progress_bar.setValue(int(fraction * 1000))
+                progress_bar.setFormat(f"{fraction * 100:.1f}%")
+
+        ##### ETA, realtime factor and encode speed
+        self.queue_table.setItem(row, 4, QTableWidgetItem(job.progress.getSummary()))
+        self.queue_statistics.setText(str(self.job_queue.getStatistics()))
+        return
+
+    def onQueueDrained(self) -> None:
+        statistics: QueueStatistics = self.job_queue.getStatistics()
+        if statistics.failed == 0:
+            self.displayInfo(f"FFmpeg tasks completed successfully.\n{statistics}")
+            self.setStatusBarStatus("Previous tasks were successful! Ready.")
+        else:
+            self.displayCriticalError(f"FFmpeg encountered an error in {statistics.failed} task(s).\n{statistics}")
+            self.setStatusBarStatus("Some previous tasks failed! Ready.")
         return
 
     def setStatusBarStatus(self, status: str) -> None:
@@ -0,0 +1,162 @@
+from SimplyFFmpegApplication.CommonHelpers import format_seconds, parse_time_to_seconds, print_log
+from SimplyFFmpegApplication.CommandModel import ConversionOptions
+from SimplyFFmpegApplication.MediaProbe import MediaInfo, MediaProber, get_media_prober
+
+
+import copy
+import math
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Callable
+
+
+# Two-sided 95% Student's t quantiles by degrees of freedom, normal beyond
+t_quantiles: dict[int, float] = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36, 8: 2.31, 9: 2.26}
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return ""
+
+
+class EncodeEstimate:
+    def __init__(self) -> None:
+        self.success: bool = False
+        self.message: str = ""
+        self.media_duration: float = 0.0
+        self.sample_count: int = 0
+        self.sample_length: float = 0.0
+        # (estimate, lower bound, upper bound)
+        self.size: tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self.time: tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self.sample_time: float = 0.0
+
+    def __str__(self) -> str:
+        if not self.success:
+            return f"Estimate failed: {self.message}"
+        size, size_low, size_high = self.size
+        encode_time, time_low, time_high = self.time
+        return "\n".join([
+            f"Estimate from {self.sample_count} samples of {self.sample_length:.1f}s over {format_seconds(self.media_duration)} (95% bounds):",
+            f"    Output size: {format_size(size)} ({format_size(size_low)} to {format_size(size_high)})",
+            f"    Encode time: {format_seconds(encode_time)} ({format_seconds(time_low)} to {format_seconds(time_high)})",
+            f"    Sampling took {self.sample_time:.1f}s",
+        ])
+
+
+class SampleEstimator:
+    """
+    Estimates the output size and encode time of a conversion by encoding a
+    few short samples spread over the input with the exact same options, then
+    extrapolating their bitrate and encode speed to the whole duration.
+
+    Samples are encoded one after another, so their speed matches a single
+    full-length run. The bounds are a 95% confidence interval over the
+    per-sample values, so they widen for inputs whose complexity varies.
+    """
+    def __init__(
+        self, options: ConversionOptions, sample_count: int = 5, sample_length: float = 4.0,
+        report: Callable[[str], None] = print_log, prober: MediaProber | None = None
+    ) -> None:
+        self.__options__: ConversionOptions = options
+        self.__sample_count__: int = max(2, sample_count)
+        self.__sample_length__: float = max(0.5, sample_length)
+        self.__report__: Callable[[str], None] = report
+        self.__prober__: MediaProber = prober or get_media_prober()
+
+    def __sampleArguments__(self, start: float, length: float, output_file: str) -> tuple[str, list[str]]:
+        options: ConversionOptions = copy.copy(self.__options__)
+        if options.target_size:
+            # The bitrate that fits the whole span, encoded in one pass
+            options.video_bitrate = f"{options.getTargetVideoBitrate() // 1000}k"
+            options.target_size = ""
+        options.output_file = output_file
+        options.overwrite = True
+        options.progress_pipe = False
+        # Presets drop the seek options, so the sample window is set on the
+        # compiled command instead: a fast input seek straight to the sample
+        # start, and the length as an output option
+        options.seek = ""
+        options.duration = ""
+        program, arguments = options.buildStates().compileState()
+        input_idx: int = arguments.index("-i")
+        return (program, [
+            *arguments[:input_idx], "-ss", f"{start:.3f}",
+            *arguments[input_idx:input_idx + 2], "-t", f"{length:.3f}",
+            *arguments[input_idx + 2:]
+        ])
+
+    def estimate(self) -> EncodeEstimate:
+        result: EncodeEstimate = EncodeEstimate()
+        started_at: float = time.monotonic()
+
+        ##### The span that the real conversion covers
+        info: MediaInfo | None = self.__prober__.probe(self.__options__.input_file)
+        media_duration: float | None = info.getDuration() if info else None
+        if not media_duration:
+            result.message = "the input duration could not be probed."
+            return result
+        span_start: float = max(0.0, parse_time_to_seconds(self.__options__.seek) or 0.0)
+        span_length: float = max(0.0, media_duration - span_start)
+        requested_length: float | None = parse_time_to_seconds(self.__options__.duration)
+        if requested_length:
+            span_length = min(span_length, requested_length)
+        if span_length <= 0:
+            result.message = "the seek is past the end of the input."
+            return result
+        result.media_duration = span_length
+
+        # Short inputs get shorter samples rather than overlapping ones
+        sample_length: float = min(self.__sample_length__, span_length / self.__sample_count__)
+        step: float = span_length / self.__sample_count__
+        extension: str = os.path.splitext(self.__options__.output_file)[1]
+        work_directory: str = tempfile.mkdtemp(prefix="simplyffmpeg_estimate_")
+
+        ##### Encode every sample and measure it
+        bytes_per_second: list[float] = []
+        seconds_per_second: list[float] = []
+        try:
+            for idx in range(self.__sample_count__):
+                start: float = span_start + step * idx + (step - sample_length) / 2
+                output_file: str = os.path.join(work_directory, f"sample_{idx}{extension}")
+                program, arguments = self.__sampleArguments__(start, sample_length, output_file)
+                self.__report__(f"Encoding sample {idx + 1}/{self.__sample_count__} at {format_seconds(start)}")
+
+                sample_started_at: float = time.monotonic()
+                try:
+                    process: subprocess.CompletedProcess[bytes] = subprocess.run([program, *arguments], capture_output=True)
+                except OSError as error:
+                    result.message = f"could not run {program}: {error}"
+                    return result
+                sample_time: float = time.monotonic() - sample_started_at
+                if process.returncode != 0 or not os.path.isfile(output_file):
+                    error_lines: list[str] = process.stderr.decode(errors="replace").strip().splitlines()
+                    result.message = f"sample {idx + 1} failed: {error_lines[-1] if error_lines else process.returncode}"
+                    return result
+
+                bytes_per_second.append(os.path.getsize(output_file) / sample_length)
+                seconds_per_second.append(sample_time / sample_length)
+        finally:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+        ##### Extrapolate with 95% confidence bounds
+        def extrapolate(values: list[float]) -> tuple[float, float, float]:
+            mean: float = statistics.fmean(values)
+            t_quantile: float = t_quantiles.get(len(values) - 1, 1.96)
+            margin: float = t_quantile * statistics.stdev(values) / math.sqrt(len(values))
+            return (mean * span_length, max(0.0, mean - margin) * span_length, (mean + margin) * span_length)
+
+        result.size = extrapolate(bytes_per_second)
+        result.time = extrapolate(seconds_per_second)
+        result.sample_count = len(bytes_per_second)
+        result.sample_length = sample_length
+        result.sample_time = time.monotonic() - started_at
+        result.success = True
+        return result
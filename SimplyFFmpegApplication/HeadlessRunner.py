@@ -0,0 +1,132 @@
+from SimplyFFmpegApplication.CommonHelpers import print_error, print_log, uses_standard_stream
+from SimplyFFmpegApplication.JobMetrics import JobMetricsRecorder
+from SimplyFFmpegApplication.Jobs import Job, QueueStatistics, default_worker_count
+from SimplyFFmpegApplication.ResultCache import ConversionResultCache
+from SimplyFFmpegApplication.ThreadBudget import ThreadBudgetScheduler
+
+
+import os
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable
+
+
+class HeadlessJobRunner:
+    """
+    Qt-free counterpart of FFmpegJobQueue: drains a list of Jobs with a pool
+    of plain subprocesses.
+    """
+    def __init__(
+        self, worker_count: int = default_worker_count(), verbose: bool = False,
+        report: Callable[[str], None] = print_log, pin_affinity: bool = False,
+        result_cache: ConversionResultCache | None = None, metrics: JobMetricsRecorder | None = None
+    ) -> None:
+        self.__worker_count__: int = max(1, worker_count)
+        self.__verbose__: bool = verbose
+        self.__report__: Callable[[str], None] = report
+        self.__lock__: threading.Lock = threading.Lock()
+        self.__scheduler__: ThreadBudgetScheduler = ThreadBudgetScheduler(self.__worker_count__, pin_affinity)
+        self.__pending_count__: int = 0
+        self.__result_cache__: ConversionResultCache | None = result_cache
+        self.__metrics__: JobMetricsRecorder | None = metrics
+
+    def run(self, jobs: list[Job]) -> QueueStatistics:
+        with self.__lock__:
+            self.__pending_count__ += len(jobs)
+        with ThreadPoolExecutor(max_workers=self.__worker_count__) as executor:
+            list(executor.map(self.runJob, jobs))
+        return QueueStatistics(jobs)
+
+    def runJob(self, job: Job) -> None:
+        with self.__lock__:
+            self.__pending_count__ = max(0, self.__pending_count__ - 1)
+            pending_count: int = self.__pending_count__
+
+        ##### Identical earlier conversions are served from the result cache
+        cache_key: str | None = self.__result_cache__.getJobKey(job) if self.__result_cache__ else None
+        if cache_key and self.__result_cache__ and self.__result_cache__.restore(cache_key, job.getOutputFile()):
+            job.markFromCache()
+            if self.__metrics__:
+                self.__metrics__.finish(job)
+            with self.__lock__:
+                self.__report__(str(job))
+            return
+        if self.__result_cache__:
+            self.__result_cache__.detachOutput(job)
+
+        ##### Every pass in its own process, stopping at the first failure
+        stderr_tail: deque[str] = deque(maxlen=20)
+        job.markStarted()
+        while True:
+            # Concurrent jobs split the CPUs instead of each spawning a full set of threads
+            arguments: list[str] = self.__scheduler__.start(job.getId(), job.getCurrentArguments(), pending_count)
+            exit_code: int = self.__runProcess__(job, arguments, stderr_tail)
+            self.__scheduler__.finish(job.getId())
+            if exit_code != 0 or not job.advancePass():
+                break
+        job.removeTemporaryFiles()
+        job.markFinished(exit_code)
+        if exit_code == 0 and cache_key and self.__result_cache__:
+            self.__result_cache__.store(cache_key, job.getOutputFile())
+        if self.__metrics__:
+            self.__metrics__.finish(job)
+
+        summary: str = job.progress.getSummary()
+        with self.__lock__:
+            self.__report__(f"{job}{' | ' + summary if summary else ''}")
+            if exit_code != 0 and not self.__verbose__:
+                for line in stderr_tail:
+                    print_error(f"    {line}")
+
+    def __runProcess__(self, job: Job, arguments: list[str], stderr_tail: deque[str]) -> int:
+        # Streams on stdin or stdout are handed straight to FFmpeg, progress
+        # is then only parsed from stderr
+        streams_stdin: bool = uses_standard_stream(job.getInputFile())
+        streams_stdout: bool = uses_standard_stream(job.getOutputFile())
+        try:
+            process: subprocess.Popen[bytes] = subprocess.Popen(
+                [job.getProgram(), *arguments],
+                stdin=None if streams_stdin else subprocess.DEVNULL,
+                stdout=None if streams_stdout else subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except OSError as error:
+            print_error(f"Job {job.getId()} could not start: {error}")
+            return -1
+        self.__scheduler__.attach(job.getId(), process.pid)
+        if self.__metrics__:
+            self.__metrics__.attach(job, process.pid)
+
+        ##### Stderr is drained on its own thread so neither pipe can fill up
+        stderr_thread: threading.Thread = threading.Thread(target=self.__drainStderr__, args=(job, process.stderr, stderr_tail), daemon=True)
+        stderr_thread.start()
+
+        stdout: IO[bytes] | None = process.stdout
+        if stdout is not None:
+            for chunk in iter(lambda: stdout.read1(65536), b""):
+                job.progress.feed(chunk)
+
+        if self.__metrics__:
+            # Wait for the exit without reaping, so the final usage is still readable
+            if hasattr(os, "waitid"):
+                try:
+                    os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+                except ChildProcessError:
+                    pass
+            self.__metrics__.detach(job)
+        exit_code: int = process.wait()
+        stderr_thread.join()
+        return exit_code
+
+    def __drainStderr__(self, job: Job, stream: IO[bytes] | None, stderr_tail: deque[str]) -> None:
+        if stream is None:
+            return
+        for raw_line in stream:
+            job.progress.feedStderr(raw_line)
+            line: str = raw_line.decode(errors="replace").rstrip()
+            stderr_tail.append(line)
+            if self.__verbose__:
+                with self.__lock__:
+                    print_log(f"[Job {job.getId()}] {line}")
@@ -0,0 +1,295 @@
+from SimplyFFmpegApplication.CommonHelpers import get_cache_directory, print_error, print_log
+from SimplyFFmpegApplication.Jobs import Job
+
+
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+class ProcessSampler:
+    """
+    Follows the resource usage of one running process through /proc: CPU
+    time, peak resident memory and bytes read and written. A background
+    thread samples every `interval` seconds; a last sample is taken when
+    stopped, which is exact if the process has exited but was not reaped yet.
+
+    With `watch_exit`, for child processes reaped by someone else (QProcess),
+    another thread waits for the exit without reaping and takes the last
+    sample right away. The reaper rarely gets there first; then the
+    totals are as of the previous sample.
+
+    On systems without /proc every value stays at 0.
+    """
+    clock_ticks: int = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def __init__(self, process_id: int, interval: float = 0.25, watch_exit: bool = False) -> None:
+        self.__process_id__: int = process_id
+        self.__interval__: float = interval
+        self.__stop_event__: threading.Event = threading.Event()
+        self.__thread__: threading.Thread = threading.Thread(target=self.__run__, daemon=True)
+        self.__exit_thread__: threading.Thread | None = (
+            threading.Thread(target=self.__watchExit__, daemon=True) if watch_exit and hasattr(os, "waitid") else None
+        )
+        self.__lock__: threading.Lock = threading.Lock()
+
+        self.cpu_user: float = 0.0
+        self.cpu_system: float = 0.0
+        self.peak_rss: int = 0
+        # Every read()/write() of the process, page cache and pipes included
+        self.read_bytes: int = 0
+        self.write_bytes: int = 0
+
+    def start(self) -> None:
+        self.__thread__.start()
+        if self.__exit_thread__:
+            self.__exit_thread__.start()
+
+    def stop(self) -> None:
+        # Only called once the process has exited, so the exit watcher returns too
+        self.__stop_event__.set()
+        if self.__thread__.is_alive():
+            self.__thread__.join()
+        if self.__exit_thread__ and self.__exit_thread__.is_alive():
+            self.__exit_thread__.join()
+        self.sample()
+
+    def sample(self) -> bool:
+        # False once the process is gone
+        proc_directory: str = f"/proc/{self.__process_id__}"
+        try:
+            with open(f"{proc_directory}/stat", "r") as file:
+                # The command name may contain spaces, so fields are counted after it
+                fields: list[str] = file.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            return False
+        with self.__lock__:
+            self.cpu_user = int(fields[11]) / self.clock_ticks
+            self.cpu_system = int(fields[12]) / self.clock_ticks
+            try:
+                with open(f"{proc_directory}/status", "r") as file:
+                    for line in file:
+                        if line.startswith("VmHWM:"):
+                            self.peak_rss = max(self.peak_rss, int(line.split()[1]) * 1024)
+                            break
+            except (OSError, ValueError, IndexError):
+                pass
+            try:
+                with open(f"{proc_directory}/io", "r") as file:
+                    io_fields: dict[str, str] = dict(line.split(":", 1) for line in file if ":" in line)
+                self.read_bytes = int(io_fields.get("rchar", self.read_bytes))
+                self.write_bytes = int(io_fields.get("wchar", self.write_bytes))
+            except (OSError, ValueError):
+                pass
+        return True
+
+    def __run__(self) -> None:
+        while self.sample() and not self.__stop_event__.wait(self.__interval__):
+            pass
+
+    def __watchExit__(self) -> None:
+        # WNOWAIT leaves the zombie for the real reaper, its /proc stat and io still hold the totals
+        try:
+            os.waitid(os.P_PID, self.__process_id__, os.WEXITED | os.WNOWAIT)
+        except (ChildProcessError, OSError):
+            return
+        self.sample()
+
+
+class JobMetricsRecorder:
+    """
+    Records the resources and throughput of every finished job:
+        -> wall time, and per process: user/system CPU time, peak RSS, bytes read and written
+        -> average encoding fps and speed (media seconds per wall second)
+        -> output size
+
+    Each record is appended as one JSON line to `log_file`, and kept in memory
+    (the last `history` records) for the summary view and the metrics endpoint.
+    Multi-pass jobs add up the usage of all their processes.
+    """
+    def __init__(self, log_file: str | None = None, history: int = 1000) -> None:
+        self.__log_file__: str = log_file or os.path.join(get_cache_directory("metrics"), "jobs.jsonl")
+        self.__records__: deque[dict[str, Any]] = deque(maxlen=max(1, history))
+        self.__totals__: dict[str, float] = {}
+        self.__status_counts__: dict[str, int] = {}
+        # job id -> sampler of the running process, and the usage of finished passes
+        self.__samplers__: dict[int, ProcessSampler] = {}
+        self.__usage__: dict[int, dict[str, float]] = {}
+        self.__lock__: threading.Lock = threading.Lock()
+
+    def getLogFile(self) -> str:
+        return self.__log_file__
+
+    def attach(self, job: Job, process_id: int, watch_exit: bool = False) -> None:
+        # `watch_exit` for processes reaped before detach() can run, see ProcessSampler
+        sampler: ProcessSampler = ProcessSampler(process_id, watch_exit=watch_exit)
+        with self.__lock__:
+            self.__samplers__[job.getId()] = sampler
+        sampler.start()
+
+    def detach(self, job: Job) -> None:
+        # Called when a process of the job has exited, ideally before it is reaped
+        with self.__lock__:
+            sampler: ProcessSampler | None = self.__samplers__.pop(job.getId(), None)
+        if sampler is None:
+            return
+        sampler.stop()
+        with self.__lock__:
+            usage: dict[str, float] = self.__usage__.setdefault(job.getId(), {})
+            usage["cpu_user"] = usage.get("cpu_user", 0.0) + sampler.cpu_user
+            usage["cpu_system"] = usage.get("cpu_system", 0.0) + sampler.cpu_system
+            usage["peak_rss"] = max(usage.get("peak_rss", 0), sampler.peak_rss)
+            usage["read_bytes"] = usage.get("read_bytes", 0) + sampler.read_bytes
+            usage["write_bytes"] = usage.get("write_bytes", 0) + sampler.write_bytes
+
+    def finish(self, job: Job) -> dict[str, Any]:
+        self.detach(job)
+        with self.__lock__:
+            usage: dict[str, float] = self.__usage__.pop(job.getId(), {})
+
+        wall_time: float = job.getWallTime() or 0.0
+        media_seconds: float = job.progress.latest.out_time if job.progress.latest else 0.0
+        frame_count: int = job.progress.latest.frame if job.progress.latest else 0
+        record: dict[str, Any] = {
+            "timestamp": time.time(),
+            "host": socket.gethostname(),
+            "job_id": job.getId(),
+            "input": job.getInputFile(),
+            "outputs": job.getOutputFiles(),
+            "status": job.status,
+            "exit_code": job.exit_code,
+            "from_cache": job.from_cache,
+            "passes": len(job.getPasses()),
+            "wall_time": wall_time,
+            "cpu_user": usage.get("cpu_user", 0.0),
+            "cpu_system": usage.get("cpu_system", 0.0),
+            "peak_rss": int(usage.get("peak_rss", 0)),
+            "read_bytes": int(usage.get("read_bytes", 0)),
+            "write_bytes": int(usage.get("write_bytes", 0)),
+            "output_bytes": job.getOutputSize(),
+            "media_seconds": media_seconds,
+            "fps": frame_count / wall_time if wall_time > 0 and not job.from_cache else 0.0,
+            "speed": media_seconds / wall_time if wall_time > 0 and not job.from_cache else 0.0,
+        }
+
+        with self.__lock__:
+            self.__records__.append(record)
+            self.__status_counts__[job.status] = self.__status_counts__.get(job.status, 0) + 1
+            for metric in ("wall_time", "cpu_user", "cpu_system", "read_bytes", "write_bytes", "output_bytes", "media_seconds"):
+                self.__totals__[metric] = self.__totals__.get(metric, 0.0) + record[metric]
+            self.__totals__["peak_rss"] = max(self.__totals__.get("peak_rss", 0.0), record["peak_rss"])
+            try:
+                with open(self.__log_file__, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(record) + "\n")
+            except OSError as error:
+                print_error(f"Could not append to the metrics log {self.__log_file__}: {error}")
+        return record
+
+    def getRecords(self) -> list[dict[str, Any]]:
+        with self.__lock__:
+            return list(self.__records__)
+
+    def getSummary(self) -> str:
+        with self.__lock__:
+            job_count: int = sum(self.__status_counts__.values())
+            totals: dict[str, float] = dict(self.__totals__)
+            statuses: str = ", ".join(f"{count} {status.lower()}" for status, count in sorted(self.__status_counts__.items()))
+        if not job_count:
+            return "No finished jobs yet."
+        wall_time: float = totals.get("wall_time", 0.0)
+        cpu_time: float = totals.get("cpu_user", 0.0) + totals.get("cpu_system", 0.0)
+        return (
+            f"{job_count} jobs ({statuses}) | wall {wall_time:.1f}s, cpu {cpu_time:.1f}s"
+            f" ({cpu_time / wall_time if wall_time > 0 else 0.0:.1f} cores per job on average)"
+            f" | peak RSS {totals.get('peak_rss', 0.0) / 2**20:.0f} MiB"
+            f" | read {totals.get('read_bytes', 0.0) / 1e6:.1f} MB, written {totals.get('write_bytes', 0.0) / 1e6:.1f} MB"
+            f" | {totals.get('media_seconds', 0.0) / wall_time if wall_time > 0 else 0.0:.2f}x realtime on average"
+        )
+
+    def formatPrometheus(self) -> str:
+        """
+        The totals in the Prometheus text exposition format.
+        """
+        with self.__lock__:
+            totals: dict[str, float] = dict(self.__totals__)
+            status_counts: dict[str, int] = dict(self.__status_counts__)
+            running: int = len(self.__samplers__)
+        lines: list[str] = [
+            "# HELP simplyffmpeg_jobs_total Finished jobs by status.",
+            "# TYPE simplyffmpeg_jobs_total counter",
+            *(f'simplyffmpeg_jobs_total{{status="{status.lower()}"}} {count}' for status, count in sorted(status_counts.items())),
+            "# HELP simplyffmpeg_jobs_running FFmpeg processes currently running.",
+            "# TYPE simplyffmpeg_jobs_running gauge",
+            f"simplyffmpeg_jobs_running {running}",
+        ]
+        counters: list[tuple[str, str, float]] = [
+            ("job_wall_seconds_total", "Wall time of finished jobs.", totals.get("wall_time", 0.0)),
+            ("job_media_seconds_total", "Seconds of media produced by finished jobs.", totals.get("media_seconds", 0.0)),
+            ("job_read_bytes_total", "Bytes read by FFmpeg processes.", totals.get("read_bytes", 0.0)),
+            ("job_written_bytes_total", "Bytes written by FFmpeg processes.", totals.get("write_bytes", 0.0)),
+            ("job_output_bytes_total", "Size of the outputs of finished jobs.", totals.get("output_bytes", 0.0)),
+        ]
+        for name, description, value in counters:
+            lines.extend([f"# HELP simplyffmpeg_{name} {description}", f"# TYPE simplyffmpeg_{name} counter", f"simplyffmpeg_{name} {value:g}"])
+        lines.extend([
+            "# HELP simplyffmpeg_job_cpu_seconds_total CPU time of FFmpeg processes.",
+            "# TYPE simplyffmpeg_job_cpu_seconds_total counter",
+            f'simplyffmpeg_job_cpu_seconds_total{{mode="user"}} {totals.get("cpu_user", 0.0):g}',
+            f'simplyffmpeg_job_cpu_seconds_total{{mode="system"}} {totals.get("cpu_system", 0.0):g}',
+            "# HELP simplyffmpeg_job_peak_rss_bytes Largest peak resident memory of a single FFmpeg process.",
+            "# TYPE simplyffmpeg_job_peak_rss_bytes gauge",
+            f"simplyffmpeg_job_peak_rss_bytes {totals.get('peak_rss', 0.0):g}",
+        ])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves JobMetricsRecorder.formatPrometheus() on http://host:port/metrics
+    from a daemon thread. Binds to localhost unless told otherwise.
+    """
+    def __init__(self, recorder: JobMetricsRecorder, port: int, host: str = "127.0.0.1") -> None:
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body: bytes = recorder.formatPrometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # Scrapes would flood the console
+                pass
+
+        self.__server__: ThreadingHTTPServer = ThreadingHTTPServer((host, port), Handler)
+        self.__server__.daemon_threads = True
+        self.__thread__: threading.Thread = threading.Thread(target=self.__server__.serve_forever, daemon=True)
+
+    def start(self) -> None:
+        self.__thread__.start()
+        host, port = self.__server__.server_address[:2]
+        print_log(f"Serving job metrics on http://{host}:{port}/metrics")
+
+    def stop(self) -> None:
+        self.__server__.shutdown()
+        self.__server__.server_close()
+
+
+_default_metrics_recorder: JobMetricsRecorder | None = None
+_default_metrics_recorder_lock: threading.Lock = threading.Lock()
+
+def get_metrics_recorder() -> JobMetricsRecorder:
+    global _default_metrics_recorder
+    with _default_metrics_recorder_lock:
+        if _default_metrics_recorder is None:
+            _default_metrics_recorder = JobMetricsRecorder()
+        return _default_metrics_recorder
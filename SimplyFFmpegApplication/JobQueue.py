@@ -0,0 +1,247 @@
+from SimplyFFmpegApplication.CommonHelpers import print_log
+from SimplyFFmpegApplication.CommonWidgets import BackgroundTask, FFmpegWorkerProcess
+from SimplyFFmpegApplication.Jobs import Job, JobStatus, QueueStatistics, default_worker_count
+from SimplyFFmpegApplication.ResultCache import ConversionResultCache
+from SimplyFFmpegApplication.ThreadBudget import ThreadBudgetScheduler
+
+
+from PyQt6.QtCore import QObject, QProcess, pyqtSignal
+
+
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Callable
+if TYPE_CHECKING:
+    # Only annotations, the metrics module pulls in the HTTP server
+    from SimplyFFmpegApplication.JobMetrics import JobMetricsRecorder
+
+
+class FFmpegJobQueue(QObject):
+    jobStatusChanged: pyqtSignal = pyqtSignal(object)
+    jobProgress: pyqtSignal = pyqtSignal(object)
+    jobStdout: pyqtSignal = pyqtSignal(object, bytes)
+    jobStderr: pyqtSignal = pyqtSignal(object, bytes)
+    queueDrained: pyqtSignal = pyqtSignal()
+
+    def __init__(self, worker_count: int = default_worker_count(), *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.__worker_count__: int = max(1, worker_count)
+        self.__jobs__: list[Job] = []
+        self.__pending__: deque[Job] = deque()
+        self.__workers__: dict[FFmpegWorkerProcess, Job] = {}
+        # Workers killed on request, any other abnormal exit is a crash
+        self.__killed_workers__: set[FFmpegWorkerProcess] = set()
+        self.__scheduler__: ThreadBudgetScheduler = ThreadBudgetScheduler(self.__worker_count__)
+        self.__result_cache__: ConversionResultCache | None = None
+        self.__metrics__: "JobMetricsRecorder | None" = None
+        # Jobs whose result cache lookup is still running, and their cache keys
+        self.__lookups__: dict[Job, BackgroundTask] = {}
+        self.__cache_keys__: dict[Job, str] = {}
+        # Output files of unfinished jobs, with how many jobs write each
+        self.__active_jobs__: set[Job] = set()
+        self.__active_outputs__: dict[str, int] = {}
+
+    def getWorkerCount(self) -> int:
+        return self.__worker_count__
+    def setWorkerCount(self, worker_count: int) -> None:
+        # Shrinking only takes effect as running jobs finish
+        self.__worker_count__ = max(1, worker_count)
+        self.__scheduler__.setWorkerCount(self.__worker_count__)
+        self.__schedule__()
+    def setAffinityPinning(self, pin_affinity: bool) -> None:
+        self.__scheduler__.setAffinityPinning(pin_affinity)
+
+    def setResultCache(self, result_cache: ConversionResultCache | None) -> None:
+        self.__result_cache__ = result_cache
+    def setMetricsRecorder(self, metrics: "JobMetricsRecorder | None") -> None:
+        self.__metrics__ = metrics
+
+    def getJobs(self) -> list[Job]:
+        return list(self.__jobs__)
+    def getStatistics(self) -> QueueStatistics:
+        return QueueStatistics(self.__jobs__)
+    def isActive(self) -> bool:
+        return bool(self.__pending__ or self.__workers__ or self.__lookups__)
+    def hasActiveOutput(self, output_file: str) -> bool:
+        return output_file in self.__active_outputs__
+
+    def __trackOutputs__(self, job: Job) -> None:
+        self.__active_jobs__.add(job)
+        for output_file in job.getOutputFiles():
+            self.__active_outputs__[output_file] = self.__active_outputs__.get(output_file, 0) + 1
+    def __releaseOutputs__(self, job: Job) -> None:
+        # Called once a job is finished, for whatever reason
+        if job not in self.__active_jobs__:
+            return
+        self.__active_jobs__.discard(job)
+        for output_file in job.getOutputFiles():
+            remaining: int = self.__active_outputs__.pop(output_file, 1) - 1
+            if remaining > 0:
+                self.__active_outputs__[output_file] = remaining
+
+    def addJob(self, job: Job) -> None:
+        self.__trackOutputs__(job)
+        self.__jobs__.append(job)
+        self.__pending__.append(job)
+        self.jobStatusChanged.emit(job)
+        self.__schedule__()
+
+    def cancelJob(self, job: Job) -> None:
+        if job.status == JobStatus.QUEUED or job in self.__lookups__:
+            if job in self.__pending__:
+                self.__pending__.remove(job)
+            job.markCancelled()
+            self.__releaseOutputs__(job)
+            self.jobStatusChanged.emit(job)
+            return
+        for worker, running_job in self.__workers__.items():
+            if running_job is job:
+                self.__killed_workers__.add(worker)
+                worker.kill()
+                return
+
+    def cancelAll(self) -> None:
+        while self.__pending__:
+            job: Job = self.__pending__.popleft()
+            job.markCancelled()
+            self.__releaseOutputs__(job)
+            self.jobStatusChanged.emit(job)
+        for job in list(self.__lookups__):
+            job.markCancelled()
+            self.__releaseOutputs__(job)
+            self.jobStatusChanged.emit(job)
+        for worker in list(self.__workers__):
+            self.__killed_workers__.add(worker)
+            worker.kill()
+
+    def clearFinished(self) -> None:
+        self.__jobs__ = [job for job in self.__jobs__ if not job.isFinished()]
+
+    ##### Worker management
+    def __schedule__(self) -> None:
+        while self.__pending__ and len(self.__workers__) + len(self.__lookups__) < self.__worker_count__:
+            job: Job = self.__pending__.popleft()
+            if self.__result_cache__:
+                self.__lookUpResult__(job, self.__result_cache__)
+            else:
+                self.__startJob__(job)
+
+    def __lookUpResult__(self, job: Job, result_cache: ConversionResultCache) -> None:
+        # Hashing the input and restoring the output touch the disk, so both
+        # happen off the GUI thread
+        def look_up(report: Callable[[str], None]) -> tuple[str | None, bool]:
+            cache_key: str | None = result_cache.getJobKey(job)
+            if cache_key is None:
+                return (None, False)
+            if result_cache.restore(cache_key, job.getOutputFile()):
+                return (cache_key, True)
+            result_cache.detachOutput(job)
+            return (cache_key, False)
+
+        task: BackgroundTask = BackgroundTask(look_up, self)
+        task.succeeded.connect(lambda result: self.__onLookedUp__(job, *result))
+        task.failed.connect(lambda error: self.__onLookedUp__(job, None, False))
+        self.__lookups__[job] = task
+        job.markStarted()
+        self.jobStatusChanged.emit(job)
+        task.start()
+
+    def __onLookedUp__(self, job: Job, cache_key: str | None, restored: bool) -> None:
+        task: BackgroundTask | None = self.__lookups__.pop(job, None)
+        if task is not None:
+            task.deleteLater()
+        if job.status == JobStatus.CANCELLED:
+            print_log(f"{job} was cancelled before it started.")
+        elif restored:
+            job.markFromCache()
+            self.__releaseOutputs__(job)
+            print_log(f"{job} restored from the result cache.")
+            if self.__metrics__:
+                self.__metrics__.finish(job)
+            self.jobStatusChanged.emit(job)
+        else:
+            if cache_key:
+                self.__cache_keys__[job] = cache_key
+            self.__startJob__(job)
+            return
+        self.__schedule__()
+        if not self.isActive():
+            self.queueDrained.emit()
+
+    def __startJob__(self, job: Job) -> None:
+        worker = FFmpegWorkerProcess(self)
+        self.__workers__[worker] = job
+        worker.readyReadStandardOutput.connect(lambda: self.__onStdout__(job, worker.readAllStandardOutput().data()))
+        worker.readyReadStandardError.connect(lambda: self.__onStderr__(job, worker.readAllStandardError().data()))
+        worker.started.connect(lambda: self.__onStarted__(worker))
+        worker.finished.connect(lambda exit_code, exit_status: self.__onFinished__(worker, exit_code, exit_status))
+        worker.errorOccurred.connect(lambda error: self.__onError__(worker, error))
+
+        if job.current_pass == 0:
+            job.markStarted()
+        # Concurrent jobs split the CPUs instead of each spawning a full set of threads
+        arguments: list[str] = self.__scheduler__.start(job.getId(), job.getCurrentArguments(), len(self.__pending__))
+        worker.start(job.getProgram(), arguments)
+
+    def __onStdout__(self, job: Job, data: bytes) -> None:
+        # Only the latest progress block of a chunk is worth a repaint
+        if job.progress.feed(data):
+            self.jobProgress.emit(job)
+        self.jobStdout.emit(job, data)
+
+    def __onStderr__(self, job: Job, data: bytes) -> None:
+        job.progress.feedStderr(data)
+        self.jobStderr.emit(job, data)
+
+    def __onStarted__(self, worker: FFmpegWorkerProcess) -> None:
+        job: Job = self.__workers__[worker]
+        self.__scheduler__.attach(job.getId(), worker.processId())
+        if self.__metrics__:
+            # QProcess reaps the process before finished is emitted
+            self.__metrics__.attach(job, worker.processId(), watch_exit=True)
+        print_log(f"Worker {id(worker)} started {job}.")
+        self.jobStatusChanged.emit(job)
+
+    def __onFinished__(self, worker: FFmpegWorkerProcess, exit_code: int, exit_status: QProcess.ExitStatus) -> None:
+        job: Job | None = self.__workers__.pop(worker, None)
+        killed: bool = worker in self.__killed_workers__
+        self.__killed_workers__.discard(worker)
+        if job is None:
+            return
+        self.__scheduler__.finish(job.getId())
+        if self.__metrics__:
+            # The final sample was taken by the exit watcher, before Qt reaped the process
+            self.__metrics__.detach(job)
+        worker.deleteLater()
+        ##### Multi-pass jobs go on with their next pass in a fresh worker
+        if not killed and exit_status == QProcess.ExitStatus.NormalExit and exit_code == 0 and job.advancePass():
+            print_log(f"Worker {id(worker)} finished a pass of {job}, starting pass {job.current_pass + 1}.")
+            self.__startJob__(job)
+            return
+        job.removeTemporaryFiles()
+        if killed:
+            job.markCancelled()
+        elif exit_status == QProcess.ExitStatus.NormalExit:
+            job.markFinished(exit_code)
+        else:
+            # A crash, e.g. a segfault or the OOM killer, has no meaningful exit code
+            job.markFinished(exit_code or -1)
+        self.__releaseOutputs__(job)
+        print_log(f"Worker {id(worker)} finished {job}!")
+        cache_key: str | None = self.__cache_keys__.pop(job, None)
+        if job.status == JobStatus.DONE and cache_key and self.__result_cache__:
+            # Copying the output into the cache can take a while
+            threading.Thread(target=self.__result_cache__.store, args=(cache_key, job.getOutputFile()), daemon=True).start()
+        if self.__metrics__:
+            self.__metrics__.finish(job)
+
+        self.jobStatusChanged.emit(job)
+        self.__schedule__()
+        if not self.isActive():
+            self.queueDrained.emit()
+
+    def __onError__(self, worker: FFmpegWorkerProcess, error: QProcess.ProcessError) -> None:
+        # Only a failed start never reaches the finished signal
+        if error != QProcess.ProcessError.FailedToStart:
+            return
+        self.__onFinished__(worker, -1, QProcess.ExitStatus.NormalExit)
@@ -0,0 +1,169 @@
+from SimplyFFmpegApplication.ProgressParser import FFmpegProgressParser
+
+
+import glob
+import os
+import time
+from itertools import count
+
+
+def default_worker_count() -> int:
+    # FFmpeg encoders are already multi-threaded, so only a fraction of the
+    # cores get their own process
+    cpu_count: int = os.cpu_count() or 1
+    return max(1, cpu_count // 4)
+
+
+class JobStatus:
+    QUEUED: str = "Queued"
+    RUNNING: str = "Running"
+    DONE: str = "Done"
+    FAILED: str = "Failed"
+    CANCELLED: str = "Cancelled"
+
+    finished_states: tuple[str, ...] = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    __id_counter__ = count(1)
+
+    def __init__(
+        self, program: str, arguments: list[str], input_file: str = "", output_file: str = "",
+        extra_output_files: list[str] | None = None, first_passes: list[list[str]] | None = None,
+        temporary_files: list[str] | None = None
+    ) -> None:
+        self.__job_id__: int = next(Job.__id_counter__)
+        self.__program__: str = program
+        self.__arguments__: list[str] = arguments
+        self.__input_file__: str = input_file
+        self.__output_file__: str = output_file
+        # Further outputs written by the same invocation
+        self.__extra_output_files__: list[str] = extra_output_files or []
+        # Runs before the final one (e.g. the analysis pass of a two-pass
+        # encode), each with the same program
+        self.__passes__: list[list[str]] = [*(first_passes or []), arguments]
+        # Glob patterns of files the passes leave behind
+        self.__temporary_files__: list[str] = temporary_files or []
+        self.current_pass: int = 0
+
+        self.progress: FFmpegProgressParser = FFmpegProgressParser()
+        self.progress.configureFromArguments(arguments)
+        self.progress.startPass(0, len(self.__passes__))
+
+        self.status: str = JobStatus.QUEUED
+        self.exit_code: int | None = None
+        # Output was restored from the result cache instead of running FFmpeg
+        self.from_cache: bool = False
+        self.queued_at: float = time.monotonic()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    def getId(self) -> int:
+        return self.__job_id__
+    def getProgram(self) -> str:
+        return self.__program__
+    def getArguments(self) -> list[str]:
+        return self.__arguments__
+    def getInputFile(self) -> str:
+        return self.__input_file__
+    def getOutputFile(self) -> str:
+        return self.__output_file__
+    def getOutputFiles(self) -> list[str]:
+        return [self.__output_file__, *self.__extra_output_files__]
+    def getPasses(self) -> list[list[str]]:
+        return self.__passes__
+    def getCurrentArguments(self) -> list[str]:
+        return self.__passes__[self.current_pass]
+
+    def advancePass(self) -> bool:
+        # Moves on to the next pass, False once the final one has run
+        if self.current_pass + 1 >= len(self.__passes__):
+            return False
+        self.current_pass += 1
+        self.progress.startPass(self.current_pass, len(self.__passes__))
+        return True
+
+    def removeTemporaryFiles(self) -> None:
+        for pattern in self.__temporary_files__:
+            for path in glob.glob(pattern):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def isFinished(self) -> bool:
+        return self.status in JobStatus.finished_states
+
+    def markStarted(self) -> None:
+        self.status = JobStatus.RUNNING
+        self.started_at = time.monotonic()
+    def markFinished(self, exit_code: int) -> None:
+        self.exit_code = exit_code
+        self.status = JobStatus.DONE if exit_code == 0 else JobStatus.FAILED
+        self.finished_at = time.monotonic()
+    def markFromCache(self) -> None:
+        self.from_cache = True
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        self.markFinished(0)
+    def markCancelled(self) -> None:
+        self.status = JobStatus.CANCELLED
+        self.finished_at = time.monotonic()
+
+    def getWallTime(self) -> float | None:
+        if self.started_at is None:
+            return None
+        end: float = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    def getOutputSize(self) -> int:
+        if self.status != JobStatus.DONE:
+            return 0
+        return sum(os.path.getsize(path) for path in self.getOutputFiles() if os.path.isfile(path))
+
+    def __str__(self) -> str:
+        status: str = f"{self.status} from cache" if self.from_cache else self.status
+        outputs: str = ", ".join(os.path.basename(path) for path in self.getOutputFiles())
+        return f"Job {self.__job_id__} ({status}, {os.path.basename(self.__input_file__)} -> {outputs})"
+
+
+class QueueStatistics:
+    def __init__(self, jobs: list[Job]) -> None:
+        self.queued: int = sum(1 for job in jobs if job.status == JobStatus.QUEUED)
+        self.running: int = sum(1 for job in jobs if job.status == JobStatus.RUNNING)
+        self.done: int = sum(1 for job in jobs if job.status == JobStatus.DONE)
+        self.failed: int = sum(1 for job in jobs if job.status == JobStatus.FAILED)
+        self.cancelled: int = sum(1 for job in jobs if job.status == JobStatus.CANCELLED)
+
+        ##### Elapsed wall time since the first job of the batch started
+        start_times: list[float] = [job.started_at for job in jobs if job.started_at is not None]
+        self.elapsed: float = (time.monotonic() - min(start_times)) if start_times else 0.0
+        if start_times and self.running == 0 and self.queued == 0:
+            finish_times: list[float] = [job.finished_at for job in jobs if job.finished_at is not None]
+            if finish_times:
+                self.elapsed = max(finish_times) - min(start_times)
+
+        self.output_bytes: int = sum(job.getOutputSize() for job in jobs)
+        self.media_seconds: float = sum(job.progress.latest.out_time for job in jobs if job.progress.latest)
+
+    def getJobsPerMinute(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return (self.done + self.failed) * 60 / self.elapsed
+
+    def getBytesPerSecond(self) -> float:
+        if self.elapsed <= 0:
+            return 0.0
+        return self.output_bytes / self.elapsed
+
+    def getRealtimeFactor(self) -> float:
+        # Seconds of media encoded across all workers per second of wall time
+        if self.elapsed <= 0:
+            return 0.0
+        return self.media_seconds / self.elapsed
+
+    def __str__(self) -> str:
+        return (
+            f"{self.running} running, {self.queued} queued, {self.done} done, {self.failed} failed"
+            f" | {self.getJobsPerMinute():.1f} jobs/min, {self.getBytesPerSecond() / 1e6:.2f} MB/s, {self.getRealtimeFactor():.2f}x realtime"
+        )
@@ -0,0 +1,107 @@
+from SimplyFFmpegApplication.CommonHelpers import print_error
+
+
+import codecs
+from collections import deque
+from typing import Hashable, TextIO
+
+
+class LogBuffer:
+    """
+    Bounded, line-oriented log of one or more byte streams.
+        -> Each source gets its own incremental decoder, so multibyte characters
+           split across chunks survive
+        -> Only the last `line_cap` lines are kept in memory
+        -> Lines are handed out in batches via takePending()
+        -> Optionally, the full log is spilled to a file on disk
+    """
+    def __init__(self, line_cap: int = 5000) -> None:
+        self.__line_cap__: int = max(1, line_cap)
+        self.__lines__: deque[str] = deque(maxlen=self.__line_cap__)
+        self.__pending__: deque[str] = deque(maxlen=self.__line_cap__)
+        self.__decoders__: dict[Hashable, codecs.IncrementalDecoder] = {}
+        self.__partial_lines__: dict[Hashable, str] = {}
+        self.__last_source__: Hashable | None = None
+        self.__spill_file__: TextIO | None = None
+
+    def getLineCap(self) -> int:
+        return self.__line_cap__
+    def setLineCap(self, line_cap: int) -> None:
+        self.__line_cap__ = max(1, line_cap)
+        self.__lines__ = deque(self.__lines__, maxlen=self.__line_cap__)
+        self.__pending__ = deque(self.__pending__, maxlen=self.__line_cap__)
+
+    def getLines(self) -> list[str]:
+        return list(self.__lines__)
+
+    ##### Spilling
+    def startSpill(self, file_path: str) -> bool:
+        self.stopSpill()
+        try:
+            self.__spill_file__ = open(file_path, "a", encoding="utf-8")
+        except OSError as error:
+            print_error(f"Could not open log file {file_path}: {error}")
+            return False
+        return True
+
+    def stopSpill(self) -> None:
+        if self.__spill_file__:
+            self.__spill_file__.close()
+            self.__spill_file__ = None
+
+    def isSpilling(self) -> bool:
+        return self.__spill_file__ is not None
+
+    ##### Writing
+    def write(self, data: bytes, source: Hashable = None, label: str | None = None) -> None:
+        decoder: codecs.IncrementalDecoder | None = self.__decoders__.get(source)
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            self.__decoders__[source] = decoder
+        self.writeText(decoder.decode(data), source, label)
+
+    def writeText(self, text: str, source: Hashable = None, label: str | None = None) -> None:
+        if not text:
+            return
+        # FFmpeg redraws status lines with a bare carriage return
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        *lines, partial = (self.__partial_lines__.pop(source, "") + text).split("\n")
+        if partial:
+            self.__partial_lines__[source] = partial
+        self.__pushLines__(lines, source, label)
+
+    def finishSource(self, source: Hashable = None, label: str | None = None) -> None:
+        decoder: codecs.IncrementalDecoder | None = self.__decoders__.pop(source, None)
+        tail: str = decoder.decode(b"", final=True) if decoder else ""
+        partial: str = self.__partial_lines__.pop(source, "") + tail
+        if partial:
+            self.__pushLines__([partial], source, label)
+
+    def __pushLines__(self, lines: list[str], source: Hashable, label: str | None) -> None:
+        if not lines:
+            return
+        # Label the log whenever lines switch between sources
+        if label is not None and source != self.__last_source__:
+            lines = [label, *lines]
+        self.__last_source__ = source
+
+        self.__lines__.extend(lines)
+        self.__pending__.extend(lines)
+
+        if self.__spill_file__:
+            self.__spill_file__.write("\n".join(lines) + "\n")
+
+    ##### Reading
+    def takePending(self) -> list[str]:
+        lines: list[str] = list(self.__pending__)
+        self.__pending__.clear()
+        return lines
+
+    def clear(self) -> None:
+        self.__lines__.clear()
+        self.__pending__.clear()
+        self.__decoders__.clear()
+        self.__partial_lines__.clear()
+        self.__last_source__ = None
+        if self.__spill_file__:
+            self.__spill_file__.flush()
@@ -0,0 +1,160 @@
+from SimplyFFmpegApplication.CommonHelpers import get_cache_directory, print_error, print_log
+from SimplyFFmpegApplication.MediaProbe import MediaProber
+from SimplyFFmpegApplication.PersistentCache import PersistentCache
+
+
+import json
+import math
+import os
+import subprocess
+import threading
+from typing import Any, Callable
+
+
+# EBU R128 ceiling for the true peak, in dBTP. The loudness range target is
+# kept wide so that most sources fit it and loudnorm stays in linear mode
+default_true_peak: float = -1.0
+default_loudness_range: float = 20.0
+
+# The values loudnorm prints with print_format=json that the second pass takes back
+measurement_fields: tuple[str, ...] = ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")
+
+
+class LoudnessMeasurement:
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.__data__: dict[str, Any] = data
+
+    def getData(self) -> dict[str, Any]:
+        return self.__data__
+    def getIntegrated(self) -> float:
+        return float(self.__data__["input_i"])
+    def getTruePeak(self) -> float:
+        return float(self.__data__["input_tp"])
+    def getRange(self) -> float:
+        return float(self.__data__["input_lra"])
+    def getThreshold(self) -> float:
+        return float(self.__data__["input_thresh"])
+    def getTargetOffset(self) -> float:
+        return float(self.__data__["target_offset"])
+
+    @staticmethod
+    def fromOutput(stderr: str) -> "LoudnessMeasurement | None":
+        # The JSON block is the last thing loudnorm prints
+        start: int = stderr.rfind("{")
+        end: int = stderr.find("}", start)
+        if start < 0 or end < 0:
+            return None
+        try:
+            data: Any = json.loads(stderr[start:end + 1])
+            values: dict[str, float] = {field: float(data[field]) for field in measurement_fields}
+        except (KeyError, TypeError, ValueError):
+            return None
+        # Silence measures as -inf, there is nothing to normalize
+        if not all(math.isfinite(value) for value in values.values()):
+            return None
+        return LoudnessMeasurement(values)
+
+    def __str__(self) -> str:
+        return f"{self.getIntegrated():.1f} LUFS, true peak {self.getTruePeak():.1f} dBTP, range {self.getRange():.1f} LU"
+
+
+def build_loudnorm_filter(target: float, measurement: LoudnessMeasurement | None) -> str:
+    """
+    The loudnorm filter for a target integrated loudness. With a measurement
+    of the input, the gain is applied linearly in one go; without one,
+    loudnorm adapts the gain dynamically as it goes.
+    """
+    loudnorm_filter: str = f"loudnorm=I={target:g}:TP={default_true_peak:g}:LRA={default_loudness_range:g}"
+    if measurement is None:
+        return loudnorm_filter
+    return (
+        f"{loudnorm_filter}"
+        f":measured_I={measurement.getIntegrated():.2f}:measured_TP={measurement.getTruePeak():.2f}"
+        f":measured_LRA={measurement.getRange():.2f}:measured_thresh={measurement.getThreshold():.2f}"
+        f":offset={measurement.getTargetOffset():.2f}:linear=true"
+    )
+
+
+class LoudnessAnalyzer:
+    """
+    Measures the loudness of an input with loudnorm's analysis mode, decoding
+    the audio only (-vn, null muxer). Measurements are cached on disk, keyed
+    by the file identity (path, size, mtime), the measured span and the
+    target, so re-exports of the same source skip the analysis.
+    """
+    def __init__(self, ffmpeg_path: str = "ffmpeg", cache_file: str | None = None, max_entries: int = 1024) -> None:
+        self.__ffmpeg_path__: str = ffmpeg_path
+        if cache_file is None:
+            cache_file = os.path.join(get_cache_directory(), "loudness_cache.json")
+        self.__cache__: PersistentCache = PersistentCache(cache_file, max_entries)
+
+    @staticmethod
+    def getCacheKey(file_path: str, target: float, seek: str = "", duration: str = "") -> str | None:
+        identity_key: str | None = MediaProber.getCacheKey(file_path)
+        if identity_key is None:
+            return None
+        return json.dumps([identity_key, seek, duration, target, default_true_peak, default_loudness_range])
+
+    def getCached(self, file_path: str, target: float, seek: str = "", duration: str = "") -> LoudnessMeasurement | None:
+        # Never runs FFmpeg
+        key: str | None = self.getCacheKey(file_path, target, seek, duration)
+        if key is None:
+            return None
+        data: Any = self.__cache__.get(key)
+        return LoudnessMeasurement(data) if isinstance(data, dict) else None
+
+    def analyze(
+        self, file_path: str, target: float, seek: str = "", duration: str = "",
+        report: Callable[[str], None] | None = print_log
+    ) -> LoudnessMeasurement | None:
+        key: str | None = self.getCacheKey(file_path, target, seek, duration)
+        if key is None:
+            return None
+        cached: Any = self.__cache__.get(key)
+        if isinstance(cached, dict):
+            return LoudnessMeasurement(cached)
+
+        ##### Cache miss, decode the audio once through loudnorm
+        if report:
+            report(f"Measuring the loudness of {os.path.basename(file_path)}")
+        arguments: list[str] = [self.__ffmpeg_path__, "-hide_banner", "-nostats"]
+        if seek:
+            arguments.extend(["-ss", seek])
+        arguments.extend(["-i", file_path])
+        if duration:
+            arguments.extend(["-t", duration])
+        arguments.extend([
+            "-map", "0:a:0", "-vn", "-sn", "-dn",
+            "-filter:a", f"{build_loudnorm_filter(target, None)}:print_format=json",
+            "-f", "null", "-"
+        ])
+        try:
+            result: subprocess.CompletedProcess[bytes] = subprocess.run(arguments, capture_output=True)
+        except OSError as error:
+            print_error(f"Loudness analysis failed for {file_path}: {error}")
+            return None
+        stderr: str = result.stderr.decode(errors="replace")
+        if result.returncode != 0:
+            error_lines: list[str] = stderr.strip().splitlines()
+            print_error(f"Loudness analysis failed for {file_path}: {error_lines[-1] if error_lines else result.returncode}")
+            return None
+        measurement: LoudnessMeasurement | None = LoudnessMeasurement.fromOutput(stderr)
+        if measurement is None:
+            print_error(f"Loudness analysis of {file_path} found no measurable audio.")
+            return None
+
+        self.__cache__.put(key, measurement.getData())
+        if report:
+            report(f"Loudness of {os.path.basename(file_path)}: {measurement}")
+        return measurement
+
+
+_default_loudness_analyzer: LoudnessAnalyzer | None = None
+_default_loudness_analyzer_lock: threading.Lock = threading.Lock()
+
+def get_loudness_analyzer() -> LoudnessAnalyzer:
+    global _default_loudness_analyzer
+    with _default_loudness_analyzer_lock:
+        if _default_loudness_analyzer is None:
+            _default_loudness_analyzer = LoudnessAnalyzer()
+        return _default_loudness_analyzer
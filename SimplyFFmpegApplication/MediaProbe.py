@@ -0,0 +1,308 @@
+from SimplyFFmpegApplication.CommonHelpers import get_cache_directory, get_file_identity, print_error
+from SimplyFFmpegApplication.PersistentCache import PersistentCache
+
+
+import json
+import os
+import subprocess
+import threading
+from typing import Any
+
+
+class MediaInfo:
+    def __init__(self, probe_data: dict[str, Any]) -> None:
+        self.__probe_data__: dict[str, Any] = probe_data
+        self.__format__: dict[str, Any] = probe_data.get("format", {})
+        self.__streams__: list[dict[str, Any]] = probe_data.get("streams", [])
+
+    def getProbeData(self) -> dict[str, Any]:
+        return self.__probe_data__
+    def getFormat(self) -> dict[str, Any]:
+        return self.__format__
+    def getStreams(self) -> list[dict[str, Any]]:
+        return self.__streams__
+
+    def getFormatName(self) -> str:
+        return str(self.__format__.get("format_name", ""))
+
+    def getDuration(self) -> float | None:
+        return self.__toFloat__(self.__format__.get("duration"))
+    def getStartTime(self) -> float | None:
+        return self.__toFloat__(self.__format__.get("start_time"))
+
+    def getBitrate(self) -> int | None:
+        return self.__toInt__(self.__format__.get("bit_rate"))
+
+    ##### Streams
+    def getVideoStream(self) -> dict[str, Any] | None:
+        # Cover art in audio files shows up as a single-frame video stream
+        for stream in self.__streams__:
+            if stream.get("codec_type") == "video" and not stream.get("disposition", {}).get("attached_pic"):
+                return stream
+        return None
+
+    def getAudioStream(self) -> dict[str, Any] | None:
+        for stream in self.__streams__:
+            if stream.get("codec_type") == "audio":
+                return stream
+        return None
+
+    def hasVideo(self) -> bool:
+        return self.getVideoStream() is not None
+    def hasAudio(self) -> bool:
+        return self.getAudioStream() is not None
+
+    ##### Video
+    def getVideoCodec(self) -> str | None:
+        stream: dict[str, Any] | None = self.getVideoStream()
+        return stream.get("codec_name") if stream else None
+
+    def getResolution(self) -> tuple[int, int] | None:
+        stream: dict[str, Any] | None = self.getVideoStream()
+        if not stream or not stream.get("width") or not stream.get("height"):
+            return None
+        return (int(stream["width"]), int(stream["height"]))
+
+    def getFrameRate(self) -> float | None:
+        stream: dict[str, Any] | None = self.getVideoStream()
+        if not stream:
+            return None
+        # e.g. "30000/1001"
+        frame_rate: str = str(stream.get("avg_frame_rate") or stream.get("r_frame_rate") or "")
+        numerator, _, denominator = frame_rate.partition("/")
+        try:
+            value: float = float(numerator) / float(denominator or 1)
+        except (ValueError, ZeroDivisionError):
+            return None
+        return value if value > 0 else None
+
+    def getVideoBitrate(self) -> int | None:
+        stream: dict[str, Any] | None = self.getVideoStream()
+        if not stream:
+            return None
+        bitrate: int | None = self.__toInt__(stream.get("bit_rate"))
+        if bitrate is None:
+            # Matroska and WebM only carry the overall bitrate
+            overall_bitrate: int | None = self.getBitrate()
+            audio_bitrate: int = self.getAudioBitrate() or 0
+            if overall_bitrate is not None:
+                bitrate = max(0, overall_bitrate - audio_bitrate)
+        return bitrate
+
+    ##### Audio
+    def getAudioCodec(self) -> str | None:
+        stream: dict[str, Any] | None = self.getAudioStream()
+        return stream.get("codec_name") if stream else None
+
+    def getAudioBitrate(self) -> int | None:
+        stream: dict[str, Any] | None = self.getAudioStream()
+        return self.__toInt__(stream.get("bit_rate")) if stream else None
+
+    def getSampleRate(self) -> int | None:
+        stream: dict[str, Any] | None = self.getAudioStream()
+        return self.__toInt__(stream.get("sample_rate")) if stream else None
+
+    @staticmethod
+    def __toInt__(value: Any) -> int | None:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def __toFloat__(value: Any) -> float | None:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def __str__(self) -> str:
+        parts: list[str] = [self.getFormatName()]
+        duration: float | None = self.getDuration()
+        if duration is not None:
+            parts.append(f"{duration:.2f}s")
+        if self.hasVideo():
+            resolution: tuple[int, int] | None = self.getResolution()
+            frame_rate: float | None = self.getFrameRate()
+            video: str = str(self.getVideoCodec())
+            if resolution:
+                video += f" {resolution[0]}x{resolution[1]}"
+            if frame_rate:
+                video += f" @ {frame_rate:.3g} fps"
+            parts.append(video)
+        if self.hasAudio():
+            parts.append(str(self.getAudioCodec()))
+        return ", ".join(parts)
+
+
+class MediaProber:
+    """
+    Runs ffprobe at most once per input file. Results are cached on disk,
+    keyed by (path, size, mtime), and evicted least-recently-used first.
+    """
+    def __init__(self, ffprobe_path: str = "ffprobe", cache_file: str | None = None, max_entries: int = 1024) -> None:
+        self.__ffprobe_path__: str = ffprobe_path
+        if cache_file is None:
+            cache_file = os.path.join(get_cache_directory(), "probe_cache.json")
+        self.__cache__: PersistentCache = PersistentCache(cache_file, max_entries)
+
+    @staticmethod
+    def getCacheKey(file_path: str) -> str | None:
+        identity: tuple[str, int, int] | None = get_file_identity(file_path)
+        if identity is None:
+            return None
+        return json.dumps(identity)
+
+    def getCached(self, file_path: str) -> MediaInfo | None:
+        key: str | None = self.getCacheKey(file_path)
+        if key is None:
+            return None
+        probe_data: Any = self.__cache__.get(key)
+        return MediaInfo(probe_data) if isinstance(probe_data, dict) else None
+
+    def probe(self, file_path: str) -> MediaInfo | None:
+        key: str | None = self.getCacheKey(file_path)
+        if key is None:
+            return None
+        probe_data: Any = self.__cache__.get(key)
+        if isinstance(probe_data, dict):
+            return MediaInfo(probe_data)
+
+        ##### Cache miss, run ffprobe
+        arguments: list[str] = [
+            self.__ffprobe_path__,
+            "-v", "error",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            file_path
+        ]
+        try:
+            result: subprocess.CompletedProcess[bytes] = subprocess.run(arguments, capture_output=True, timeout=60)
+        except (OSError, subprocess.TimeoutExpired) as error:
+            print_error(f"ffprobe failed for {file_path}: {error}")
+            return None
+        if result.returncode != 0:
+            print_error(f"ffprobe failed for {file_path}: {result.stderr.decode(errors='replace').strip()}")
+            return None
+        try:
+            probe_data = json.loads(result.stdout)
+        except ValueError as error:
+            print_error(f"ffprobe returned invalid JSON for {file_path}: {error}")
+            return None
+
+        self.__cache__.put(key, probe_data)
+        return MediaInfo(probe_data)
+
+    def findKeyframeBefore(self, file_path: str, seconds: float) -> float | None:
+        """
+        Timestamp of the last video keyframe at or before `seconds`, read from
+        packet flags (nothing is decoded). Only a window before the target is
+        scanned, widened until a keyframe is found.
+        """
+        key: str | None = self.getCacheKey(file_path)
+        if key is None:
+            return None
+        key = f"keyframe:{key}:{seconds:.3f}"
+        cached: Any = self.__cache__.get(key)
+        if isinstance(cached, (int, float)):
+            return float(cached)
+
+        # Packet timestamps are absolute, while -ss is relative to the start time
+        info: MediaInfo | None = self.probe(file_path)
+        start_time: float = (info.getStartTime() if info else None) or 0.0
+        for window in (20.0, 120.0, seconds):
+            start: float = max(0.0, seconds - window)
+            arguments: list[str] = [
+                self.__ffprobe_path__,
+                "-v", "error",
+                "-select_streams", "v:0",
+                "-read_intervals", f"{start + start_time:.3f}%{seconds + start_time:.3f}",
+                "-show_entries", "packet=pts_time,flags",
+                "-print_format", "json",
+                file_path
+            ]
+            try:
+                result: subprocess.CompletedProcess[bytes] = subprocess.run(arguments, capture_output=True, timeout=60)
+                packets: list[dict[str, Any]] = json.loads(result.stdout).get("packets", []) if result.returncode == 0 else []
+            except (OSError, subprocess.TimeoutExpired, ValueError) as error:
+                print_error(f"Keyframe lookup failed for {file_path}: {error}")
+                return None
+
+            keyframe: float | None = None
+            for packet in packets:
+                if "K" not in str(packet.get("flags", "")):
+                    continue
+                try:
+                    pts_time: float = float(packet["pts_time"]) - start_time
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if pts_time <= seconds and (keyframe is None or pts_time > keyframe):
+                    keyframe = pts_time
+            if keyframe is not None:
+                self.__cache__.put(key, keyframe)
+                return keyframe
+            if start <= 0.0:
+                break
+        return None
+
+    def getKeyframes(self, file_path: str) -> list[float] | None:
+        """
+        Timestamps of every video keyframe, in ascending order, read from
+        packet flags (nothing is decoded). The index is cached like probes.
+        """
+        key: str | None = self.getCacheKey(file_path)
+        if key is None:
+            return None
+        key = f"keyframes:{key}"
+        cached: Any = self.__cache__.get(key)
+        if isinstance(cached, list):
+            return [float(keyframe) for keyframe in cached]
+
+        info: MediaInfo | None = self.probe(file_path)
+        start_time: float = (info.getStartTime() if info else None) or 0.0
+        arguments: list[str] = [
+            self.__ffprobe_path__,
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            # One short line per packet, far smaller than JSON on long inputs
+            "-print_format", "csv=print_section=0",
+            file_path
+        ]
+        try:
+            result: subprocess.CompletedProcess[bytes] = subprocess.run(arguments, capture_output=True)
+        except OSError as error:
+            print_error(f"Keyframe indexing failed for {file_path}: {error}")
+            return None
+        if result.returncode != 0:
+            print_error(f"Keyframe indexing failed for {file_path}: {result.stderr.decode(errors='replace').strip()}")
+            return None
+
+        keyframes: set[float] = set()
+        for line in result.stdout.decode(errors="replace").splitlines():
+            pts_time, _, flags = line.partition(",")
+            if "K" not in flags:
+                continue
+            try:
+                keyframes.add(round(float(pts_time) - start_time, 6))
+            except ValueError:
+                continue
+        index: list[float] = sorted(keyframes)
+        self.__cache__.put(key, index)
+        return index
+
+    def probeInBackground(self, file_path: str) -> None:
+        # Warms the cache without blocking the caller
+        threading.Thread(target=self.probe, args=(file_path,), daemon=True).start()
+
+
+_default_prober: MediaProber | None = None
+_default_prober_lock: threading.Lock = threading.Lock()
+
+def get_media_prober() -> MediaProber:
+    global _default_prober
+    with _default_prober_lock:
+        if _default_prober is None:
+            _default_prober = MediaProber()
+        return _default_prober
@@ -0,0 +1,256 @@
+from SimplyFFmpegApplication.CommonHelpers import parse_time_to_seconds, print_log
+from SimplyFFmpegApplication.CommandModel import Argument
+from SimplyFFmpegApplication.MediaProbe import MediaInfo, MediaProber, get_media_prober
+from SimplyFFmpegApplication.ThreadBudget import apply_thread_budget, get_available_cpus
+
+
+import csv
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+# Options that only make sense for the single-process command
+single_process_flags: tuple[str, ...] = ("-progress", "-nostats", "-y", "-n")
+trim_flags: tuple[str, ...] = ("-ss", "-t")
+
+
+class ParallelEncodeResult:
+    def __init__(self) -> None:
+        self.success: bool = False
+        self.message: str = ""
+        self.wall_time: float = 0.0
+        self.split_time: float = 0.0
+        self.concat_time: float = 0.0
+        self.segment_times: list[float] = []
+        self.audio_time: float = 0.0
+        self.baseline_time: float | None = None
+        self.expected_duration: float | None = None
+        self.output_duration: float | None = None
+        self.duration_ok: bool = False
+
+    def getEncodeTime(self) -> float:
+        # Segments run with a share of the threads each, so this isn't a serial run
+        return sum(self.segment_times) + self.audio_time
+
+    def getSpeedup(self) -> float | None:
+        # Only against a measured single-process run
+        if self.baseline_time is None or self.wall_time <= 0:
+            return None
+        return self.baseline_time / self.wall_time
+
+    def __str__(self) -> str:
+        if not self.success:
+            return f"Parallel encode failed: {self.message}"
+        lines: list[str] = [
+            f"Parallel encode finished in {self.wall_time:.1f}s ({len(self.segment_times)} segments).",
+            f"    Split {self.split_time:.1f}s, slowest segment {max(self.segment_times, default=0):.1f}s, concat {self.concat_time:.1f}s",
+        ]
+        speedup: float | None = self.getSpeedup()
+        if speedup is not None and self.baseline_time is not None:
+            lines.append(f"    Speedup: {speedup:.2f}x against a single-process run ({self.baseline_time:.1f}s)")
+        else:
+            lines.append(f"    Summed encode time {self.getEncodeTime():.1f}s, no reference run was measured")
+        if self.output_duration is not None and self.expected_duration is not None:
+            verdict: str = "OK" if self.duration_ok else "MISMATCH"
+            lines.append(f"    Duration: {self.output_duration:.2f}s, expected {self.expected_duration:.2f}s ({verdict})")
+        if self.message:
+            lines.append(f"    {self.message}")
+        return "\n".join(lines)
+
+
+class SegmentParallelEncoder:
+    """
+    Splits the input at keyframes into segments, encodes the video of each
+    segment in its own FFmpeg process, encodes the audio once in parallel,
+    then joins everything with the concat demuxer without re-encoding.
+
+    The split only seeks to the keyframe before the start, as a stream copy
+    can't cut anywhere else; the exact start and duration are applied when
+    the segments are encoded, so the video lines up with the audio, which is
+    trimmed exactly. Every process gets an equal share of the CPUs.
+    """
+    def __init__(
+        self, program: str, arguments: list[str], segment_count: int,
+        report: Callable[[str], None] = print_log, prober: MediaProber | None = None
+    ) -> None:
+        self.__program__: str = program
+        self.__arguments__: list[Argument] = Argument.parseList(arguments)
+        self.__segment_count__: int = max(1, segment_count)
+        self.__report__: Callable[[str], None] = report
+        self.__prober__: MediaProber = prober or get_media_prober()
+
+        self.__input_file__: str = ""
+        self.__output_file__: str = ""
+        for argument in self.__arguments__:
+            if argument.getFlag() == "-i":
+                self.__input_file__ = str(argument.getValue())
+        if self.__arguments__ and self.__arguments__[-1].getValue() is None:
+            self.__output_file__ = self.__arguments__[-1].getFlag()
+        self.__overwrite__: bool = any(argument.getFlag() == "-y" for argument in self.__arguments__)
+
+    ##### Argument rewriting
+    def __rewrite__(self, input_file: str, output_file: str, drop_types: tuple[str, ...], drop_flags: tuple[str, ...], extra: list[str]) -> list[str]:
+        arguments: list[str] = ["-hide_banner", "-nostats", "-y"]
+        for argument in self.__arguments__[:-1]:
+            flag: str = argument.getFlag()
+            if flag in drop_flags or argument.getStreamType() in drop_types:
+                continue
+            if flag == "-i":
+                argument = Argument("-i", input_file)
+            arguments.extend(argument.toList())
+        arguments.extend(extra)
+        arguments.append(output_file)
+        return arguments
+
+    def __runStep__(self, arguments: list[str]) -> float:
+        started_at: float = time.monotonic()
+        result: subprocess.CompletedProcess[bytes] = subprocess.run(
+            [self.__program__, *arguments], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            stderr: list[str] = result.stderr.decode(errors="replace").strip().splitlines()
+            raise Exception(stderr[-1] if stderr else f"FFmpeg exited with code {result.returncode}")
+        return time.monotonic() - started_at
+
+    @staticmethod
+    def __escapeConcatPath__(path: str) -> str:
+        return "'" + path.replace("'", "'\\''") + "'"
+
+    ##### Pipeline
+    def run(self, measure_baseline: bool = False) -> ParallelEncodeResult:
+        result: ParallelEncodeResult = ParallelEncodeResult()
+        if not (self.__input_file__ and self.__output_file__):
+            result.message = "Missing input or output file."
+            return result
+        if os.path.exists(self.__output_file__) and not self.__overwrite__:
+            result.message = "Output file already exists."
+            return result
+
+        input_info: MediaInfo | None = self.__prober__.probe(self.__input_file__)
+        if not input_info or not input_info.hasVideo() or not input_info.getDuration():
+            result.message = "Parallel encoding needs a video input with a known duration."
+            return result
+
+        ##### Expected output duration after trimming
+        trim: dict[str, float] = {}
+        for argument in self.__arguments__:
+            if argument.getFlag() == "-ss":
+                trim["-ss"] = trim.get("-ss", 0.0) + (parse_time_to_seconds(str(argument.getValue())) or 0.0)
+            elif argument.getFlag() == "-t":
+                trim["-t"] = parse_time_to_seconds(str(argument.getValue())) or 0.0
+        expected_duration: float = max(0.0, (input_info.getDuration() or 0.0) - trim.get("-ss", 0.0))
+        if "-t" in trim:
+            expected_duration = min(expected_duration, trim["-t"])
+        result.expected_duration = expected_duration
+
+        ##### The copy starts at the keyframe before the start, the rest is cut when encoding
+        start: float = trim.get("-ss", 0.0)
+        split_start: float = (self.__prober__.findKeyframeBefore(self.__input_file__, start) or 0.0) if start > 0 else 0.0
+        split_start = min(split_start, start)
+        # Where the output starts and ends, in the timeline of the split
+        cut_start: float = start - split_start
+        cut_end: float = cut_start + expected_duration
+
+        output_extension: str = os.path.splitext(self.__output_file__)[1]
+        work_directory: str = tempfile.mkdtemp(prefix=".simplyffmpeg_parallel_", dir=os.path.dirname(os.path.abspath(self.__output_file__)))
+        started_at: float = time.monotonic()
+        try:
+            ##### 1. Split the video at keyframes, covering the trimmed span
+            segment_length: float = max(1.0, expected_duration / self.__segment_count__)
+            segment_pattern: str = os.path.join(work_directory, "source_%04d.mkv")
+            segment_list: str = os.path.join(work_directory, "sources.csv")
+            self.__report__(f"Splitting into ~{self.__segment_count__} segments of {segment_length:.1f}s...")
+            split_seek: list[str] = ["-ss", f"{split_start:.6f}"] if split_start > 0 else []
+            # A second of margin, the copy stops at packets and the encode cuts at frames
+            split_length: list[str] = ["-t", f"{cut_end + 1.0:.6f}"] if "-t" in trim else []
+            result.split_time = self.__runStep__([
+                "-hide_banner", "-nostats", "-y",
+                *split_seek, "-i", self.__input_file__, *split_length,
+                "-map", "0:v:0", "-c", "copy",
+                "-f", "segment", "-segment_time", f"{segment_length:.3f}", "-reset_timestamps", "1",
+                "-segment_list", segment_list, "-segment_list_type", "csv",
+                segment_pattern
+            ])
+
+            # Every segment with the part of it that falls inside the cut, as (source, start, end)
+            sources: list[tuple[str, float, float | None]] = []
+            with open(segment_list, newline="", encoding="utf-8") as file:
+                rows: list[list[str]] = [row for row in csv.reader(file) if len(row) >= 3]
+            for idx, (name, segment_start_value, segment_end_value) in enumerate(row[:3] for row in rows):
+                segment_start: float = float(segment_start_value)
+                segment_end: float = float(segment_end_value)
+                if segment_end <= cut_start or segment_start >= cut_end:
+                    continue
+                local_start: float = max(0.0, cut_start - segment_start)
+                # Only a requested duration cuts the end, the listed end of the last segment is approximate
+                local_end: float | None = None
+                if "-t" in trim and (cut_end < segment_end or idx == len(rows) - 1):
+                    local_end = cut_end - segment_start
+                sources.append((os.path.join(work_directory, name), local_start, local_end))
+            if not sources:
+                raise Exception("Splitting produced no segments.")
+
+            ##### 2. Encode every video segment, plus the whole audio track, concurrently
+            encoded: list[str] = [os.path.join(work_directory, f"encoded_{idx:04d}{output_extension}") for idx in range(len(sources))]
+            audio_output: str | None = os.path.join(work_directory, f"audio{output_extension}") if input_info.hasAudio() else None
+            process_count: int = len(sources) + (1 if audio_output else 0)
+            threads: int = max(1, len(get_available_cpus()) // process_count)
+
+            def encode_segment(idx: int) -> float:
+                source, local_start, local_end = sources[idx]
+                cut: list[str] = ["-ss", f"{local_start:.6f}"] if local_start > 0 else []
+                if local_end is not None:
+                    cut.extend(["-t", f"{local_end - local_start:.6f}"])
+                arguments: list[str] = self.__rewrite__(source, encoded[idx], ("audio",), (*single_process_flags, *trim_flags), [*cut, "-an"])
+                segment_time: float = self.__runStep__(apply_thread_budget(arguments, threads))
+                self.__report__(f"Segment {idx + 1}/{len(sources)} encoded in {segment_time:.1f}s")
+                return segment_time
+
+            def encode_audio() -> float:
+                assert audio_output
+                arguments: list[str] = self.__rewrite__(self.__input_file__, audio_output, ("video",), single_process_flags, ["-vn"])
+                return self.__runStep__(apply_thread_budget(arguments, threads))
+
+            with ThreadPoolExecutor(max_workers=process_count) as executor:
+                audio_future = executor.submit(encode_audio) if audio_output else None
+                result.segment_times = list(executor.map(encode_segment, range(len(sources))))
+                result.audio_time = audio_future.result() if audio_future else 0.0
+
+            ##### 3. Join without re-encoding
+            concat_list: str = os.path.join(work_directory, "segments.txt")
+            with open(concat_list, "w", encoding="utf-8") as file:
+                for path in encoded:
+                    file.write(f"file {self.__escapeConcatPath__(path)}\n")
+            concat_arguments: list[str] = ["-hide_banner", "-nostats", "-y", "-f", "concat", "-safe", "0", "-i", concat_list]
+            if audio_output:
+                concat_arguments.extend(["-i", audio_output, "-map", "0:v", "-map", "1:a"])
+            concat_arguments.extend(["-c", "copy", self.__output_file__])
+            result.concat_time = self.__runStep__(concat_arguments)
+            result.wall_time = time.monotonic() - started_at
+
+            ##### 4. Optional single-process reference run
+            if measure_baseline:
+                self.__report__("Measuring single-process reference run...")
+                baseline_output: str = os.path.join(work_directory, f"baseline{output_extension}")
+                result.baseline_time = self.__runStep__(self.__rewrite__(self.__input_file__, baseline_output, (), single_process_flags, []))
+        except Exception as error:
+            result.message = str(error)
+            return result
+        finally:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+        ##### Verify the joined output
+        output_info: MediaInfo | None = self.__prober__.probe(self.__output_file__)
+        result.output_duration = output_info.getDuration() if output_info else None
+        if result.output_duration is not None:
+            tolerance: float = max(0.5, expected_duration * 0.01)
+            result.duration_ok = abs(result.output_duration - expected_duration) <= tolerance
+        result.success = True
+        if not result.duration_ok:
+            result.message = "Output duration does not match the input."
+        return result
@@ -0,0 +1,111 @@
+from SimplyFFmpegApplication.CommonHelpers import is_output_path_valid, uses_standard_stream
+
+
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+
+
+class StatCache:
+    """
+    Remembers os.stat results, missing paths included, for `ttl` seconds, so
+    validating a path while it is typed costs one stat per directory and file
+    instead of one per keystroke. Stats on network mounts can take hundreds of
+    milliseconds, so callers run these off the GUI thread.
+    """
+    def __init__(self, ttl: float = 2.0, max_entries: int = 512) -> None:
+        self.__ttl__: float = ttl
+        self.__max_entries__: int = max(1, max_entries)
+        # path -> (monotonic time of the stat, st_mode or None if missing)
+        self.__entries__: OrderedDict[str, tuple[float, int | None]] = OrderedDict()
+        self.__lock__: threading.Lock = threading.Lock()
+
+    def getMode(self, path: str, max_age: float | None = None) -> int | None:
+        """
+        The st_mode of `path`, or None if it does not exist. `max_age`
+        overrides the TTL, 0 always stats again.
+        """
+        max_age = self.__ttl__ if max_age is None else max_age
+        now: float = time.monotonic()
+        with self.__lock__:
+            entry: tuple[float, int | None] | None = self.__entries__.get(path)
+            if entry is not None and now - entry[0] <= max_age:
+                self.__entries__.move_to_end(path)
+                return entry[1]
+
+        mode: int | None
+        try:
+            mode = os.stat(path).st_mode
+        except (OSError, ValueError):
+            mode = None
+
+        with self.__lock__:
+            self.__entries__[path] = (time.monotonic(), mode)
+            self.__entries__.move_to_end(path)
+            while len(self.__entries__) > self.__max_entries__:
+                self.__entries__.popitem(last=False)
+        return mode
+
+    def isFile(self, path: str, max_age: float | None = None) -> bool:
+        mode: int | None = self.getMode(path, max_age) if path else None
+        return mode is not None and stat.S_ISREG(mode)
+
+    def isDir(self, path: str, max_age: float | None = None) -> bool:
+        mode: int | None = self.getMode(path, max_age) if path else None
+        return mode is not None and stat.S_ISDIR(mode)
+
+    def isFifo(self, path: str, max_age: float | None = None) -> bool:
+        mode: int | None = self.getMode(path, max_age) if path else None
+        return mode is not None and stat.S_ISFIFO(mode)
+
+    def invalidate(self, path: str | None = None) -> None:
+        with self.__lock__:
+            if path is None:
+                self.__entries__.clear()
+            else:
+                self.__entries__.pop(path, None)
+
+
+def validate_input_path(input_file: str, stat_cache: StatCache, max_age: float | None = None) -> int:
+    """
+    Output Codes:
+        0   -> Input file doesn't exist
+        1   -> OK
+    """
+    # A named FIFO is read as a stream, whatever writes into it
+    if not (input_file and (stat_cache.isFile(input_file, max_age) or stat_cache.isFifo(input_file, max_age))):
+        return 0
+    return 1
+
+def validate_output_path(input_file: str, output_file: str, stat_cache: StatCache, max_age: float | None = None) -> int:
+    """
+    Output Codes:
+        -1  -> Output file already exists
+        0   -> Output path is invalid
+        1   -> OK
+    """
+    # The GUI reads FFmpeg's standard output for progress, so it can't carry the stream too
+    if uses_standard_stream(output_file):
+        return 0
+    if not is_output_path_valid(
+        output_file, lambda directory: stat_cache.isDir(directory, max_age), lambda path: stat_cache.isFifo(path, max_age)
+    ):
+        return 0
+    if os.path.normcase(os.path.normpath(output_file)) == os.path.normcase(os.path.normpath(input_file)):
+        return 0
+    if stat_cache.isFile(output_file, max_age):
+        return -1
+    return 1
+
+
+_default_stat_cache: StatCache | None = None
+_default_stat_cache_lock: threading.Lock = threading.Lock()
+
+def get_stat_cache() -> StatCache:
+    global _default_stat_cache
+    with _default_stat_cache_lock:
+        if _default_stat_cache is None:
+            _default_stat_cache = StatCache()
+        return _default_stat_cache
@@ -0,0 +1,101 @@
+from SimplyFFmpegApplication.CommonHelpers import print_error
+
+
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+class PersistentCache:
+    """
+    Small JSON-backed key/value store with LRU eviction.
+    Keys are strings, values must be JSON-serializable.
+
+    Writes are batched: a change marks the store dirty, and the whole file is
+    rewritten at most once per `save_delay` seconds, off the caller's thread
+    and outside the lock, plus once at exit.
+    """
+    def __init__(self, file_path: str, max_entries: int = 512, save_delay: float = 1.0) -> None:
+        self.__file_path__: str = file_path
+        self.__max_entries__: int = max(1, max_entries)
+        self.__save_delay__: float = max(0.0, save_delay)
+        self.__entries__: OrderedDict[str, Any] = OrderedDict()
+        self.__lock__: threading.Lock = threading.Lock()
+        # Serializes writers, so an older snapshot never replaces a newer one
+        self.__save_lock__: threading.Lock = threading.Lock()
+        self.__dirty__: bool = False
+        self.__save_timer__: threading.Timer | None = None
+        self.__load__()
+        atexit.register(self.flush)
+
+    def __load__(self) -> None:
+        if not os.path.isfile(self.__file_path__):
+            return
+        try:
+            with open(self.__file_path__, "r", encoding="utf-8") as file:
+                entries: Any = json.load(file)
+        except (OSError, ValueError) as error:
+            print_error(f"Ignoring unreadable cache {self.__file_path__}: {error}")
+            return
+        if isinstance(entries, list):
+            # Stored oldest first, so insertion order is the LRU order
+            for entry in entries:
+                if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str):
+                    self.__entries__[entry[0]] = entry[1]
+
+    def __scheduleSave__(self) -> None:
+        # Called with the lock held
+        self.__dirty__ = True
+        if self.__save_timer__ is None:
+            self.__save_timer__ = threading.Timer(self.__save_delay__, self.flush)
+            self.__save_timer__.daemon = True
+            self.__save_timer__.start()
+
+    def flush(self) -> None:
+        with self.__save_lock__:
+            with self.__lock__:
+                if self.__save_timer__ is not None:
+                    self.__save_timer__.cancel()
+                    self.__save_timer__ = None
+                if not self.__dirty__:
+                    return
+                self.__dirty__ = False
+                snapshot: list[list[Any]] = [[key, value] for key, value in self.__entries__.items()]
+            temporary_path: str = f"{self.__file_path__}.{os.getpid()}.tmp"
+            try:
+                with open(temporary_path, "w", encoding="utf-8") as file:
+                    json.dump(snapshot, file)
+                os.replace(temporary_path, self.__file_path__)
+            except OSError as error:
+                print_error(f"Could not write cache {self.__file_path__}: {error}")
+
+    def get(self, key: str) -> Any | None:
+        with self.__lock__:
+            if key not in self.__entries__:
+                return None
+            self.__entries__.move_to_end(key)
+            return self.__entries__[key]
+
+    def put(self, key: str, value: Any) -> None:
+        with self.__lock__:
+            self.__entries__[key] = value
+            self.__entries__.move_to_end(key)
+            while len(self.__entries__) > self.__max_entries__:
+                self.__entries__.popitem(last=False)
+            self.__scheduleSave__()
+
+    def remove(self, key: str) -> None:
+        with self.__lock__:
+            if self.__entries__.pop(key, None) is not None:
+                self.__scheduleSave__()
+
+    def items(self) -> list[tuple[str, Any]]:
+        # Least recently used first
+        with self.__lock__:
+            return list(self.__entries__.items())
+
+    def __len__(self) -> int:
+        return len(self.__entries__)
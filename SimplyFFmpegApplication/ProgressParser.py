@@ -0,0 +1,162 @@
+from SimplyFFmpegApplication.CommonHelpers import format_seconds, parse_time_to_seconds
+
+
+import re
+
+
+# Matches the input duration FFmpeg prints to stderr, e.g. "Duration: 00:01:02.03,"
+duration_pattern: re.Pattern[str] = re.compile(r"Duration:\s*(\d+:\d+:\d+(?:\.\d+)?)")
+
+
+class FFmpegProgress:
+    def __init__(self, fields: dict[str, str]) -> None:
+        self.frame: int = self.__toInt__(fields.get("frame"))
+        self.fps: float = self.__toFloat__(fields.get("fps"))
+        self.total_size: int = self.__toInt__(fields.get("total_size"))
+        self.is_end: bool = fields.get("progress") == "end"
+
+        # out_time_us is preferred; older FFmpeg builds mislabel it as out_time_ms
+        self.out_time: float = 0.0
+        out_time_us: str | None = fields.get("out_time_us") or fields.get("out_time_ms")
+        if out_time_us and out_time_us != "N/A":
+            self.out_time = max(0.0, self.__toInt__(out_time_us) / 1e6)
+        elif fields.get("out_time"):
+            self.out_time = max(0.0, parse_time_to_seconds(fields["out_time"]) or 0.0)
+
+        # e.g. "1234.5kbits/s"
+        self.bitrate: float | None = None
+        bitrate: str = fields.get("bitrate", "")
+        if bitrate.endswith("kbits/s"):
+            self.bitrate = self.__toFloat__(bitrate[:-len("kbits/s")])
+
+        # e.g. "1.52x"
+        self.speed: float | None = None
+        speed: str = fields.get("speed", "").strip()
+        if speed.endswith("x"):
+            self.speed = self.__toFloat__(speed[:-1])
+
+    @staticmethod
+    def __toInt__(value: str | None) -> int:
+        try:
+            return int(value) if value else 0
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def __toFloat__(value: str | None) -> float:
+        try:
+            return float(value) if value else 0.0
+        except ValueError:
+            return 0.0
+
+    def getFraction(self, duration: float | None) -> float | None:
+        if not duration or duration <= 0:
+            return None
+        if self.is_end:
+            return 1.0
+        return min(1.0, self.out_time / duration)
+
+    def getETA(self, duration: float | None) -> float | None:
+        if not duration or not self.speed or self.speed <= 0:
+            return None
+        return max(0.0, duration - self.out_time) / self.speed
+
+    def getSummary(self, duration: float | None) -> str:
+        parts: list[str] = []
+        eta: float | None = self.getETA(duration)
+        if eta is not None and not self.is_end:
+            parts.append(f"ETA {format_seconds(eta)}")
+        if self.speed is not None:
+            parts.append(f"{self.speed:.2f}x")
+        if self.fps:
+            parts.append(f"{self.fps:.0f} fps")
+        if self.bitrate is not None:
+            parts.append(f"{self.bitrate:.0f} kbit/s")
+        return ", ".join(parts)
+
+    def __str__(self) -> str:
+        return f"frame={self.frame} fps={self.fps} out_time={self.out_time:.2f} bitrate={self.bitrate} speed={self.speed} total_size={self.total_size}"
+
+
+class FFmpegProgressParser:
+    """
+    Incrementally parses the key=value blocks FFmpeg writes with `-progress pipe:1`.
+    Each block ends with a "progress=continue" or "progress=end" line.
+    """
+    def __init__(self) -> None:
+        self.__buffer__: str = ""
+        self.__fields__: dict[str, str] = {}
+        self.__stderr_head__: str | None = ""
+        self.duration: float | None = None
+        self.seek_offset: float = 0.0
+        self.duration_limit: float | None = None
+        self.latest: FFmpegProgress | None = None
+        # Multi-pass jobs report each pass as an equal share of the whole
+        self.pass_index: int = 0
+        self.pass_count: int = 1
+
+    def configureFromArguments(self, arguments: list[str]) -> None:
+        # Seek and duration shorten the output relative to the input's duration.
+        # A hybrid seek splits the offset into an input and an output -ss.
+        self.seek_offset = 0.0
+        for flag, value in zip(arguments, arguments[1:]):
+            if flag == "-ss":
+                self.seek_offset += max(0.0, parse_time_to_seconds(value) or 0.0)
+            elif flag == "-t":
+                self.duration_limit = parse_time_to_seconds(value)
+        if self.duration is None and self.duration_limit is not None:
+            self.duration = self.duration_limit
+
+    def startPass(self, pass_index: int, pass_count: int) -> None:
+        # Every pass is a new FFmpeg process with its own progress stream
+        self.pass_index = pass_index
+        self.pass_count = max(1, pass_count)
+        self.__buffer__ = ""
+        self.__fields__ = {}
+        self.latest = None
+
+    def feed(self, data: bytes) -> list[FFmpegProgress]:
+        self.__buffer__ += data.decode(errors="replace")
+        *lines, self.__buffer__ = self.__buffer__.split("\n")
+
+        events: list[FFmpegProgress] = []
+        for line in lines:
+            key, separator, value = line.strip().partition("=")
+            if not separator:
+                continue
+            self.__fields__[key] = value.strip()
+            if key == "progress":
+                self.latest = FFmpegProgress(self.__fields__)
+                events.append(self.latest)
+                self.__fields__ = {}
+        return events
+
+    def feedStderr(self, data: bytes) -> None:
+        # The input duration is printed once, near the start of stderr
+        if self.__stderr_head__ is None or len(self.__stderr_head__) > 65536:
+            return
+        self.__stderr_head__ += data.decode(errors="replace")
+        match: re.Match[str] | None = duration_pattern.search(self.__stderr_head__)
+        if match:
+            self.setInputDuration(parse_time_to_seconds(match.group(1)))
+            self.__stderr_head__ = None
+
+    def setInputDuration(self, input_duration: float | None) -> None:
+        if input_duration is None:
+            return
+        duration: float = max(0.0, input_duration - self.seek_offset)
+        if self.duration_limit is not None:
+            duration = min(duration, self.duration_limit)
+        self.duration = duration
+
+    def getFraction(self) -> float | None:
+        fraction: float | None = self.latest.getFraction(self.duration) if self.latest else None
+        if fraction is None:
+            return None
+        return (self.pass_index + fraction) / self.pass_count
+
+    def getSummary(self) -> str:
+        summary: str = self.latest.getSummary(self.duration) if self.latest else ""
+        if self.pass_count > 1:
+            return f"pass {self.pass_index + 1}/{self.pass_count}{', ' + summary if summary else ''}"
+        return summary
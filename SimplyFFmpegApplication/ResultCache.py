@@ -0,0 +1,208 @@
+from SimplyFFmpegApplication.CommonHelpers import get_cache_directory, get_file_identity, is_stream_target, is_stream_url, print_error
+from SimplyFFmpegApplication.Jobs import Job
+from SimplyFFmpegApplication.PersistentCache import PersistentCache
+
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any
+
+
+# Options that change how FFmpeg runs, not what it produces
+non_result_flags: dict[str, bool] = {
+    # flag -> takes a value
+    "-y": False,
+    "-n": False,
+    "-nostats": False,
+    "-hide_banner": False,
+    "-progress": True,
+    "-passlogfile": True,
+    "-threads": True,
+    "-filter_threads": True,
+    "-filter_complex_threads": True,
+}
+
+
+def sampled_file_hash(file_path: str, sample_count: int = 8, sample_size: int = 1 << 20) -> str | None:
+    """
+    Fast content fingerprint: the size plus `sample_count` evenly spaced
+    chunks, always including the first and the last one. Small files are
+    hashed entirely.
+    """
+    try:
+        size: int = os.path.getsize(file_path)
+        digest = hashlib.sha256(str(size).encode())
+        with open(file_path, "rb") as file:
+            if size <= sample_count * sample_size:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+            else:
+                step: int = (size - sample_size) // (sample_count - 1)
+                for idx in range(sample_count):
+                    file.seek(idx * step)
+                    digest.update(file.read(sample_size))
+    except OSError as error:
+        print_error(f"Could not hash {file_path}: {error}")
+        return None
+    return digest.hexdigest()
+
+
+def normalize_arguments(arguments: list[str]) -> list[str] | None:
+    """
+    The compiled arguments without file paths and run-only options, or None
+    if the command is not a plain single-input, single-output conversion.
+    """
+    normalized: list[str] = []
+    input_count: int = 0
+    idx: int = 0
+    while idx < len(arguments) - 1:
+        flag: str = arguments[idx]
+        if flag == "-i":
+            input_count += 1
+            normalized.append("-i")
+            idx += 2
+            continue
+        if flag in non_result_flags:
+            idx += 2 if non_result_flags[flag] else 1
+            continue
+        normalized.append(flag)
+        idx += 1
+    if input_count != 1 or not arguments or arguments[-1].startswith("-") or is_stream_url(arguments[-1]):
+        return None
+    # The extension picks the muxer, so it is part of the result
+    normalized.append(os.path.splitext(arguments[-1])[1].lower())
+    return normalized
+
+
+class ConversionResultCache:
+    """
+    Keeps finished outputs, keyed by a sampled hash of the input (plus its
+    size and mtime) and the normalized FFmpeg arguments. A later identical
+    conversion is served by hard-linking, or copying, the stored file.
+    The total size is capped, evicting least-recently-used results first.
+    """
+    def __init__(self, directory: str | None = None, max_bytes: int = 5 << 30) -> None:
+        self.__directory__: str = directory or get_cache_directory("results")
+        os.makedirs(self.__directory__, exist_ok=True)
+        self.__max_bytes__: int = max_bytes
+        # key -> {"file": stored file name, "size": bytes}
+        self.__index__: PersistentCache = PersistentCache(os.path.join(self.__directory__, "index.json"), max_entries=1 << 20)
+        self.__lock__: threading.Lock = threading.Lock()
+
+    def getKey(self, input_file: str, arguments: list[str]) -> str | None:
+        normalized: list[str] | None = normalize_arguments(arguments)
+        identity: tuple[str, int, int] | None = get_file_identity(input_file)
+        if normalized is None or identity is None:
+            return None
+        content_hash: str | None = sampled_file_hash(input_file)
+        if content_hash is None:
+            return None
+        _, size, mtime_ns = identity
+        return hashlib.sha256(json.dumps([content_hash, size, mtime_ns, normalized]).encode()).hexdigest()
+
+    def getJobKey(self, job: Job) -> str | None:
+        # Only single-output jobs, a hit restores exactly one file
+        if not (job.getInputFile() and job.getOutputFile()) or len(job.getOutputFiles()) > 1:
+            return None
+        # A stream is consumed as it is written, there is no file to store or restore
+        if is_stream_target(job.getOutputFile()):
+            return None
+        # Without -y, FFmpeg would refuse to replace an existing output
+        if os.path.exists(job.getOutputFile()) and "-y" not in job.getArguments():
+            return None
+        return self.getKey(job.getInputFile(), job.getArguments())
+
+    def lookup(self, key: str) -> str | None:
+        entry: Any = self.__index__.get(key)
+        if not isinstance(entry, dict):
+            return None
+        stored_path: str = os.path.join(self.__directory__, str(entry.get("file")))
+        if not os.path.isfile(stored_path) or os.path.getsize(stored_path) != entry.get("size"):
+            # Deleted, or rewritten through a hard-linked output
+            self.__index__.remove(key)
+            return None
+        return stored_path
+
+    def restore(self, key: str, output_file: str) -> bool:
+        """
+        Places the cached result at `output_file`. Returns False on a miss.
+        """
+        stored_path: str | None = self.lookup(key)
+        if stored_path is None:
+            return False
+        temporary_path: str = f"{output_file}.{os.getpid()}.cache.tmp"
+        try:
+            try:
+                os.link(stored_path, temporary_path)
+            except OSError:
+                # Different file system, or links unsupported
+                shutil.copyfile(stored_path, temporary_path)
+            os.replace(temporary_path, output_file)
+        except OSError as error:
+            print_error(f"Could not restore cached result to {output_file}: {error}")
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return False
+        return True
+
+    @staticmethod
+    def detachOutput(job: Job) -> None:
+        """
+        With -y, FFmpeg truncates an existing output in place, which would also
+        rewrite a cached result hard-linked to it, so such a link is removed first.
+        """
+        if "-y" not in job.getArguments():
+            return
+        try:
+            if os.stat(job.getOutputFile()).st_nlink > 1:
+                os.remove(job.getOutputFile())
+        except OSError:
+            pass
+
+    def store(self, key: str, output_file: str) -> None:
+        if not os.path.isfile(output_file):
+            return
+        stored_name: str = f"{key}{os.path.splitext(output_file)[1].lower()}"
+        stored_path: str = os.path.join(self.__directory__, stored_name)
+        temporary_path: str = f"{stored_path}.{os.getpid()}.tmp"
+        try:
+            # A copy, so later edits to the output can't alter the cache
+            shutil.copyfile(output_file, temporary_path)
+            os.replace(temporary_path, stored_path)
+        except OSError as error:
+            print_error(f"Could not cache the result {output_file}: {error}")
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return
+        self.__index__.put(key, {"file": stored_name, "size": os.path.getsize(stored_path)})
+        self.__evict__()
+
+    def __evict__(self) -> None:
+        with self.__lock__:
+            entries: list[tuple[str, Any]] = self.__index__.items()
+            total_bytes: int = sum(int(entry.get("size", 0)) for _, entry in entries if isinstance(entry, dict))
+            for key, entry in entries[:-1]:
+                if total_bytes <= self.__max_bytes__:
+                    break
+                self.__index__.remove(key)
+                if not isinstance(entry, dict):
+                    continue
+                total_bytes -= int(entry.get("size", 0))
+                try:
+                    os.remove(os.path.join(self.__directory__, str(entry.get("file"))))
+                except OSError:
+                    pass
+
+
+_default_result_cache: ConversionResultCache | None = None
+_default_result_cache_lock: threading.Lock = threading.Lock()
+
+def get_result_cache() -> ConversionResultCache:
+    global _default_result_cache
+    with _default_result_cache_lock:
+        if _default_result_cache is None:
+            _default_result_cache = ConversionResultCache()
+        return _default_result_cache
@@ -0,0 +1,218 @@
+from SimplyFFmpegApplication.CommonHelpers import parse_time_to_seconds, print_log
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, Defaults
+from SimplyFFmpegApplication.MediaProbe import MediaInfo, MediaProber, get_media_prober
+
+
+import bisect
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+
+# Keyframes closer than this to a cut point count as being on it, in seconds
+keyframe_tolerance: float = 0.001
+
+
+class SmartCutResult:
+    def __init__(self) -> None:
+        self.success: bool = False
+        self.message: str = ""
+        self.wall_time: float = 0.0
+        self.copied_seconds: float = 0.0
+        self.encoded_seconds: float = 0.0
+
+    def __str__(self) -> str:
+        if not self.success:
+            return f"Smart cut failed: {self.message}"
+        lines: list[str] = [
+            f"Smart cut finished in {self.wall_time:.1f}s.",
+            f"    Stream-copied {self.copied_seconds:.2f}s of video, re-encoded {self.encoded_seconds:.2f}s at the boundaries",
+        ]
+        if self.message:
+            lines.append(f"    {self.message}")
+        return "\n".join(lines)
+
+
+class SmartCutter:
+    """
+    Frame-accurate trimming that re-encodes as little as possible. Using the
+    cached keyframe index of the input, the complete GOPs inside the range are
+    stream-copied, and only the partial GOPs before the first and after the
+    last keyframe in the range are re-encoded, with the source's codec,
+    profile, level and pixel format. The audio is copied in a single cut.
+
+    Parts are written as MPEG-TS, so each carries its own parameter sets,
+    then joined with the concat demuxer. This assumes keyframes are clean
+    random access points (closed GOPs), as most encoders produce by default.
+    """
+    def __init__(self, options: ConversionOptions, report: Callable[[str], None] = print_log, prober: MediaProber | None = None) -> None:
+        self.__options__: ConversionOptions = options
+        self.__report__: Callable[[str], None] = report
+        self.__prober__: MediaProber = prober or get_media_prober()
+
+    @staticmethod
+    def getUnsupportedOptions(options: ConversionOptions) -> list[str]:
+        # Anything that changes the video or audio beyond the cut points
+        unsupported: dict[str, bool] = {
+            "a preset": options.preset is not None,
+            "copying the video": options.copy_video,
+            "a video bitrate or target size": bool(options.video_bitrate or options.target_size),
+            "video filters (fps, width, height)": bool(options.fps or options.video_width or options.video_height),
+            "audio changes (bitrate, volume, loudness)": bool(options.audio_bitrate or options.volume or options.loudness),
+        }
+        return [name for name, is_set in unsupported.items() if is_set]
+
+    def __encoderArguments__(self, video_stream: dict[str, Any]) -> list[str] | None:
+        encoder: str | None = Defaults.smart_cut_encoders.get(str(video_stream.get("codec_name")))
+        if encoder is None:
+            return None
+        arguments: list[str] = ["-c:v", encoder, "-crf", self.__options__.video_crf or Defaults.smart_cut_crf]
+        if self.__options__.video_preset:
+            arguments.extend(["-preset", self.__options__.video_preset])
+        if video_stream.get("pix_fmt"):
+            arguments.extend(["-pix_fmt", str(video_stream["pix_fmt"])])
+        profile: str = str(video_stream.get("profile", "")).lower().replace("constrained ", "")
+        if profile in ("baseline", "main", "high", "high10", "high422", "high444", "main10"):
+            arguments.extend(["-profile:v", profile])
+        level: Any = video_stream.get("level")
+        if encoder == "libx264" and isinstance(level, int) and level > 0:
+            # ffprobe reports level 4.1 as 41
+            arguments.extend(["-level:v", f"{level / 10:g}"])
+        return arguments
+
+    def __runStep__(self, arguments: list[str]) -> float:
+        started_at: float = time.monotonic()
+        result: subprocess.CompletedProcess[bytes] = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-nostats", "-y", *arguments], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            stderr: list[str] = result.stderr.decode(errors="replace").strip().splitlines()
+            raise Exception(stderr[-1] if stderr else f"FFmpeg exited with code {result.returncode}")
+        return time.monotonic() - started_at
+
+    @staticmethod
+    def __escapeConcatPath__(path: str) -> str:
+        return "'" + path.replace("'", "'\\''") + "'"
+
+    def run(self) -> SmartCutResult:
+        result: SmartCutResult = SmartCutResult()
+        options: ConversionOptions = self.__options__
+        input_file: str = options.input_file
+        output_file: str = options.output_file
+        if os.path.exists(output_file) and not options.overwrite:
+            result.message = "Output file already exists."
+            return result
+        unsupported: list[str] = self.getUnsupportedOptions(options)
+        if unsupported:
+            result.message = f"Smart cut keeps the source streams, so it can't be combined with {', '.join(unsupported)}."
+            return result
+
+        ##### The requested range, and the codec parameters to match
+        info: MediaInfo | None = self.__prober__.probe(input_file)
+        video_stream: dict[str, Any] | None = info.getVideoStream() if info else None
+        media_duration: float | None = info.getDuration() if info else None
+        if info is None or video_stream is None or not media_duration:
+            result.message = "Smart cut needs a video input with a known duration."
+            return result
+        encoder_arguments: list[str] | None = self.__encoderArguments__(video_stream)
+        if encoder_arguments is None:
+            result.message = f"Smart cut can't re-encode {video_stream.get('codec_name')} video to match the source."
+            return result
+        start: float = max(0.0, parse_time_to_seconds(options.seek) or 0.0)
+        end: float = media_duration
+        requested_length: float | None = parse_time_to_seconds(options.duration)
+        if requested_length:
+            end = min(end, start + requested_length)
+        if end <= start:
+            result.message = "The seek is past the end of the input."
+            return result
+
+        self.__report__("Reading the keyframe index...")
+        keyframes: list[float] | None = self.__prober__.getKeyframes(input_file)
+        if not keyframes:
+            result.message = "The keyframes of the input could not be indexed."
+            return result
+
+        ##### Split the range at the first and last keyframe inside it
+        # A cut at the very end of the input needs no tail, the last GOP is complete
+        at_end: bool = end >= media_duration - keyframe_tolerance
+        first_idx: int = bisect.bisect_left(keyframes, start - keyframe_tolerance)
+        last_idx: int = bisect.bisect_right(keyframes, end + keyframe_tolerance) - 1
+        copy_start: float | None = keyframes[first_idx] if first_idx < len(keyframes) else None
+        copy_end: float | None = end if at_end else (keyframes[last_idx] if last_idx >= 0 else None)
+        if copy_start is None or copy_end is None or copy_end - copy_start <= keyframe_tolerance:
+            # No complete GOP inside the range, everything is a boundary
+            copy_start, copy_end = end, end
+        head_keyframe: float = keyframes[max(0, bisect.bisect_right(keyframes, start + keyframe_tolerance) - 1)]
+
+        frame_rate: float = info.getFrameRate() or 25.0
+        output_extension: str = os.path.splitext(output_file)[1]
+        work_directory: str = tempfile.mkdtemp(prefix=".simplyffmpeg_smartcut_", dir=os.path.dirname(os.path.abspath(output_file)))
+        started_at: float = time.monotonic()
+        try:
+            ##### 1. Head, middle, tail and audio are independent, so they run concurrently
+            parts: list[str] = []
+            steps: list[list[str]] = []
+            if copy_start - start > keyframe_tolerance:
+                # Fast seek to the keyframe before the start, then decode up to it
+                head: str = os.path.join(work_directory, "0_head.ts")
+                steps.append([
+                    "-ss", f"{head_keyframe:.6f}", "-i", input_file,
+                    "-ss", f"{start - head_keyframe:.6f}", "-t", f"{copy_start - start:.6f}",
+                    "-map", "0:v:0", *encoder_arguments, head
+                ])
+                parts.append(head)
+                result.encoded_seconds += copy_start - start
+            if copy_end - copy_start > keyframe_tolerance:
+                # Half a frame short of the next keyframe, so it stays out of the copy
+                middle: str = os.path.join(work_directory, "1_middle.ts")
+                middle_length: list[str] = [] if at_end else ["-t", f"{copy_end - copy_start - 0.5 / frame_rate:.6f}"]
+                steps.append(["-ss", f"{copy_start:.6f}", "-i", input_file, *middle_length, "-map", "0:v:0", "-c", "copy", middle])
+                parts.append(middle)
+                result.copied_seconds = copy_end - copy_start
+            if end - copy_end > keyframe_tolerance:
+                # The tail starts on a keyframe, so the input seek alone is exact
+                tail: str = os.path.join(work_directory, "2_tail.ts")
+                steps.append([
+                    "-ss", f"{copy_end:.6f}", "-i", input_file, "-t", f"{end - copy_end:.6f}",
+                    "-map", "0:v:0", *encoder_arguments, tail
+                ])
+                parts.append(tail)
+                result.encoded_seconds += end - copy_end
+            audio_output: str | None = None
+            if info.hasAudio():
+                audio_output = os.path.join(work_directory, f"audio{output_extension}")
+                steps.append(["-ss", f"{start:.6f}", "-i", input_file, "-t", f"{end - start:.6f}", "-map", "0:a:0", "-c", "copy", audio_output])
+
+            self.__report__(
+                f"Copying {result.copied_seconds:.2f}s and re-encoding {result.encoded_seconds:.2f}s "
+                f"of {end - start:.2f}s in {len(steps)} concurrent step(s)..."
+            )
+            with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+                futures: list[Future[float]] = [executor.submit(self.__runStep__, step) for step in steps]
+                for future in futures:
+                    future.result()
+
+            ##### 2. Join the parts and the audio without re-encoding
+            concat_list: str = os.path.join(work_directory, "parts.txt")
+            with open(concat_list, "w", encoding="utf-8") as file:
+                for part in parts:
+                    file.write(f"file {self.__escapeConcatPath__(part)}\n")
+            concat_arguments: list[str] = ["-f", "concat", "-safe", "0", "-i", concat_list]
+            if audio_output:
+                concat_arguments.extend(["-i", audio_output, "-map", "0:v", "-map", "1:a"])
+            concat_arguments.extend(["-c", "copy", output_file])
+            self.__runStep__(concat_arguments)
+        except Exception as error:
+            result.message = str(error)
+            return result
+        finally:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+        result.wall_time = time.monotonic() - started_at
+        result.success = True
+        return result
@@ -0,0 +1,36 @@
+from PyQt6.QtCore import QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication, QWidget
+
+
+import json
+import time
+
+
+class StartupProfiler(QObject):
+    """
+    Records cold-start milestones of the main window as wall-clock timestamps,
+    prints them as one JSON line, then quits the application.
+        -> first_paint:       first Paint event of the window
+        -> first_interaction: first event loop pass after that paint, i.e. the
+                              earliest moment user input can be handled
+    """
+    def __init__(self, launch_time: float, window: QWidget, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.__window__: QWidget = window
+        self.__timestamps__: dict[str, float] = {
+            "launch": launch_time,
+            "window_constructed": time.time(),
+        }
+        window.installEventFilter(self)
+
+    def eventFilter(self, a0: QObject | None, a1: QEvent | None) -> bool:
+        if a0 is self.__window__ and a1 is not None and a1.type() == QEvent.Type.Paint and "first_paint" not in self.__timestamps__:
+            self.__timestamps__["first_paint"] = time.time()
+            QTimer.singleShot(0, self.__onFirstIdle__)
+        return False
+
+    def __onFirstIdle__(self) -> None:
+        self.__timestamps__["first_interaction"] = time.time()
+        self.__window__.removeEventFilter(self)
+        print(json.dumps(self.__timestamps__), flush=True)
+        QApplication.quit()
@@ -0,0 +1,129 @@
+from SimplyFFmpegApplication.CommandModel import Argument
+from SimplyFFmpegApplication.CommonHelpers import print_error
+
+
+import os
+import threading
+
+
+def get_available_cpus() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def apply_thread_budget(arguments: list[str], threads: int) -> list[str]:
+    """
+    Caps the encoder, decoder and filter graph threads of a compiled command.
+    -threads is an output option, so it is set before every output of a
+    multi-output command. Commands that already set -threads are left alone.
+    """
+    if not arguments or "-threads" in arguments:
+        return list(arguments)
+    budget: str = str(threads)
+    budgeted: list[str] = ["-filter_threads", budget, "-filter_complex_threads", budget]
+    for argument in Argument.parseList(arguments):
+        flag: str = argument.getFlag()
+        value: str | None = argument.getValue()
+        if value is not None:
+            budgeted.extend([flag, value])
+            continue
+        # Positionals are outputs, "-" being standard output
+        if not flag.startswith("-") or flag == "-":
+            budgeted.extend(["-threads", budget])
+        budgeted.append(flag)
+    return budgeted
+
+
+class ThreadBudgetScheduler:
+    """
+    Splits the CPUs between concurrently running FFmpeg processes.
+
+    A job gets its thread budget when it starts, from the number of jobs that
+    will run alongside it. With `pin_affinity`, every running process is also
+    pinned to its own slice of the CPUs, and the slices are recomputed
+    whenever a job starts or finishes, so freed cores go to the jobs still
+    running.
+    """
+    def __init__(self, worker_count: int, pin_affinity: bool = False) -> None:
+        self.__worker_count__: int = max(1, worker_count)
+        self.__pin_affinity__: bool = pin_affinity and hasattr(os, "sched_setaffinity")
+        self.__cpus__: list[int] = get_available_cpus()
+        # job id -> (thread budget, process id once started)
+        self.__running__: dict[int, tuple[int, int | None]] = {}
+        self.__lock__: threading.Lock = threading.Lock()
+
+    def setWorkerCount(self, worker_count: int) -> None:
+        with self.__lock__:
+            self.__worker_count__ = max(1, worker_count)
+    def setAffinityPinning(self, pin_affinity: bool) -> None:
+        with self.__lock__:
+            self.__pin_affinity__ = pin_affinity and hasattr(os, "sched_setaffinity")
+        self.rebalance()
+
+    def getRunningBudgets(self) -> dict[int, int]:
+        with self.__lock__:
+            return {job_id: threads for job_id, (threads, _) in self.__running__.items()}
+
+    def start(self, job_id: int, arguments: list[str], pending_count: int = 0) -> list[str]:
+        """
+        Registers a starting job and returns the arguments to launch it with.
+        """
+        with self.__lock__:
+            concurrency: int = min(self.__worker_count__, len(self.__running__) + 1 + pending_count)
+            threads: int = max(1, len(self.__cpus__) // max(1, concurrency))
+            self.__running__[job_id] = (threads, None)
+        # A lone job keeps FFmpeg's own threading
+        return apply_thread_budget(arguments, threads) if concurrency > 1 else list(arguments)
+
+    def attach(self, job_id: int, process_id: int) -> None:
+        with self.__lock__:
+            if job_id not in self.__running__:
+                return
+            self.__running__[job_id] = (self.__running__[job_id][0], process_id)
+        self.rebalance()
+
+    def finish(self, job_id: int) -> None:
+        with self.__lock__:
+            self.__running__.pop(job_id, None)
+        self.rebalance()
+
+    def rebalance(self) -> None:
+        with self.__lock__:
+            if not self.__pin_affinity__:
+                return
+            processes: list[tuple[int, int]] = [
+                (threads, process_id) for threads, process_id in self.__running__.values() if process_id
+            ]
+            if not processes:
+                return
+
+            ##### Contiguous CPU slices, proportional to each job's budget
+            total_threads: int = sum(threads for threads, _ in processes)
+            cpu_count: int = len(self.__cpus__)
+            cumulative_threads: int = 0
+            start: int = 0
+            for threads, process_id in processes:
+                cumulative_threads += threads
+                end: int = round(cpu_count * cumulative_threads / total_threads)
+                # More processes than CPUs: the leftovers share the last one
+                cpus: list[int] = self.__cpus__[start:end] or [self.__cpus__[min(start, cpu_count - 1)]]
+                start = max(start, end)
+                self.__pin__(process_id, set(cpus))
+
+    @staticmethod
+    def __pin__(process_id: int, cpus: set[int]) -> None:
+        # The affinity of a running process is per thread, so every existing
+        # thread is moved; threads spawned later inherit from the main thread
+        try:
+            thread_ids: list[int] = [int(thread_id) for thread_id in os.listdir(f"/proc/{process_id}/task")]
+        except OSError:
+            thread_ids = [process_id]
+        for thread_id in thread_ids:
+            try:
+                os.sched_setaffinity(thread_id, cpus)
+            except ProcessLookupError:
+                continue
+            except OSError as error:
+                print_error(f"Could not pin process {process_id} to CPUs {sorted(cpus)}: {error}")
+                return
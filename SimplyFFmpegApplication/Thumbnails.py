@@ -0,0 +1,128 @@
+from SimplyFFmpegApplication.CommonHelpers import get_cache_directory, print_error
+from SimplyFFmpegApplication.MediaProbe import MediaInfo, MediaProber, get_media_prober
+from SimplyFFmpegApplication.PersistentCache import PersistentCache
+
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from typing import Any, Callable
+
+
+default_thumbnail_count: int = 8
+
+
+class ThumbnailExtractor:
+    """
+    Grabs `count` evenly spaced thumbnails of a video, decoding keyframes only
+    (-skip_frame nokey after a fast input seek), so each thumbnail costs about
+    one decoded frame whatever the length of the input.
+
+    Thumbnails are stored on disk, keyed by the file identity (path, size,
+    mtime), with the least recently used sets evicted past `max_entries`.
+    """
+    def __init__(self, ffmpeg_path: str = "ffmpeg", directory: str | None = None, count: int = default_thumbnail_count, height: int = 72, max_entries: int = 256, prober: MediaProber | None = None) -> None:
+        self.__ffmpeg_path__: str = ffmpeg_path
+        self.__directory__: str = directory or get_cache_directory("thumbnails")
+        os.makedirs(self.__directory__, exist_ok=True)
+        self.__count__: int = max(1, count)
+        self.__height__: int = height
+        self.__max_entries__: int = max(1, max_entries)
+        self.__prober__: MediaProber = prober or get_media_prober()
+        # identity key -> sub directory holding the thumbnails of that file
+        self.__index__: PersistentCache = PersistentCache(os.path.join(self.__directory__, "index.json"), max_entries=1 << 20)
+        self.__lock__: threading.Lock = threading.Lock()
+
+    def getCount(self) -> int:
+        return self.__count__
+
+    def getCached(self, file_path: str) -> list[str] | None:
+        """
+        The cached thumbnail paths, or None on a miss. Never runs FFmpeg.
+        """
+        key: str | None = MediaProber.getCacheKey(file_path)
+        if key is None:
+            return None
+        entry: Any = self.__index__.get(key)
+        if not isinstance(entry, dict):
+            return None
+        sub_directory: str = os.path.join(self.__directory__, str(entry.get("directory")))
+        thumbnails: list[str] = [os.path.join(sub_directory, str(name)) for name in entry.get("files", [])]
+        if not thumbnails or not all(os.path.isfile(thumbnail) for thumbnail in thumbnails):
+            self.__index__.remove(key)
+            return None
+        return thumbnails
+
+    def extract(self, file_path: str, report: Callable[[str], None] | None = None) -> list[str]:
+        """
+        Returns the thumbnail paths, generating them on a cache miss. Every
+        thumbnail is passed to `report` as soon as it exists.
+        """
+        cached: list[str] | None = self.getCached(file_path)
+        if cached is not None:
+            for thumbnail in cached:
+                if report:
+                    report(thumbnail)
+            return cached
+
+        key: str | None = MediaProber.getCacheKey(file_path)
+        info: MediaInfo | None = self.__prober__.probe(file_path)
+        if key is None or info is None or not info.hasVideo():
+            return []
+        duration: float = info.getDuration() or 0.0
+
+        directory_name: str = hashlib.sha256(key.encode()).hexdigest()[:32]
+        sub_directory: str = os.path.join(self.__directory__, directory_name)
+        os.makedirs(sub_directory, exist_ok=True)
+
+        ##### One fast seek per thumbnail, at the middle of each of `count` equal spans
+        thumbnails: list[str] = []
+        for idx in range(self.__count__):
+            timestamp: float = duration * (idx + 0.5) / self.__count__
+            thumbnail: str = os.path.join(sub_directory, f"{idx:02d}.jpg")
+            arguments: list[str] = [
+                self.__ffmpeg_path__, "-hide_banner", "-v", "error", "-y",
+                # The keyframe at or before the timestamp, without decoding up to it
+                "-skip_frame", "nokey", "-noaccurate_seek", "-ss", f"{timestamp:.3f}",
+                "-i", file_path,
+                "-map", "0:v:0", "-frames:v", "1", "-an", "-sn", "-dn",
+                "-vf", f"scale=-2:{self.__height__}", "-q:v", "5",
+                thumbnail
+            ]
+            try:
+                result: subprocess.CompletedProcess[bytes] = subprocess.run(arguments, capture_output=True, timeout=30)
+            except (OSError, subprocess.TimeoutExpired) as error:
+                print_error(f"Thumbnail extraction failed for {file_path}: {error}")
+                break
+            if result.returncode != 0 or not os.path.isfile(thumbnail):
+                print_error(f"Thumbnail extraction failed for {file_path}: {result.stderr.decode(errors='replace').strip()}")
+                continue
+            thumbnails.append(thumbnail)
+            if report:
+                report(thumbnail)
+
+        if thumbnails:
+            self.__index__.put(key, {"directory": directory_name, "files": [os.path.basename(thumbnail) for thumbnail in thumbnails]})
+            self.__evict__()
+        return thumbnails
+
+    def __evict__(self) -> None:
+        with self.__lock__:
+            entries: list[tuple[str, Any]] = self.__index__.items()
+            for key, entry in entries[:-self.__max_entries__]:
+                self.__index__.remove(key)
+                if isinstance(entry, dict):
+                    shutil.rmtree(os.path.join(self.__directory__, str(entry.get("directory"))), ignore_errors=True)
+
+
+_default_thumbnail_extractor: ThumbnailExtractor | None = None
+_default_thumbnail_extractor_lock: threading.Lock = threading.Lock()
+
+def get_thumbnail_extractor() -> ThumbnailExtractor:
+    global _default_thumbnail_extractor
+    with _default_thumbnail_extractor_lock:
+        if _default_thumbnail_extractor is None:
+            _default_thumbnail_extractor = ThumbnailExtractor()
+        return _default_thumbnail_extractor
@@ -0,0 +1,176 @@
+from SimplyFFmpegApplication.CommonHelpers import derive_output_path, print_error, print_log
+from SimplyFFmpegApplication.HeadlessRunner import HeadlessJobRunner
+from SimplyFFmpegApplication.JobMetrics import JobMetricsRecorder
+from SimplyFFmpegApplication.Jobs import Job, JobStatus, default_worker_count
+from SimplyFFmpegApplication.ResultCache import ConversionResultCache
+
+
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+# Names used by browsers, rsync and friends while a file is still being written
+partial_file_suffixes: tuple[str, ...] = (".part", ".partial", ".tmp", ".crdownload", ".download", ".!qb")
+
+# Network and FAT shares report coarse or cached directory mtimes, so an
+# arrival in the same tick as the last listing leaves the mtime unchanged.
+# The directory is listed anyway while its mtime is this recent, in seconds,
+# and every `forced_listing_polls` polls whatever it says
+recent_change_window: float = 5.0
+forced_listing_polls: int = 10
+
+
+def unique_path(path: str) -> str:
+    # "clip.mp4" -> "clip_1.mp4" -> "clip_2.mp4" ...
+    if not os.path.exists(path):
+        return path
+    base, extension = os.path.splitext(path)
+    idx: int = 1
+    while os.path.exists(f"{base}_{idx}{extension}"):
+        idx += 1
+    return f"{base}_{idx}{extension}"
+
+
+class WatchFolder:
+    """
+    Watches a single directory (not its subfolders) and turns every new file
+    into a job once its size and mtime have been stable for `settle_time`.
+    Inputs are moved into "completed" or "failed" subfolders afterwards, so the
+    watched directory only ever holds unprocessed arrivals.
+
+    Polling is cheap: the directory is mostly listed only when its own mtime
+    changes (i.e. entries were added or removed), and growing files are
+    re-checked with a single stat each.
+    """
+    def __init__(
+        self, directory: str, make_job: Callable[[str, str], Job], extension: str,
+        output_directory: str = "", worker_count: int = default_worker_count(),
+        poll_interval: float = 1.0, settle_time: float = 2.0,
+        extensions: tuple[str, ...] | None = None, report: Callable[[str], None] = print_log,
+        pin_affinity: bool = False, result_cache: ConversionResultCache | None = None,
+        metrics: JobMetricsRecorder | None = None
+    ) -> None:
+        self.__directory__: str = os.path.abspath(directory)
+        self.__make_job__: Callable[[str, str], Job] = make_job
+        self.__extension__: str = extension
+        self.__poll_interval__: float = poll_interval
+        self.__settle_time__: float = settle_time
+        self.__extensions__: tuple[str, ...] | None = tuple(f".{extension.lower().lstrip('.')}" for extension in extensions) if extensions else None
+        self.__report__: Callable[[str], None] = report
+
+        self.__completed_directory__: str = os.path.join(self.__directory__, "completed")
+        self.__failed_directory__: str = os.path.join(self.__directory__, "failed")
+        self.__output_directory__: str = os.path.abspath(output_directory) if output_directory else os.path.join(self.__directory__, "output")
+        for sub_directory in (self.__completed_directory__, self.__failed_directory__, self.__output_directory__):
+            os.makedirs(sub_directory, exist_ok=True)
+
+        self.__worker_count__: int = max(1, worker_count)
+        self.__runner__: HeadlessJobRunner = HeadlessJobRunner(
+            self.__worker_count__, report=report, pin_affinity=pin_affinity, result_cache=result_cache, metrics=metrics
+        )
+        self.__directory_mtime__: int | None = None
+        self.__polls_since_listing__: int = 0
+        # path -> (size, mtime_ns, monotonic time the values were first seen)
+        self.__candidates__: dict[str, tuple[int, int, float]] = {}
+        self.__in_progress__: set[str] = set()
+        self.__lock__: threading.Lock = threading.Lock()
+        self.completed: int = 0
+        self.failed: int = 0
+
+    ##### Discovery
+    def __isCandidateName__(self, name: str) -> bool:
+        lowered: str = name.lower()
+        if name.startswith(".") or lowered.endswith(partial_file_suffixes):
+            return False
+        return self.__extensions__ is None or lowered.endswith(self.__extensions__)
+
+    def __scanDirectory__(self) -> None:
+        try:
+            directory_mtime: int = os.stat(self.__directory__).st_mtime_ns
+        except OSError as error:
+            print_error(f"Cannot access watch folder {self.__directory__}: {error}")
+            return
+        self.__polls_since_listing__ += 1
+        if (
+            directory_mtime == self.__directory_mtime__
+            and self.__polls_since_listing__ < forced_listing_polls
+            and time.time() - directory_mtime / 1e9 > recent_change_window
+        ):
+            return
+        self.__directory_mtime__ = directory_mtime
+        self.__polls_since_listing__ = 0
+
+        present: set[str] = set()
+        with self.__lock__:
+            in_progress: set[str] = set(self.__in_progress__)
+        with os.scandir(self.__directory__) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False) or not self.__isCandidateName__(entry.name):
+                    continue
+                present.add(entry.path)
+                if entry.path not in self.__candidates__ and entry.path not in in_progress:
+                    stat_result: os.stat_result = entry.stat(follow_symlinks=False)
+                    self.__candidates__[entry.path] = (stat_result.st_size, stat_result.st_mtime_ns, time.monotonic())
+        # Forget candidates that were removed or renamed before settling
+        for path in list(self.__candidates__):
+            if path not in present:
+                del self.__candidates__[path]
+
+    def pollOnce(self) -> list[str]:
+        """
+        Returns the files that have settled since the last poll.
+        """
+        self.__scanDirectory__()
+        settled: list[str] = []
+        now: float = time.monotonic()
+        for path, (size, mtime_ns, seen_at) in list(self.__candidates__.items()):
+            try:
+                stat_result: os.stat_result = os.stat(path)
+            except OSError:
+                del self.__candidates__[path]
+                continue
+            if (stat_result.st_size, stat_result.st_mtime_ns) != (size, mtime_ns):
+                self.__candidates__[path] = (stat_result.st_size, stat_result.st_mtime_ns, now)
+            elif now - seen_at >= self.__settle_time__ and size > 0:
+                del self.__candidates__[path]
+                settled.append(path)
+        return settled
+
+    ##### Processing
+    def __process__(self, input_file: str) -> None:
+        output_file: str = unique_path(derive_output_path(input_file, self.__output_directory__, self.__extension__))
+        try:
+            job: Job = self.__make_job__(input_file, output_file)
+            self.__runner__.runJob(job)
+            success: bool = job.status == JobStatus.DONE
+        except Exception as error:
+            print_error(f"Could not convert {input_file}: {error}")
+            success = False
+
+        destination_directory: str = self.__completed_directory__ if success else self.__failed_directory__
+        try:
+            shutil.move(input_file, unique_path(os.path.join(destination_directory, os.path.basename(input_file))))
+        except OSError as error:
+            print_error(f"Could not move {input_file}: {error}")
+        with self.__lock__:
+            self.__in_progress__.discard(input_file)
+            if success:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def run(self, stop_event: threading.Event | None = None) -> None:
+        stop_event = stop_event or threading.Event()
+        self.__report__(f"Watching {self.__directory__} (outputs in {self.__output_directory__})")
+        with ThreadPoolExecutor(max_workers=self.__worker_count__) as executor:
+            while not stop_event.is_set():
+                for input_file in self.pollOnce():
+                    with self.__lock__:
+                        self.__in_progress__.add(input_file)
+                    executor.submit(self.__process__, input_file)
+                stop_event.wait(self.__poll_interval__)
+        self.__report__(f"Stopped watching: {self.completed} completed, {self.failed} failed")
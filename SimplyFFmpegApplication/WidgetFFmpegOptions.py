@@ -1,8 +1,13 @@
-from SimplyFFmpegApplication.CommonWidgets import Defaults, Preset, QLabelledLineEdit, QRadioText, QRadioTextButton, SharedStates
+from SimplyFFmpegApplication.Capabilities import FFmpegCapabilities, get_capability_registry
+from SimplyFFmpegApplication.CommandModel import Defaults, Preset
+from SimplyFFmpegApplication.CommonWidgets import QLabelledLineEdit, QLazyGroupBox, QRadioText, QRadioTextButton, SharedStates
 
 
 from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QAbstractButton, QButtonGroup, QCheckBox, QGridLayout, QGroupBox, QHBoxLayout, QRadioButton, QVBoxLayout, QWidget, QComboBox
+from PyQt6.QtWidgets import QAbstractButton, QButtonGroup, QCheckBox, QCompleter, QGridLayout, QGroupBox, QHBoxLayout, QRadioButton, QVBoxLayout, QWidget, QComboBox
+
+
+import threading
 
 
 class Widget_FFmpegOptions(QWidget):
@@ -53,6 +58,18 @@ class Widget_FFmpegOptions(QWidget):
         self.shared_states.signals.emitExtensionChanged(str(self.extension.currentData()))
         self.extension.currentIndexChanged.connect(lambda: self.shared_states.signals.emitExtensionChanged(str(self.extension.currentData())))
 
+        ##### Stream format, for pipe, FIFO and socket outputs
+        stream_format_widget = QGroupBox("Stream Format", self)
+        stream_format_layout = QHBoxLayout(stream_format_widget)
+        basic_options_layout.addWidget(stream_format_widget, 1)
+
+        self.stream_format = QComboBox(stream_format_widget)
+        stream_format_layout.addWidget(self.stream_format)
+        self.stream_format.addItem("Auto", "")
+        self.stream_format.addItem("Fragmented MP4", "fmp4")
+        self.stream_format.addItem("MPEG-TS", "mpegts")
+        self.stream_format.setToolTip("Muxer for streamed outputs, which can't seek back. Auto picks it from the extension for FIFOs and unix: sockets.")
+
         ##### Overwrite?
         overwrite_widget = QGroupBox("", self)
         overwrite_layout = QHBoxLayout(overwrite_widget)
@@ -68,33 +85,25 @@ class Widget_FFmpegOptions(QWidget):
         preset_independent_layout = QVBoxLayout(None)
         main_layout.addLayout(preset_independent_layout)
         
-        ##### Seeking and Duration
-        seek_widget = QGroupBox("Seeking", self)
-        seek_layout = QHBoxLayout(seek_widget)
-        preset_independent_layout.addWidget(seek_widget)
+        ##### Seeking and Duration (built on first expand)
+        self.seek: QLabelledLineEdit | None = None
+        self.duration: QLabelledLineEdit | None = None
+        self.smart_cut: QCheckBox | None = None
+        self.seek_widget = QLazyGroupBox("Seeking", self.buildSeekOptions, self)
+        self.seek_widget.setToolTip("Tick to enable seeking and duration")
+        preset_independent_layout.addWidget(self.seek_widget)
         
-        tooltip: list[str] = [
-            'Examples:',
-            '-> "55" for 55s',
-            '-> "0.2" for 0.2s',
-            '-> "200ms" for 200 ms',
-            '-> "12:03:45" for 12h, 03m, 45s',
-            '-> "23.189" for 23.189s',
-        ]
-        self.seek = QLabelledLineEdit("Input Seek", "00:00:00", seek_widget)
-        self.seek.setToolTip("\n".join(tooltip))
-        self.duration = QLabelledLineEdit("Output Duration", "00:00:00", seek_widget)
-        self.duration.setToolTip("\n".join(tooltip))
-        seek_layout.addWidget(self.seek)
-        seek_layout.addWidget(self.duration)
+        ##### hwaccel (built on first expand)
+        self.hwaccel: QLabelledLineEdit | None = None
+        self.hwaccel_widget = QLazyGroupBox("Hardware Acceleration", self.buildHwAccelOptions, self)
+        self.hwaccel_widget.setToolTip("Tick to enable hardware acceleration")
+        preset_independent_layout.addWidget(self.hwaccel_widget)
         
-        ##### hwaccel
-        hwaccel_widget = QGroupBox("Hardware Acceleration", self)
-        hwaccel_layout = QHBoxLayout(hwaccel_widget)
-        preset_independent_layout.addWidget(hwaccel_widget)
-        self.hwaccel = QLabelledLineEdit("Enable HW Accel?", "Leave blank to disable", hwaccel_widget)
-        self.hwaccel.setToolTip("Example: cuda")
-        hwaccel_layout.addWidget(self.hwaccel)
+        ##### Extra outputs from the same decode (built on first expand)
+        self.extra_outputs: list[tuple[QCheckBox, Preset]] = []
+        self.extra_outputs_widget = QLazyGroupBox("Extra Outputs", self.buildExtraOutputOptions, self)
+        self.extra_outputs_widget.setToolTip("Tick to also write the checked presets next to the output, decoding the input once")
+        preset_independent_layout.addWidget(self.extra_outputs_widget)
         
         ##############################
         # FFmpeg Options -- Copy
@@ -142,7 +151,8 @@ class Widget_FFmpegOptions(QWidget):
         self.video_bitrate_form = QButtonGroup(self)
         enum_video_bitrate: list[tuple[str, str]] = [
             ("CRF", "28"),
-            ("ABR", "2500k")
+            ("ABR", "2500k"),
+            ("Target Size", "8M")
         ]
         self.video_bitrate_types: list[QRadioText] = []
         for idx, (name, default) in enumerate(enum_video_bitrate):
@@ -152,6 +162,8 @@ class Widget_FFmpegOptions(QWidget):
 
             if idx == 0:
                 radio_widget.getRadioButton().setChecked(True)
+            if name == "Target Size":
+                radio_widget.setToolTip("Fit the output into this size (e.g. 8M or 8MiB) with a two-pass encode")
             self.video_bitrate_form.addButton(radio_widget.getRadioButton(), idx)
 
         # Preset
@@ -193,6 +205,11 @@ class Widget_FFmpegOptions(QWidget):
         self.volume = QLabelledLineEdit("Volume:", "1.0", self.audio_options_widget)
         audio_options_layout.addWidget(self.volume)
         
+        # Loudness normalization
+        self.loudness = QLabelledLineEdit("Loudness (LUFS):", "-23", self.audio_options_widget)
+        self.loudness.setToolTip("EBU R128 loudness normalization, replaces the volume. The source is measured once, then cached")
+        audio_options_layout.addWidget(self.loudness)
+        
         ##############################
         # Listeners and Handlers
         ##############################
@@ -214,11 +231,8 @@ class Widget_FFmpegOptions(QWidget):
             if (type(checked_button) is not QRadioTextButton):
                 return
             
-            active: QRadioText = self.video_bitrate_types[0] if checked_button.getParent() == self.video_bitrate_types[0] else self.video_bitrate_types[1]
-            inactive: QRadioText = self.video_bitrate_types[1] if checked_button.getParent() == self.video_bitrate_types[0] else self.video_bitrate_types[0]
-            
-            active.getInputField().setEnabled(True)
-            inactive.getInputField().setEnabled(False)
+            for radio_text in self.video_bitrate_types:
+                radio_text.getInputField().setEnabled(radio_text == checked_button.getParent())
                 
         on_bitrate_toggle()
         self.video_bitrate_form.buttonToggled.connect(on_bitrate_toggle)
@@ -245,4 +259,77 @@ class Widget_FFmpegOptions(QWidget):
         on_preset_toggle()
         self.preset.currentIndexChanged.connect(on_preset_toggle)
 
-        # self.presets_form.buttonClicked.connect(lambda: self.presets_form.button(0).setChecked(True))
\ No newline at end of file
+        # self.presets_form.buttonClicked.connect(lambda: self.presets_form.button(0).setChecked(True))
+
+    def buildSeekOptions(self, seek_widget: QWidget) -> None:
+        seek_layout = QHBoxLayout(seek_widget)
+        
+        tooltip: list[str] = [
+            'Examples:',
+            '-> "55" for 55s',
+            '-> "0.2" for 0.2s',
+            '-> "200ms" for 200 ms',
+            '-> "12:03:45" for 12h, 03m, 45s',
+            '-> "23.189" for 23.189s',
+        ]
+        self.seek = QLabelledLineEdit("Input Seek", "00:00:00", seek_widget)
+        self.seek.setToolTip("\n".join(tooltip))
+        self.duration = QLabelledLineEdit("Output Duration", "00:00:00", seek_widget)
+        self.duration.setToolTip("\n".join(tooltip))
+        seek_layout.addWidget(self.seek)
+        seek_layout.addWidget(self.duration)
+        self.smart_cut = QCheckBox("Smart Cut", seek_widget)
+        self.smart_cut.setToolTip("Frame-accurate trim that copies whole GOPs and re-encodes only the ones at the cut points")
+        seek_layout.addWidget(self.smart_cut)
+
+    def buildHwAccelOptions(self, hwaccel_widget: QWidget) -> None:
+        hwaccel_layout = QHBoxLayout(hwaccel_widget)
+        self.hwaccel = QLabelledLineEdit("Enable HW Accel?", "Leave blank to disable", hwaccel_widget)
+        self.hwaccel.setToolTip("Example: cuda")
+        hwaccel_layout.addWidget(self.hwaccel)
+        
+        # Offer the methods this FFmpeg build actually supports, once it is listed
+        capabilities: FFmpegCapabilities | None = get_capability_registry().getCached()
+        if capabilities:
+            self.offerHwAccels(capabilities)
+        else:
+            self.shared_states.signals.capabilitiesLoaded.connect(self.offerHwAccels)
+        self.hwaccel.getInputField().editingFinished.connect(self.checkHwAccelInBackground)
+
+    def offerHwAccels(self, capabilities: FFmpegCapabilities | None) -> None:
+        if not capabilities or self.hwaccel is None:
+            return
+        hwaccels: list[str] = ["auto", *capabilities.getHwAccels()]
+        completer = QCompleter(hwaccels, self.hwaccel)
+        self.hwaccel.getInputField().setCompleter(completer)
+        self.hwaccel.setToolTip(f"Supported by this FFmpeg build: {', '.join(hwaccels)}")
+
+    def checkHwAccelInBackground(self) -> None:
+        # The device test encode is remembered, so compiling won't wait for it
+        capabilities: FFmpegCapabilities | None = get_capability_registry().getCached()
+        hw_accel: str = self.getHwAccel()
+        if capabilities and hw_accel:
+            threading.Thread(target=capabilities.isHwAccelUsable, args=(hw_accel,), daemon=True).start()
+
+    def buildExtraOutputOptions(self, extra_outputs_widget: QWidget) -> None:
+        extra_outputs_layout = QGridLayout(extra_outputs_widget)
+        for idx, preset in enumerate(Defaults.presets_list[1:]):
+            checkbox = QCheckBox(preset.getTitle(), extra_outputs_widget)
+            extra_outputs_layout.addWidget(checkbox, idx // 3, idx % 3)
+            self.extra_outputs.append((checkbox, preset))
+
+    ##### Values of lazily built panels, empty while collapsed
+    def getSeek(self) -> str:
+        return self.seek.getValue() if self.seek and self.seek_widget.isExpanded() else ""
+    def getDuration(self) -> str:
+        return self.duration.getValue() if self.duration and self.seek_widget.isExpanded() else ""
+    def isSmartCut(self) -> bool:
+        return bool(self.smart_cut and self.smart_cut.isChecked() and self.seek_widget.isExpanded())
+    def getHwAccel(self) -> str:
+        return self.hwaccel.getValue() if self.hwaccel and self.hwaccel_widget.isExpanded() else ""
+    def getStreamFormat(self) -> str:
+        return str(self.stream_format.currentData() or "")
+    def getExtraPresets(self) -> list[Preset]:
+        if not self.extra_outputs_widget.isExpanded():
+            return []
+        return [preset for checkbox, preset in self.extra_outputs if checkbox.isChecked()]
@@ -1,15 +1,18 @@
-from SimplyFFmpegApplication.CommonHelpers import is_output_path_valid
-from SimplyFFmpegApplication.CommonWidgets import SharedStates
+from SimplyFFmpegApplication.CommonHelpers import derive_output_path, is_stream_url
+from SimplyFFmpegApplication.CommonWidgets import BackgroundTask, SharedStates
+from SimplyFFmpegApplication.PathValidation import StatCache, get_stat_cache, validate_input_path, validate_output_path
+from SimplyFFmpegApplication.Thumbnails import ThumbnailExtractor, default_thumbnail_count, get_thumbnail_extractor
 
 
-from PyQt6.QtCore import QMimeData, QUrl
-from PyQt6.QtGui import QDragEnterEvent, QDropEvent
-from PyQt6.QtWidgets import QFileDialog, QGridLayout, QGroupBox, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget
+from PyQt6.QtCore import QMimeData, Qt, QTimer
+from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QPixmap
+from PyQt6.QtWidgets import QFileDialog, QGridLayout, QGroupBox, QHBoxLayout, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget
 
 
 import os
 import re
 from pathlib import Path
+from typing import Callable
 
 
 class Widget_InputOutput(QWidget):
@@ -35,18 +38,43 @@ class Widget_InputOutput(QWidget):
         self.input_field.dropEvent = self.inputDropEvent
         io_widget_layout.addWidget(self.input_field, 0, 0)
 
+        input_buttons = QWidget(io_widget)
+        input_buttons_layout = QHBoxLayout(input_buttons)
+        input_buttons_layout.setContentsMargins(0,0,0,0)
         input_button = QPushButton("Browse Input")
+        input_button.setToolTip("Pick one file to edit here, or several to queue one job each")
         input_button.clicked.connect(self.browseInputFile)
-        io_widget_layout.addWidget(input_button, 0, 1)
+        input_buttons_layout.addWidget(input_button)
+        folder_button = QPushButton("Add Folder")
+        folder_button.setToolTip("Queue a job for every media file in a folder and its subfolders")
+        folder_button.clicked.connect(self.browseInputDirectory)
+        input_buttons_layout.addWidget(folder_button)
+        io_widget_layout.addWidget(input_buttons, 0, 1)
+
+        ##### Thumbnail strip, filled in the background
+        self.__thumbnail_task__: BackgroundTask | None = None
+        thumbnail_strip = QWidget(io_widget)
+        thumbnail_layout = QHBoxLayout(thumbnail_strip)
+        thumbnail_layout.setContentsMargins(0,0,0,0)
+        # The extractor loads its disk index, it is only created by the first request
+        self.thumbnail_labels: list[QLabel] = []
+        for _ in range(default_thumbnail_count):
+            thumbnail_label = QLabel(thumbnail_strip)
+            thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            thumbnail_layout.addWidget(thumbnail_label)
+            self.thumbnail_labels.append(thumbnail_label)
+        thumbnail_strip.hide()
+        self.thumbnail_strip: QWidget = thumbnail_strip
+        io_widget_layout.addWidget(thumbnail_strip, 1, 0, 1, 3)
 
         ##### Output layout
         self.output_field = QLineEdit()
-        io_widget_layout.addWidget(self.output_field, 1, 0)
+        io_widget_layout.addWidget(self.output_field, 2, 0)
 
         output_button = QPushButton("Browse Output")
         output_button.clicked.connect(self.browseOutputDirectory)
         self.output_field.textEdited.connect(self.fixOutputPathExtension)
-        io_widget_layout.addWidget(output_button, 1, 1)
+        io_widget_layout.addWidget(output_button, 2, 1)
 
         ##### Checkers
         input_checker_widget = QLabel("")
@@ -56,33 +84,66 @@ class Widget_InputOutput(QWidget):
         output_checker_widget.setFixedWidth(50)
 
         io_widget_layout.addWidget(input_checker_widget, 0, 2)
-        io_widget_layout.addWidget(output_checker_widget, 1, 2)
+        io_widget_layout.addWidget(output_checker_widget, 2, 2)
 
         # Listeners
-        def inputCheckerHandler() -> None:
-            code: int = self.verifyInputFile()
-            message: str = "OK" if (code == 1) else ("INVALID")
-            input_checker_widget.setText(message)
-        self.input_field.textChanged.connect(inputCheckerHandler)
-
-        def outputCheckerHandler() -> None:
-            code: int = self.verifyOutputFile()
-            message: str = "OK" if (code == 1) else (
-                "INVALID" if (code == 0) else ("EXISTS")
-            )
-            output_checker_widget.setText(message)
-        self.output_field.textChanged.connect(outputCheckerHandler)
+        # Validation stats the file system, which can stall on network mounts,
+        # so it runs in the background once typing pauses for a moment
+        self.input_checker_widget: QLabel = input_checker_widget
+        self.output_checker_widget: QLabel = output_checker_widget
+        self.__validation_task__: BackgroundTask | None = None
+        self.__drop_tasks__: list[BackgroundTask] = []
+        self.__validation_timer__: QTimer = QTimer(self)
+        self.__validation_timer__.setSingleShot(True)
+        self.__validation_timer__.setInterval(250)
+        self.__validation_timer__.timeout.connect(self.validateInBackground)
+        self.input_field.textChanged.connect(self.__validation_timer__.start)
+        self.output_field.textChanged.connect(self.__validation_timer__.start)
+
+    def validateInBackground(self) -> None:
+        input_file: str = self.input_field.text()
+        output_file: str = self.output_field.text()
+        stat_cache: StatCache = get_stat_cache()
+        task: BackgroundTask = BackgroundTask(
+            lambda report: (validate_input_path(input_file, stat_cache), validate_output_path(input_file, output_file, stat_cache)),
+            self
+        )
+        def on_validated(codes: tuple[int, int]) -> None:
+            # The fields changed again while this one was running
+            if self.__validation_task__ is not task:
+                return
+            input_code, output_code = codes
+            self.input_checker_widget.setText("OK" if (input_code == 1) else ("INVALID"))
+            self.output_checker_widget.setText("OK" if (output_code == 1) else (
+                "INVALID" if (output_code == 0) else ("EXISTS")
+            ))
+        task.succeeded.connect(on_validated)
+        self.__validation_task__ = task
+        task.start()
+
+    def dropSinglePath(self, dropped_path: str) -> None:
+        # Whether it is a folder to queue takes a stat, so it is checked in the background
+        stat_cache: StatCache = get_stat_cache()
+        task: BackgroundTask = BackgroundTask(lambda report: stat_cache.isDir(dropped_path), self)
+        def on_checked(is_directory: bool) -> None:
+            self.__drop_tasks__.remove(task)
+            task.deleteLater()
+            if is_directory:
+                self.shared_states.signals.emitPathsDropped([dropped_path])
+            else:
+                self.setInputFile(dropped_path)
+        task.succeeded.connect(on_checked)
+        self.__drop_tasks__.append(task)
+        task.start()
 
     def verifyInputFile(self) -> int:
         """
         Output Codes:
             0   -> Input file doesn't exist
             1   -> OK
+        Always stats again, for checks right before a conversion.
         """
-        input_file: str = self.input_field.text()
-        if not (input_file and os.path.isfile(input_file)):
-            return 0
-        return 1
+        return validate_input_path(self.input_field.text(), get_stat_cache(), max_age=0)
 
     def verifyOutputFile(self) -> int:
         """
@@ -90,20 +151,29 @@ class Widget_InputOutput(QWidget):
             -1  -> Output file already exists
             0   -> Output path is invalid
             1   -> OK
+        Always stats again, for checks right before a conversion.
         """
-        input_file: str = self.input_field.text()
-        output_file: str = self.output_field.text()
-        if not is_output_path_valid(output_file) or os.path.normcase(os.path.normpath(output_file)) == os.path.normcase(os.path.normpath(input_file)):
-            return 0
-        if os.path.isfile(output_file):
-            return -1
-        return 1
+        return validate_output_path(self.input_field.text(), self.output_field.text(), get_stat_cache(), max_age=0)
 
     def browseInputFile(self) -> None:
-        file_name: str = QFileDialog.getOpenFileName(self, "Select Input File")[0]
-        if file_name:
-            self.input_field.setText(str(Path(file_name)))
-            self.setOutputPathFromInput()
+        file_names: list[str] = QFileDialog.getOpenFileNames(self, "Select Input Files")[0]
+        if len(file_names) > 1:
+            self.shared_states.signals.emitPathsDropped([str(Path(file_name)) for file_name in file_names])
+        elif file_names:
+            self.setInputFile(str(Path(file_names[0])))
+        return
+
+    def browseInputDirectory(self) -> None:
+        directory_name: str = QFileDialog.getExistingDirectory(self, "Select Input Folder")
+        if directory_name:
+            self.shared_states.signals.emitPathsDropped([str(Path(directory_name))])
+        return
+
+    def setInputFile(self, input_file: str) -> None:
+        self.input_field.setText(input_file)
+        self.setOutputPathFromInput()
+        # Probing the input for the thumbnails also warms the metadata cache
+        self.loadThumbnails()
         return
 
     def browseOutputDirectory(self) -> None:
@@ -113,6 +183,37 @@ class Widget_InputOutput(QWidget):
             self.setOutputPathFromInput()
         return
 
+    def loadThumbnails(self) -> None:
+        """
+        Shows keyframe thumbnails of the input under the input field. Cached
+        thumbnails appear at once, others as FFmpeg produces them; the disk
+        cache and FFmpeg are only touched off the GUI thread.
+        """
+        for thumbnail_label in self.thumbnail_labels:
+            thumbnail_label.clear()
+        self.thumbnail_strip.hide()
+
+        input_file: str = self.input_field.text()
+        def extract(report: Callable[[str], None]) -> list[str]:
+            # Creating the extractor and its prober loads their disk caches
+            extractor: ThumbnailExtractor = get_thumbnail_extractor()
+            return extractor.extract(input_file, report)
+        task: BackgroundTask = BackgroundTask(extract, self)
+        shown_count: list[int] = [0]
+        def on_thumbnail(thumbnail: str) -> None:
+            # A newer input replaced this one
+            if self.__thumbnail_task__ is not task or shown_count[0] >= len(self.thumbnail_labels):
+                return
+            pixmap: QPixmap = QPixmap(thumbnail)
+            if pixmap.isNull():
+                return
+            self.thumbnail_labels[shown_count[0]].setPixmap(pixmap)
+            shown_count[0] += 1
+            self.thumbnail_strip.show()
+        task.reported.connect(on_thumbnail)
+        self.__thumbnail_task__ = task
+        task.start()
+
     def fixOutputPathExtension(self) -> None:
         if not (self.input_field.text() and self.output_field.text()):
             return
@@ -120,14 +221,16 @@ class Widget_InputOutput(QWidget):
         text: str = self.output_field.text()
         extension: str = self.shared_states.extension
         assert extension
+        # Sockets are named as they are, the muxer doesn't come from an extension
+        if is_stream_url(text):
+            return
 
         if re.search(fr"[^\\\/]+\.{extension}$", text) is None:
             base_filename = Path(text).stem
             if not base_filename:
-                if os.path.isfile(self.input_field.text()):
-                    base_filename = Path(self.input_field.text()).stem
-                else:
-                    base_filename = "video"
+                # Runs on every keystroke, so the input is judged by its text, not a stat
+                input_path: Path = Path(self.input_field.text())
+                base_filename = input_path.stem if input_path.suffix else "video"
             
             self.output_field.setText(str(Path(os.path.dirname(text)) / (base_filename + f".{extension}")))
         return
@@ -139,7 +242,6 @@ class Widget_InputOutput(QWidget):
         input_directory: str
         input_file: str
         input_directory, input_file = os.path.split(new_input_path)
-        input_file_name: str = os.path.splitext(input_file)[0]
         if not os.path.isdir(input_directory):
             self.output_field.setText(None)
             return
@@ -151,8 +253,7 @@ class Widget_InputOutput(QWidget):
         output_field: str = self.output_field.text()
         output_directory: str = output_field if os.path.isdir(output_field) else os.path.split(output_field)[0]
         extension: str = self.shared_states.extension
-        final_directory: str = output_directory if os.path.isdir(output_directory) else input_directory
-        self.output_field.setText(os.path.join(final_directory, f"{input_file_name}_ed.{extension}"))
+        self.output_field.setText(derive_output_path(new_input_path, output_directory, extension))
 
         return
 
@@ -173,7 +274,9 @@ class Widget_InputOutput(QWidget):
 
         data: QMimeData | None = a0.mimeData()
         if data is not None and data.hasUrls():
-            url: QUrl = data.urls()[0]
-            if url:
-                self.input_field.setText(url.toLocalFile())
-                self.setOutputPathFromInput()
\ No newline at end of file
+            dropped_paths: list[str] = [url.toLocalFile() for url in data.urls() if url.isLocalFile()]
+            # A single file still goes into the field, anything more is queued
+            if len(dropped_paths) == 1:
+                self.dropSinglePath(dropped_paths[0])
+            elif dropped_paths:
+                self.shared_states.signals.emitPathsDropped(dropped_paths)
\ No newline at end of file
@@ -0,0 +1,7 @@
+import sys
+
+
+from SimplyFFmpegApplication.CommandLine import main
+
+
+sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Benchmark suite for SimplyFFmpeg.
+
+Two layers, neither needs media files:
+    -> micro:      States.compileState and command preview formatting, timed in-process
+    -> end-to-end: one encode per preset in Defaults.presets_list and per entry of
+                   Defaults.video_presets_list, from a clip generated with lavfi
+                   (testsrc2 video + sine audio)
+
+Every end-to-end run records wall time, CPU time (user + system of the FFmpeg
+process), average encoding fps, realtime factor and output size. Results are
+written as JSON and can be compared against a stored baseline.
+
+Usage:
+    python3 benchmarks/benchmark_suite.py --output results.json
+    python3 benchmarks/benchmark_suite.py --micro-only
+    python3 benchmarks/benchmark_suite.py --save-baseline benchmarks/suite_baseline.json
+    python3 benchmarks/benchmark_suite.py --baseline benchmarks/suite_baseline.json --tolerance 0.15
+
+Exits with 1 if a metric regresses past the baseline by more than the tolerance.
+Baselines are only comparable on the same machine and FFmpeg build.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable
+
+
+repository_root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repository_root)
+
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, Defaults, format_command_preview  # noqa: E402
+from SimplyFFmpegApplication.HeadlessRunner import HeadlessJobRunner  # noqa: E402
+from SimplyFFmpegApplication.Jobs import Job, JobStatus  # noqa: E402
+
+
+# Metric -> True if higher is better
+compared_metrics: dict[str, bool] = {
+    "per_call_us": False,
+    "wall_time": False,
+    "cpu_time": False,
+    "fps": True,
+    "realtime_factor": True,
+}
+
+
+##############################
+# Micro-benchmarks
+##############################
+
+def micro_cases() -> dict[str, ConversionOptions]:
+    cases: dict[str, ConversionOptions] = {}
+
+    manual: ConversionOptions = ConversionOptions("input.mp4", "output.mp4")
+    manual.progress_pipe = True
+    manual.seek = "00:01:30"
+    manual.duration = "20"
+    manual.video_crf = "23"
+    manual.video_preset = "fast"
+    manual.fps = "30"
+    manual.video_width = "1280"
+    manual.audio_bitrate = "128k"
+    manual.volume = "0.8"
+    cases["manual options"] = manual
+
+    for preset in Defaults.presets_list[1:]:
+        options: ConversionOptions = ConversionOptions("input.mp4", f"output.{preset.getExtension()}")
+        options.progress_pipe = True
+        options.preset = preset
+        cases[f"preset {preset.getTitle()}"] = options
+    return cases
+
+
+def time_call(function: Callable[[], Any], repeat: int = 5) -> float:
+    """
+    Best per-call time in microseconds, over `repeat` timing loops.
+    """
+    timer: timeit.Timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def run_micro() -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    for name, options in micro_cases().items():
+        states = options.buildStates()
+        program, arguments = states.compileState()
+        results[f"compileState: {name}"] = {"per_call_us": time_call(states.compileState)}
+        results[f"preview: {name}"] = {"per_call_us": time_call(lambda: format_command_preview(program, arguments))}
+    return results
+
+
+##############################
+# End-to-end runs
+##############################
+
+def render_source(work_directory: str, duration: float, size: str, rate: int) -> str:
+    source: str = os.path.join(work_directory, "source.mkv")
+    subprocess.run([
+        "ffmpeg", "-hide_banner", "-nostats", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={rate}:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration}",
+        "-c:v", "ffv1", "-c:a", "pcm_s16le", source
+    ], check=True)
+    return source
+
+
+def end_to_end_cases(source: str, work_directory: str) -> dict[str, ConversionOptions]:
+    cases: dict[str, ConversionOptions] = {}
+    for idx, preset in enumerate(Defaults.presets_list):
+        options: ConversionOptions = ConversionOptions(source, os.path.join(work_directory, f"preset_{idx}.{preset.getExtension()}"))
+        options.preset = preset if idx else None
+        cases[f"preset {preset.getTitle()}"] = options
+    for video_preset in Defaults.video_presets_list:
+        options = ConversionOptions(source, os.path.join(work_directory, f"video_preset_{video_preset}.mp4"))
+        options.video_preset = video_preset
+        cases[f"video preset {video_preset}"] = options
+    for options in cases.values():
+        options.overwrite = True
+        options.progress_pipe = True
+    return cases
+
+
+def run_end_to_end(source: str, media_duration: float, work_directory: str, runs: int) -> dict[str, dict[str, float]]:
+    runner: HeadlessJobRunner = HeadlessJobRunner(1, report=lambda message: None)
+    results: dict[str, dict[str, float]] = {}
+    for name, options in end_to_end_cases(source, work_directory).items():
+        samples: list[dict[str, float]] = []
+        for _ in range(runs):
+            job: Job = Job(*options.compile(), options.input_file, options.output_file)
+            job.progress.setInputDuration(media_duration)
+
+            usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+            runner.runJob(job)
+            usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            if job.status != JobStatus.DONE:
+                raise Exception(f"{name}: FFmpeg exited with code {job.exit_code}")
+
+            wall_time: float = job.getWallTime() or 0.0
+            frame_count: int = (job.progress.latest.frame if job.progress.latest else None) or 0
+            samples.append({
+                "wall_time": wall_time,
+                "cpu_time": (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime),
+                "fps": frame_count / wall_time if wall_time > 0 else 0.0,
+                "realtime_factor": media_duration / wall_time if wall_time > 0 else 0.0,
+                "output_bytes": float(job.getOutputSize() or 0),
+            })
+        results[name] = {metric: statistics.median(sample[metric] for sample in samples) for metric in samples[0]}
+        print(
+            f"{name:>28}: wall {results[name]['wall_time']:6.2f}s, cpu {results[name]['cpu_time']:6.2f}s, "
+            f"{results[name]['fps']:7.1f} fps, {results[name]['realtime_factor']:5.1f}x realtime, "
+            f"{results[name]['output_bytes'] / 1024:9.1f} KiB"
+        )
+    return results
+
+
+##############################
+# Baseline comparison
+##############################
+
+def find_regressions(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for layer in ("micro", "end_to_end"):
+        for name, metrics in results.get(layer, {}).items():
+            baseline_metrics: dict[str, float] = baseline.get(layer, {}).get(name, {})
+            for metric, higher_is_better in compared_metrics.items():
+                if metric not in metrics or not baseline_metrics.get(metric):
+                    continue
+                value: float = metrics[metric]
+                reference: float = baseline_metrics[metric]
+                change: float = (reference - value) / reference if higher_is_better else (value - reference) / reference
+                if change > tolerance:
+                    regressions.append(f"{layer} / {name} / {metric}: {value:.3f} vs baseline {reference:.3f} ({change:+.0%} worse)")
+    return regressions
+
+
+def get_ffmpeg_version() -> str:
+    try:
+        output: str = subprocess.run(["ffmpeg", "-hide_banner", "-version"], capture_output=True, text=True).stdout
+    except OSError:
+        return ""
+    return output.splitlines()[0] if output else ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="", help="Write the results JSON here")
+    parser.add_argument("--baseline", default="", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default="", help="Write the results of this run as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression of a metric")
+    parser.add_argument("--micro-only", action="store_true", help="Skip the end-to-end encodes")
+    parser.add_argument("--runs", type=int, default=1, help="End-to-end runs per case (the median is kept)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Length of the generated clip in seconds")
+    parser.add_argument("--size", default="1280x720", help="Resolution of the generated clip")
+    parser.add_argument("--rate", type=int, default=30, help="Frame rate of the generated clip")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": get_ffmpeg_version(),
+        },
+        "micro": {},
+        "end_to_end": {},
+    }
+
+    print("Micro-benchmarks:")
+    results["micro"] = run_micro()
+    for name, metrics in results["micro"].items():
+        print(f"{name:>40}: {metrics['per_call_us']:8.2f} us/call")
+
+    if not args.micro_only:
+        print(f"End-to-end ({args.size} @ {args.rate} fps, {args.duration:g}s clip):")
+        work_directory: str = tempfile.mkdtemp(prefix="simplyffmpeg_benchmark_suite_")
+        try:
+            source: str = render_source(work_directory, args.duration, args.size, args.rate)
+            results["end_to_end"] = run_end_to_end(source, args.duration, work_directory, max(1, args.runs))
+        finally:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+        print(f"Results saved to {path}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline: dict[str, Any] = json.load(file)
+        regressions: list[str] = find_regressions(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
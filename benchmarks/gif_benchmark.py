@@ -0,0 +1,112 @@
+"""
+GIF pipeline benchmark.
+
+Renders a synthetic clip (lavfi testsrc2) and converts it to GIF three ways:
+    -> legacy:    the previous "To GIF" preset (single pass, -sws_flags/-sws_dither, default palette)
+    -> two-pass:  palettegen into a PNG, then paletteuse; the source is decoded twice
+    -> single:    the current "To GIF" preset; one decode through split/palettegen/paletteuse
+
+For each variant it reports the median wall time, the CPU time of the FFmpeg
+processes and the output size.
+
+Usage:
+    python3 benchmarks/gif_benchmark.py --runs 3 --duration 10 --size 1280x720
+"""
+import argparse
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+repository_root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repository_root)
+
+from SimplyFFmpegApplication.CommandModel import Defaults  # noqa: E402
+
+
+legacy_options: list[str] = ["-sws_flags", "neighbor+full_chroma_int+accurate_rnd", "-sws_dither", "a_dither"]
+
+
+def run_ffmpeg(arguments: list[str]) -> tuple[float, float]:
+    """
+    Returns (wall seconds, CPU seconds) of one FFmpeg run.
+    """
+    usage_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started_at: float = time.monotonic()
+    result: subprocess.CompletedProcess[bytes] = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostats", "-loglevel", "error", "-y", *arguments],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    wall_time: float = time.monotonic() - started_at
+    usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    if result.returncode != 0:
+        raise Exception(result.stderr.decode(errors="replace").strip() or f"FFmpeg exited with code {result.returncode}")
+    cpu_time: float = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    return (wall_time, cpu_time)
+
+
+def get_gif_preset_options() -> list[str]:
+    for preset in Defaults.presets_list:
+        if preset.getTitle() == "To GIF":
+            return preset.getOptionsAsStr()
+    raise Exception("The \"To GIF\" preset is missing.")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--duration", type=float, default=10.0, help="Length of the synthetic source in seconds")
+    parser.add_argument("--size", default="1280x720", help="Resolution of the synthetic source")
+    parser.add_argument("--rate", type=int, default=30, help="Frame rate of the synthetic source")
+    args = parser.parse_args()
+
+    work_directory: str = tempfile.mkdtemp(prefix="simplyffmpeg_gif_benchmark_")
+    try:
+        source: str = os.path.join(work_directory, "source.mp4")
+        run_ffmpeg(["-f", "lavfi", "-i", f"testsrc2=size={args.size}:rate={args.rate}:duration={args.duration}", "-pix_fmt", "yuv420p", source])
+
+        palette: str = os.path.join(work_directory, "palette.png")
+        variants: dict[str, list[list[str]]] = {
+            "legacy": [["-i", source, *legacy_options, os.path.join(work_directory, "legacy.gif")]],
+            "two-pass": [
+                ["-i", source, "-vf", "fps=15,scale='min(480,iw)':-1:flags=lanczos,palettegen=stats_mode=diff", palette],
+                ["-i", source, "-i", palette, "-filter_complex",
+                 "[0:v]fps=15,scale='min(480,iw)':-1:flags=lanczos[frames];[frames][1:v]paletteuse=dither=sierra2_4a:diff_mode=rectangle",
+                 os.path.join(work_directory, "two-pass.gif")],
+            ],
+            "single": [["-i", source, *get_gif_preset_options(), os.path.join(work_directory, "single.gif")]],
+        }
+
+        ##### Warm-up run, so that file system caches do not skew the first sample
+        run_ffmpeg(variants["single"][0])
+
+        print(f"Source: {args.size} @ {args.rate} fps, {args.duration:g}s, {args.runs} runs per variant")
+        for name, commands in variants.items():
+            wall_times: list[float] = []
+            cpu_times: list[float] = []
+            for _ in range(args.runs):
+                wall_time: float = 0.0
+                cpu_time: float = 0.0
+                for command in commands:
+                    step_wall, step_cpu = run_ffmpeg(command)
+                    wall_time += step_wall
+                    cpu_time += step_cpu
+                wall_times.append(wall_time)
+                cpu_times.append(cpu_time)
+            size: int = os.path.getsize(commands[-1][-1])
+            print(
+                f"{name:>10}: wall {statistics.median(wall_times):6.2f}s, cpu {statistics.median(cpu_times):6.2f}s, "
+                f"size {size / 1024:9.1f} KiB"
+            )
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Seek latency benchmark.
+
+Renders a long synthetic clip (lavfi testsrc2, one keyframe every --gop frames)
+and clips a few seconds from it at growing offsets, comparing:
+    -> output seek: `-i source -ss T`, everything before T is decoded and discarded
+    -> hybrid seek: `-ss keyframe -i source -ss rest`, the engine used by States.compileState
+                    (the time includes the keyframe lookup with ffprobe)
+
+Both re-encode into a null muxer, so only seeking and decoding are measured.
+
+Usage:
+    python3 benchmarks/seek_benchmark.py --length 600 --offsets 10,60,300,590
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+repository_root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repository_root)
+
+from SimplyFFmpegApplication.CommandModel import States  # noqa: E402
+from SimplyFFmpegApplication.MediaProbe import MediaProber  # noqa: E402
+
+
+def run_ffmpeg(arguments: list[str]) -> float:
+    started_at: float = time.monotonic()
+    result: subprocess.CompletedProcess[bytes] = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostats", "-loglevel", "error", "-y", *arguments],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    if result.returncode != 0:
+        raise Exception(result.stderr.decode(errors="replace").strip() or f"FFmpeg exited with code {result.returncode}")
+    return time.monotonic() - started_at
+
+
+def clip_arguments(source: str, offset: float, clip_length: float, keyframe: float | None) -> list[str]:
+    states: States = States()
+    states.setIO(source, "-")
+    states.setSeek(f"{offset:.3f}")
+    states.setDuration(f"{clip_length:.3f}")
+    states.setSeekKeyframe(keyframe)
+    arguments: list[str] = states.compileState()[1]
+    # Swap the "-n <output>" tail for a null muxer
+    return [*arguments[:-2], "-f", "null", "-"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--length", type=float, default=600.0, help="Length of the synthetic source in seconds")
+    parser.add_argument("--offsets", default="10,60,180,300,590", help="Comma-separated seek offsets in seconds")
+    parser.add_argument("--clip", type=float, default=5.0, help="Length of every clip in seconds")
+    parser.add_argument("--gop", type=int, default=250, help="Frames between keyframes in the source")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    offsets: list[float] = [float(offset) for offset in args.offsets.split(",") if offset]
+    work_directory: str = tempfile.mkdtemp(prefix="simplyffmpeg_seek_benchmark_")
+    try:
+        source: str = os.path.join(work_directory, "source.mp4")
+        print(f"Rendering a {args.length:g}s source...")
+        run_ffmpeg([
+            "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=25:duration={args.length}",
+            "-g", str(args.gop), "-pix_fmt", "yuv420p", source
+        ])
+
+        print(f"{'offset':>8} | {'output seek':>12} | {'hybrid seek':>12} | {'speedup':>8}")
+        for offset in offsets:
+            output_times: list[float] = []
+            hybrid_times: list[float] = []
+            for run in range(args.runs):
+                output_times.append(run_ffmpeg(clip_arguments(source, offset, args.clip, None)))
+
+                # A fresh cache every run, so the keyframe lookup is always paid for
+                prober: MediaProber = MediaProber(cache_file=os.path.join(work_directory, f"probe_cache_{offset:g}_{run}.json"))
+                started_at: float = time.monotonic()
+                keyframe: float | None = prober.findKeyframeBefore(source, offset)
+                lookup_time: float = time.monotonic() - started_at
+                hybrid_times.append(lookup_time + run_ffmpeg(clip_arguments(source, offset, args.clip, keyframe)))
+
+            output_time: float = statistics.median(output_times)
+            hybrid_time: float = statistics.median(hybrid_times)
+            print(f"{offset:>7g}s | {output_time:>11.2f}s | {hybrid_time:>11.2f}s | {output_time / hybrid_time:>7.1f}x")
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
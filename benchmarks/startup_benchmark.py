@@ -0,0 +1,92 @@
+"""
+Cold-start benchmark for the SimplyFFmpeg GUI.
+
+Launches `main.py --startup-benchmark` in a fresh interpreter several times and
+reports, measured from process spawn:
+    -> launch to first paint of the main window
+    -> launch to first interaction (first idle event loop pass after the paint)
+
+Usage:
+    python3 benchmarks/startup_benchmark.py --runs 10
+    python3 benchmarks/startup_benchmark.py --save-baseline benchmarks/startup_baseline.json
+    python3 benchmarks/startup_benchmark.py --baseline benchmarks/startup_baseline.json --tolerance 0.25
+
+Exits with 1 if a median regresses past the baseline by more than the tolerance.
+Runs offscreen (QT_QPA_PLATFORM=offscreen) unless a platform is already set.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+repository_root: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+metrics: tuple[str, ...] = ("first_paint", "first_interaction")
+
+
+def measure_once() -> dict[str, float]:
+    environment: dict[str, str] = dict(os.environ)
+    environment.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    spawn_time: float = time.time()
+    result: subprocess.CompletedProcess[str] = subprocess.run(
+        [sys.executable, os.path.join(repository_root, "main.py"), "--startup-benchmark"],
+        cwd=repository_root, env=environment, capture_output=True, text=True, timeout=120
+    )
+    timestamps: dict[str, float] | None = None
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith("{"):
+            timestamps = json.loads(line)
+            break
+    if timestamps is None:
+        raise Exception(f"No startup timestamps reported:\n{result.stderr}")
+
+    measurement: dict[str, float] = {metric: timestamps[metric] - spawn_time for metric in metrics}
+    # Interpreter start-up is everything before the first line of main.py ran
+    measurement["interpreter"] = timestamps["launch"] - spawn_time
+    measurement["window_constructed"] = timestamps["window_constructed"] - spawn_time
+    return measurement
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--baseline", default="", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", default="", help="Write the medians of this run as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown of a median")
+    args = parser.parse_args()
+
+    ##### Warm-up run, so that file system caches do not skew the first sample
+    measure_once()
+    runs: list[dict[str, float]] = [measure_once() for _ in range(args.runs)]
+
+    medians: dict[str, float] = {}
+    for metric in ("interpreter", "window_constructed", *metrics):
+        samples: list[float] = [run[metric] for run in runs]
+        medians[metric] = statistics.median(samples)
+        print(f"{metric:>20}: median {medians[metric] * 1000:7.1f} ms, min {min(samples) * 1000:7.1f} ms, max {max(samples) * 1000:7.1f} ms")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump(medians, file, indent=4)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline: dict[str, float] = json.load(file)
+        regressed: bool = False
+        for metric in metrics:
+            if metric in baseline and medians[metric] > baseline[metric] * (1 + args.tolerance):
+                print(f"REGRESSION: {metric} {medians[metric] * 1000:.1f} ms > baseline {baseline[metric] * 1000:.1f} ms (+{args.tolerance:.0%})")
+                regressed = True
+        if regressed:
+            return 1
+        print("No startup regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
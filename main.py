@@ -1,10 +1,11 @@
-import sys
+import time
+launch_time: float = time.time()
 
 
-from PyQt6.QtWidgets import QApplication, QStyleFactory
+import sys
 
 
-from SimplyFFmpegApplication.CoreApplication import SimplyFFmpeg
+from PyQt6.QtWidgets import QApplication, QStyleFactory
 
 
 def main() -> int:
@@ -17,12 +18,18 @@ def main() -> int:
     if curr_style:
         app.setPalette(curr_style.standardPalette())
     
+    # Deferred until the QApplication exists
+    from SimplyFFmpegApplication.CoreApplication import SimplyFFmpeg
+    
     # Execute
     window = SimplyFFmpeg()
+    if "--startup-benchmark" in sys.argv:
+        from SimplyFFmpegApplication.StartupProfiler import StartupProfiler
+        StartupProfiler(launch_time, window, app)
     window.show()
     return app.exec()
 
 if __name__ == "__main__":
     sys.exit(main())
 
-sys.exit(1)
\ No newline at end of file
+sys.exit(1)
@@ -0,0 +1,12 @@
+from SimplyFFmpegApplication.CommonHelpers import is_output_path_valid
+
+
+import os
+
+
+def test_relative_output_paths_are_valid(tmp_path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    assert is_output_path_valid("clip_ed.mp4")
+    assert is_output_path_valid(os.path.join(".", "out.mp4"))
+    assert not is_output_path_valid("out")
+    assert not is_output_path_valid(os.path.join("missing", "out.mp4"))
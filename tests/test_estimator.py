@@ -0,0 +1,23 @@
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, Defaults, Preset
+from SimplyFFmpegApplication.Estimator import SampleEstimator
+from SimplyFFmpegApplication.MediaProbe import MediaProber
+
+
+import os
+
+
+def sample_arguments(preset: Preset | None, tmp_path: str) -> list[str]:
+    options: ConversionOptions = ConversionOptions("in.mp4", "out.mp4")
+    options.preset = preset
+    estimator: SampleEstimator = SampleEstimator(options, prober=MediaProber(cache_file=os.path.join(tmp_path, "probe.json")))
+    _, arguments = estimator.__sampleArguments__(12.0, 4.0, os.path.join(tmp_path, "sample.mp4"))
+    return arguments
+
+
+def test_sample_window_is_kept_for_every_preset(tmp_path) -> None:
+    for preset in [None, *Defaults.presets_list]:
+        arguments: list[str] = sample_arguments(preset, str(tmp_path))
+        input_idx: int = arguments.index("-i")
+        assert arguments[input_idx - 2:input_idx] == ["-ss", "12.000"], preset
+        assert arguments[input_idx + 2:input_idx + 4] == ["-t", "4.000"], preset
+        assert arguments.count("-ss") == 1 and arguments.count("-t") == 1, preset
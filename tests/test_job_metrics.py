@@ -0,0 +1,22 @@
+from SimplyFFmpegApplication.JobMetrics import ProcessSampler
+
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+
+@pytest.mark.skipif(not (os.path.isdir("/proc/self") and hasattr(os, "waitid")), reason="needs /proc and waitid")
+def test_exit_watcher_samples_before_the_reap() -> None:
+    process: subprocess.Popen = subprocess.Popen([sys.executable, "-c", "import os; open(os.devnull, 'w').write('x' * 5_000_000)"])
+    # Only the first sample before the exit, so the totals must come from the exit watcher
+    sampler: ProcessSampler = ProcessSampler(process.pid, interval=60.0, watch_exit=True)
+    sampler.start()
+    os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    time.sleep(0.2)
+    process.wait()
+    sampler.stop()
+    assert sampler.write_bytes >= 5_000_000
@@ -0,0 +1,46 @@
+from SimplyFFmpegApplication.LogPipeline import LogBuffer
+
+
+import os
+
+
+def test_only_the_last_lines_are_kept() -> None:
+    log: LogBuffer = LogBuffer(line_cap=3)
+    log.writeText("".join(f"line {idx}\n" for idx in range(10)))
+    assert log.getLines() == ["line 7", "line 8", "line 9"]
+    assert log.takePending() == ["line 7", "line 8", "line 9"]
+    assert log.takePending() == []
+    log.setLineCap(2)
+    assert log.getLines() == ["line 8", "line 9"]
+
+
+def test_multibyte_characters_split_across_chunks() -> None:
+    log: LogBuffer = LogBuffer()
+    data: bytes = "Überschrift – 字幕\n".encode()
+    for idx in range(len(data)):
+        log.write(data[idx:idx + 1])
+    assert log.getLines() == ["Überschrift – 字幕"]
+
+
+def test_sources_decode_and_buffer_separately() -> None:
+    log: LogBuffer = LogBuffer()
+    log.write("frame=1\rfra".encode(), source="a", label="== a ==")
+    log.write("é".encode()[:1], source="b", label="== b ==")
+    log.write(b"me=2\r\n", source="a", label="== a ==")
+    log.write("é\n".encode()[1:], source="b", label="== b ==")
+    log.finishSource("a")
+    assert log.getLines() == ["== a ==", "frame=1", "frame=2", "== b ==", "é"]
+
+
+def test_unfinished_line_is_flushed_on_finish(tmp_path) -> None:
+    spill_file: str = os.path.join(tmp_path, "ffmpeg.log")
+    log: LogBuffer = LogBuffer(line_cap=1)
+    assert log.startSpill(spill_file)
+    log.write(b"first\nlast without newline")
+    assert log.getLines() == ["first"]
+    log.finishSource()
+    log.stopSpill()
+    assert log.getLines() == ["last without newline"]
+    # The spill file keeps what the line cap dropped
+    with open(spill_file, "r", encoding="utf-8") as file:
+        assert file.read() == "first\nlast without newline\n"
@@ -0,0 +1,60 @@
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, States
+from SimplyFFmpegApplication.Loudness import LoudnessMeasurement, build_loudnorm_filter
+
+
+import pytest
+
+
+loudnorm_output: str = """[Parsed_loudnorm_0 @ 0x55d0c3a0c2c0]
+{
+	"input_i" : "-27.61",
+	"input_tp" : "-4.47",
+	"input_lra" : "18.06",
+	"input_thresh" : "-39.20",
+	"output_i" : "-23.10",
+	"output_tp" : "-1.00",
+	"output_lra" : "14.20",
+	"output_thresh" : "-34.59",
+	"normalization_type" : "dynamic",
+	"target_offset" : "0.10"
+}
+"""
+
+
+def test_measured_filter_is_linear() -> None:
+    measurement: LoudnessMeasurement | None = LoudnessMeasurement.fromOutput("Stream mapping: ...\n" + loudnorm_output)
+    assert measurement is not None
+    assert build_loudnorm_filter(-23.0, measurement) == (
+        "loudnorm=I=-23:TP=-1:LRA=20"
+        ":measured_I=-27.61:measured_TP=-4.47:measured_LRA=18.06:measured_thresh=-39.20"
+        ":offset=0.10:linear=true"
+    )
+
+
+def test_unmeasured_filter_is_dynamic() -> None:
+    assert build_loudnorm_filter(-16.5, None) == "loudnorm=I=-16.5:TP=-1:LRA=20"
+
+
+def test_silence_and_garbage_are_not_measurements() -> None:
+    assert LoudnessMeasurement.fromOutput(loudnorm_output.replace('"-27.61"', '"-inf"')) is None
+    assert LoudnessMeasurement.fromOutput(loudnorm_output.replace('"target_offset" : "0.10"', '"other" : "0"')) is None
+    assert LoudnessMeasurement.fromOutput("Conversion failed!") is None
+
+
+def test_normalization_resamples_back_to_the_source_rate() -> None:
+    states: States = States()
+    states.setIO("in.mp4", "out.mp4")
+    states.setLoudnessNormalization(-23.0, None, 44100)
+    _, arguments = states.compileState()
+    assert arguments[arguments.index("-filter:a") + 1] == "loudnorm=I=-23:TP=-1:LRA=20,aresample=44100"
+    assert states.getNotes() == ["Loudness is not measured yet, so it is normalized to -23 LUFS with a dynamic gain."]
+
+
+def test_loudness_target_range() -> None:
+    options: ConversionOptions = ConversionOptions("in.mp4", "out.mp4")
+    options.loudness = "-23"
+    assert options.getLoudnessTarget() == -23.0
+    for loudness in ("-80", "0", "loud"):
+        options.loudness = loudness
+        with pytest.raises(ValueError):
+            options.getLoudnessTarget()
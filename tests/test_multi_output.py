@@ -0,0 +1,82 @@
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, Defaults, MultiOutputCompiler, Preset, compile_conversion
+from SimplyFFmpegApplication.MediaProbe import MediaInfo
+
+
+import pytest
+
+
+mp3_preset: Preset = Defaults.presets_list[2]
+gif_preset: Preset = Defaults.presets_list[3]
+
+
+def video_info() -> MediaInfo:
+    return MediaInfo({
+        "format": {"duration": "60.0"},
+        "streams": [
+            {"codec_type": "video", "codec_name": "h264", "avg_frame_rate": "30/1"},
+            {"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000"},
+        ],
+    })
+
+
+def output_options(arguments: list[str], previous: str, output_file: str) -> list[str]:
+    # The per-output options of `output_file`, which follows `previous`
+    return arguments[arguments.index(previous) + 1:arguments.index(output_file)]
+
+
+def test_extra_outputs_share_the_trim() -> None:
+    options: ConversionOptions = ConversionOptions("in.mp4", "/tmp/out.mp4")
+    options.seek = "00:00:30"
+    options.duration = "10"
+    _, passes, _, extra_files, _ = compile_conversion(options, [mp3_preset])
+    arguments: list[str] = passes[0]
+    assert extra_files == ["/tmp/out.mp3"]
+    input_idx: int = arguments.index("-i")
+    assert arguments[input_idx - 2:input_idx] == ["-ss", "00:00:30"]
+    assert arguments.count("-ss") == 1
+    assert output_options(arguments, "in.mp4", "/tmp/out.mp4") == ["-n", "-map", "0:v:0?", "-map", "0:a:0?", "-t", "10"]
+    assert output_options(arguments, "/tmp/out.mp4", "/tmp/out.mp3") == ["-map", "0:a:0?", "-t", "10", "-b:a", "192k"]
+
+
+def test_probed_input_does_not_split_the_heads() -> None:
+    # A keyframe lookup would give the main output its own input seek
+    options: ConversionOptions = ConversionOptions("in.mp4", "/tmp/out.mp4")
+    options.input_info = video_info()
+    options.seek = "30"
+    _, passes, _, _, _ = compile_conversion(options, [mp3_preset, gif_preset])
+    arguments: list[str] = passes[0]
+    assert arguments[arguments.index("-i") - 2:arguments.index("-i")] == ["-ss", "30"]
+    assert "-t" not in arguments
+
+
+def test_filtered_outputs_get_their_own_branch() -> None:
+    options: ConversionOptions = ConversionOptions("in.mp4", "/tmp/out.mp4")
+    options.fps = "24"
+    _, passes, _, _, _ = compile_conversion(options, [gif_preset])
+    arguments: list[str] = passes[0]
+    graph: str = arguments[arguments.index("-filter_complex") + 1]
+    assert graph.startswith("[0:v:0]split=2[vsplit0][vsplit1];[vsplit0]fps=24[v0];[vsplit1]")
+    # Labels inside the GIF palette chain are suffixed per output
+    assert "[gif_palette_o1]" in graph
+    assert output_options(arguments, graph, "/tmp/out.mp4") == ["-map", "[v0]", "-map", "0:a:0?"]
+    assert output_options(arguments, "/tmp/out.mp4", "/tmp/out.gif") == ["-map", "[v1]"]
+
+
+def test_identical_encodes_share_one_tee_output() -> None:
+    main: ConversionOptions = ConversionOptions("in.mp4", "/tmp/a.mp3")
+    main.preset = mp3_preset
+    copy: ConversionOptions = ConversionOptions("in.mp4", "/tmp/b|c.mp3")
+    copy.preset = mp3_preset
+    compiler: MultiOutputCompiler = MultiOutputCompiler([main, copy])
+    _, arguments = compiler.compile()
+    assert arguments[-3:] == ["-f", "tee", "/tmp/a.mp3|/tmp/b\\|c.mp3"]
+    assert output_options(arguments, "-n", "-f") == ["-map", "0:a:0?", "-b:a", "192k", "-c:a", "mp3", "-flags", "+global_header"]
+    assert "-filter_complex" not in arguments
+    assert any("share one encode" in note for note in compiler.getNotes())
+
+
+def test_invalid_targets_raise_value_error() -> None:
+    with pytest.raises(ValueError):
+        MultiOutputCompiler([])
+    with pytest.raises(ValueError):
+        MultiOutputCompiler([ConversionOptions("a.mp4", "out.mp4"), ConversionOptions("b.mp4", "out.mp3")])
@@ -0,0 +1,24 @@
+from SimplyFFmpegApplication.ParallelEncode import ParallelEncodeResult
+
+
+def finished_result() -> ParallelEncodeResult:
+    result: ParallelEncodeResult = ParallelEncodeResult()
+    result.success = True
+    result.wall_time = 10.0
+    result.segment_times = [8.0, 8.0, 8.0, 8.0]
+    result.audio_time = 2.0
+    return result
+
+
+def test_no_speedup_without_a_reference_run() -> None:
+    result: ParallelEncodeResult = finished_result()
+    assert result.getSpeedup() is None
+    assert "Speedup" not in str(result)
+    assert "Summed encode time 34.0s" in str(result)
+
+
+def test_speedup_against_the_reference_run() -> None:
+    result: ParallelEncodeResult = finished_result()
+    result.baseline_time = 25.0
+    assert result.getSpeedup() == 2.5
+    assert "Speedup: 2.50x against a single-process run (25.0s)" in str(result)
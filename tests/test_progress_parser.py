@@ -0,0 +1,52 @@
+from SimplyFFmpegApplication.ProgressParser import FFmpegProgress, FFmpegProgressParser
+
+
+progress_block: bytes = (
+    b"frame=240\nfps=48.00\nbitrate=1500.5kbits/s\ntotal_size=1048576\n"
+    b"out_time_us=10000000\nout_time_ms=10000000\nout_time=00:00:10.000000\n"
+    b"speed=2.00x\nprogress=continue\n"
+)
+
+
+def test_blocks_split_across_chunks() -> None:
+    parser: FFmpegProgressParser = FFmpegProgressParser()
+    parser.setInputDuration(40.0)
+    assert parser.feed(progress_block[:50]) == []
+    events: list[FFmpegProgress] = parser.feed(progress_block[50:])
+    assert len(events) == 1
+    progress: FFmpegProgress = events[0]
+    assert (progress.frame, progress.fps, progress.total_size) == (240, 48.0, 1048576)
+    assert (progress.out_time, progress.bitrate, progress.speed) == (10.0, 1500.5, 2.0)
+    assert parser.getFraction() == 0.25
+    # 30 s of media left at 2x
+    assert progress.getETA(parser.duration) == 15.0
+    assert parser.getSummary() == "ETA 00:00:15, 2.00x, 48 fps, 1500 kbit/s"
+
+
+def test_unknown_values_and_end_of_stream() -> None:
+    parser: FFmpegProgressParser = FFmpegProgressParser()
+    parser.setInputDuration(40.0)
+    events: list[FFmpegProgress] = parser.feed(b"out_time_us=N/A\nout_time=00:00:12.5\nbitrate=N/A\nspeed=N/A\nprogress=end\n")
+    assert events[0].out_time == 12.5
+    assert events[0].bitrate is None and events[0].speed is None
+    assert events[0].is_end and parser.getFraction() == 1.0
+
+
+def test_trim_and_stderr_duration() -> None:
+    parser: FFmpegProgressParser = FFmpegProgressParser()
+    # A hybrid seek adds up its input and output -ss
+    parser.configureFromArguments(["-ss", "25.000", "-i", "in.mp4", "-ss", "5", "-t", "60", "out.mp4"])
+    assert parser.duration == 60.0
+    parser.feedStderr(b"Input #0, mov,mp4 from 'in.mp4':\n  Duration: 00:01")
+    parser.feedStderr(b":10.00, start: 0.000000\n")
+    # 70 s input, 30 s skipped, so 40 s of output
+    assert parser.duration == 40.0
+
+
+def test_passes_share_the_fraction() -> None:
+    parser: FFmpegProgressParser = FFmpegProgressParser()
+    parser.setInputDuration(40.0)
+    parser.startPass(1, 2)
+    parser.feed(progress_block)
+    assert parser.getFraction() == 0.625
+    assert parser.getSummary().startswith("pass 2/2, ETA")
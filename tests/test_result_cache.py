@@ -0,0 +1,50 @@
+from SimplyFFmpegApplication.ResultCache import ConversionResultCache, normalize_arguments, sampled_file_hash
+
+
+import os
+
+
+def test_run_only_options_and_paths_are_dropped() -> None:
+    arguments: list[str] = [
+        "-progress", "pipe:1", "-nostats", "-filter_threads", "2", "-i", "/videos/in.mov", "-y",
+        "-threads", "4", "-c:v", "libx264", "-crf", "20", "-passlogfile", "/tmp/log", "/videos/OUT.MP4",
+    ]
+    assert normalize_arguments(arguments) == ["-i", "-c:v", "libx264", "-crf", "20", ".mp4"]
+    # Where the files live and how FFmpeg is run don't change the result
+    assert normalize_arguments(["-i", "other.mov", "-n", "-c:v", "libx264", "-crf", "20", "out.mp4"]) == normalize_arguments(arguments)
+    assert normalize_arguments(["-i", "in.mov", "-c:v", "libx264", "-crf", "21", "out.mp4"]) != normalize_arguments(arguments)
+    # The extension picks the muxer
+    assert normalize_arguments(["-i", "in.mov", "-c:v", "libx264", "-crf", "20", "out.mkv"]) != normalize_arguments(arguments)
+
+
+def test_commands_that_cannot_be_cached() -> None:
+    assert normalize_arguments(["-i", "a.mov", "-i", "b.wav", "out.mp4"]) is None
+    assert normalize_arguments(["-i", "in.mov", "-f", "mpegts", "pipe:1"]) is None
+    assert normalize_arguments(["-i", "in.mov", "-f", "null", "-"]) is None
+
+
+def test_sampled_hash_reads_the_last_chunk(tmp_path) -> None:
+    file_path: str = os.path.join(tmp_path, "in.bin")
+    with open(file_path, "wb") as file:
+        file.write(bytes(1000))
+    before: str | None = sampled_file_hash(file_path, sample_count=4, sample_size=10)
+    with open(file_path, "r+b") as file:
+        file.seek(999)
+        file.write(b"\x01")
+    assert before is not None and sampled_file_hash(file_path, sample_count=4, sample_size=10) != before
+    assert sampled_file_hash(os.path.join(tmp_path, "missing.bin")) is None
+
+
+def test_keys_follow_the_input_and_the_arguments(tmp_path) -> None:
+    cache: ConversionResultCache = ConversionResultCache(directory=os.path.join(tmp_path, "results"))
+    input_file: str = os.path.join(tmp_path, "in.mov")
+    with open(input_file, "wb") as file:
+        file.write(b"frames")
+    key: str | None = cache.getKey(input_file, ["-i", input_file, "-y", "-crf", "20", "a.mp4"])
+    assert key is not None
+    assert cache.getKey(input_file, ["-i", input_file, "-n", "-crf", "20", os.path.join(tmp_path, "b.mp4")]) == key
+    assert cache.getKey(input_file, ["-i", input_file, "-crf", "23", "a.mp4"]) != key
+
+    with open(input_file, "ab") as file:
+        file.write(b" edited")
+    assert cache.getKey(input_file, ["-i", input_file, "-y", "-crf", "20", "a.mp4"]) != key
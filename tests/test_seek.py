@@ -0,0 +1,56 @@
+from SimplyFFmpegApplication import CommandModel
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, States
+from SimplyFFmpegApplication.MediaProbe import MediaInfo
+
+
+def seek_states(seek: str, keyframe: float | None, duration: str = "", copy_video: bool = False) -> States:
+    states: States = States()
+    states.setIO("in.mp4", "out.mp4")
+    states.setSeek(seek)
+    states.setSeekKeyframe(keyframe)
+    if duration:
+        states.setDuration(duration)
+    if copy_video:
+        states.setCopyVideo()
+    return states
+
+
+def as_lists(seeks: tuple) -> list[list[str] | None]:
+    return [argument.toList() if argument else None for argument in seeks]
+
+
+def test_input_seek_to_the_keyframe_then_exact_output_seek() -> None:
+    states: States = seek_states("00:00:30", 28.5, duration="10")
+    assert as_lists(states.resolveSeek()) == [["-ss", "28.500"], ["-ss", "1.500"], ["-t", "10"]]
+    _, arguments = states.compileState()
+    assert arguments == ["-ss", "28.500", "-i", "in.mp4", "-n", "-ss", "1.500", "-t", "10", "out.mp4"]
+
+
+def test_seek_onto_a_keyframe_needs_no_output_seek() -> None:
+    assert as_lists(seek_states("30", 30.0).resolveSeek()) == [["-ss", "30.000"], None, None]
+
+
+def test_unknown_or_useless_keyframe_falls_back_to_an_output_seek() -> None:
+    for keyframe in (None, 0.0, 31.0):
+        assert as_lists(seek_states("30", keyframe).resolveSeek()) == [None, ["-ss", "30"], None], keyframe
+
+
+def test_stream_copy_starts_early_and_keeps_the_span() -> None:
+    states: States = seek_states("30", 28.0, duration="10", copy_video=True)
+    assert as_lists(states.resolveSeek()) == [["-ss", "28.000"], None, ["-t", "12.000"]]
+    assert states.getNotes() == ["Stream copy starts at the keyframe at 28.000s, 2.000s before the requested seek."]
+
+
+def test_options_look_up_the_keyframe_of_probed_video(monkeypatch) -> None:
+    class StubProber:
+        def findKeyframeBefore(self, file_path: str, seconds: float) -> float | None:
+            return seconds - 0.75
+    monkeypatch.setattr(CommandModel, "get_media_prober", StubProber)
+
+    options: ConversionOptions = ConversionOptions("in.mp4", "out.mp4")
+    options.seek = "10"
+    options.input_info = MediaInfo({"streams": [{"codec_type": "video", "codec_name": "h264"}]})
+    assert options.buildStates().compileState()[1][:2] == ["-ss", "9.250"]
+    # Without a probe there is nothing to look the keyframe up in
+    options.input_info = None
+    assert options.buildStates().compileState()[1][:2] == ["-i", "in.mp4"]
@@ -0,0 +1,69 @@
+from SimplyFFmpegApplication.CommandModel import ConversionOptions, Defaults, States
+from SimplyFFmpegApplication.MediaProbe import MediaInfo
+
+
+twitter_preset = Defaults.presets_list[1]
+mp3_preset = Defaults.presets_list[2]
+
+
+def probed(video_bitrate: str = "2000000", frame_rate: str = "60/1", audio_codec: str = "aac") -> MediaInfo:
+    return MediaInfo({
+        "format": {"duration": "60.0", "bit_rate": "2200000"},
+        "streams": [
+            {"codec_type": "video", "codec_name": "h264", "bit_rate": video_bitrate, "avg_frame_rate": frame_rate},
+            {"codec_type": "audio", "codec_name": audio_codec, "bit_rate": "192000"},
+        ],
+    })
+
+
+def build(output_file: str, info: MediaInfo | None, **values: object) -> States:
+    options: ConversionOptions = ConversionOptions("in.mp4", output_file)
+    options.input_info = info
+    # A keyframe lookup would run ffprobe
+    options.keyframe_seek = False
+    for name, value in values.items():
+        setattr(options, name, value)
+    return options.buildStates()
+
+
+def test_matching_preset_stream_is_copied() -> None:
+    states: States = build("out.mp4", probed(), preset=twitter_preset)
+    assert states.resolveStreamCopy() == (True, False)
+    _, arguments = states.compileState()
+    # The preset's bitrate and fps filter are skipped along with the encode
+    assert arguments == ["-i", "in.mp4", "-n", "-c:a", "copy", "-c:v", "copy", "out.mp4"]
+
+
+def test_mismatches_are_re_encoded_with_a_reason() -> None:
+    states: States = build("out.mp4", probed(video_bitrate="4000000"), preset=twitter_preset)
+    assert states.resolveStreamCopy() == (False, False)
+    assert states.getNotes() == ["Video is re-encoded: bitrate 4000k exceeds 2500k."]
+
+    states = build("out.mp4", probed(frame_rate="30000/1001"), preset=twitter_preset)
+    assert states.resolveStreamCopy() == (False, False)
+    assert states.getNotes() == ["Video is re-encoded: frame rate 30 is not 60."]
+
+    states = build("out.mp3", probed(audio_codec="aac"), preset=mp3_preset)
+    assert states.resolveStreamCopy() == (False, False)
+    assert states.getNotes() == ["Audio is re-encoded: codec aac is not mp3."]
+
+
+def test_audio_only_preset_copies_matching_audio() -> None:
+    states: States = build("out.mp3", probed(audio_codec="mp3"), preset=mp3_preset)
+    assert states.resolveStreamCopy() == (False, True)
+    assert "-b:a" not in states.compileState()[1]
+
+
+def test_requested_bitrate_without_a_preset() -> None:
+    assert build("out.mp4", probed(), video_bitrate="3000k").resolveStreamCopy() == (True, False)
+    # Filters and a seek change the frames, so the stream can't be copied
+    assert build("out.mp4", probed(), video_bitrate="3000k", fps="30").resolveStreamCopy() == (False, False)
+    assert build("out.mp4", probed(), video_bitrate="3000k", seek="5").resolveStreamCopy() == (False, False)
+    # CRF is a quality target, not comparable with the source
+    assert build("out.mp4", probed(), video_crf="20").resolveStreamCopy() == (False, False)
+
+
+def test_unprobed_input_is_always_encoded() -> None:
+    states: States = build("out.mp4", None, preset=twitter_preset)
+    assert states.resolveStreamCopy() == (False, False)
+    assert states.compileState()[1] == ["-i", "in.mp4", "-n", "-b:v", "2500k", "-filter:v", "fps=60", "-c:a", "copy", "out.mp4"]
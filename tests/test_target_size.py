@@ -0,0 +1,69 @@
+from SimplyFFmpegApplication.CommandModel import ConversionOptions
+from SimplyFFmpegApplication.CommonHelpers import parse_bitrate, parse_size
+from SimplyFFmpegApplication.MediaProbe import MediaInfo
+
+
+import pytest
+
+
+def probed(duration: str = "60.0", audio: bool = True) -> MediaInfo:
+    streams: list[dict] = [{"codec_type": "video", "codec_name": "h264"}]
+    if audio:
+        streams.append({"codec_type": "audio", "codec_name": "aac", "bit_rate": "192000"})
+    return MediaInfo({"format": {"duration": duration}, "streams": streams})
+
+
+def sized(target_size: str, info: MediaInfo | None = None, **values: object) -> ConversionOptions:
+    options: ConversionOptions = ConversionOptions("in.mp4", "out.mp4")
+    options.target_size = target_size
+    options.input_info = info if info is not None else probed()
+    for name, value in values.items():
+        setattr(options, name, value)
+    return options
+
+
+def test_parse_bitrate_and_size() -> None:
+    assert parse_bitrate("2500k") == 2_500_000
+    assert parse_bitrate("1.5M") == 1_500_000
+    assert parse_bitrate("800") == 800
+    assert parse_bitrate("fast") is None
+    assert parse_size("8M") == parse_size("8MB") == 8_000_000
+    assert parse_size("8MiB") == 8 * 1024 * 1024
+    assert parse_size("500k") == 500_000
+    assert parse_size("1.5GiB") == int(1.5 * 1024 ** 3)
+    assert parse_size("big") is None
+
+
+def test_video_gets_what_the_audio_leaves() -> None:
+    # 8 MB over 60 s, 2 % kept for the container: 1045333 bit/s in total
+    assert sized("8M").getTargetVideoBitrate() == 1_045_333 - 128_000
+    assert sized("8M", audio_bitrate="96k").getTargetVideoBitrate() == 1_045_333 - 96_000
+    # Copied audio keeps the bitrate of the source
+    assert sized("8M", copy_audio=True).getTargetVideoBitrate() == 1_045_333 - 192_000
+    assert sized("8M", probed(audio=False)).getTargetVideoBitrate() == 1_045_333
+
+
+def test_seek_and_duration_shorten_the_span() -> None:
+    assert sized("8M", seek="30").getTargetVideoBitrate() == 2_090_666 - 128_000
+    assert sized("8M", seek="30", duration="15").getTargetVideoBitrate() == 4_181_333 - 128_000
+
+
+def test_unusable_targets_raise_value_error() -> None:
+    with pytest.raises(ValueError, match="Invalid target size"):
+        sized("eight").getTargetVideoBitrate()
+    with pytest.raises(ValueError, match="could not be probed"):
+        sized("8M", MediaInfo({"streams": [{"codec_type": "video"}]})).getTargetVideoBitrate()
+    with pytest.raises(ValueError, match="leaves 0k for the video"):
+        sized("500k", probed(duration="600")).getTargetVideoBitrate()
+
+
+def test_target_size_compiles_two_passes() -> None:
+    options: ConversionOptions = sized("8M")
+    states = options.buildStates()
+    _, passes = states.compilePasses()
+    first_pass, final_pass = passes
+    log_prefix: str = options.getPassLogPrefix()
+    # The analysis pass drops the audio and writes nothing
+    assert first_pass[-10:] == ["-an", "-c:v", "libx264", "-passlogfile", log_prefix, "-pass", "1", "-f", "null", "-"]
+    assert final_pass[-7:] == ["-c:v", "libx264", "-passlogfile", log_prefix, "-pass", "2", "out.mp4"]
+    assert final_pass[final_pass.index("-b:v") + 1] == "917k"
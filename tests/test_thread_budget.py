@@ -0,0 +1,19 @@
+from SimplyFFmpegApplication.ThreadBudget import apply_thread_budget
+
+
+def test_every_output_gets_the_budget() -> None:
+    arguments: list[str] = [
+        "-progress", "pipe:1", "-nostats", "-i", "in.mov", "-n",
+        "-map", "0:v:0?", "-crf", "20", "out.mp4",
+        "-map", "0:a:0?", "-b:a", "192k", "out.mp3",
+    ]
+    budgeted: list[str] = apply_thread_budget(arguments, 2)
+    assert budgeted[:4] == ["-filter_threads", "2", "-filter_complex_threads", "2"]
+    assert budgeted[budgeted.index("out.mp4") - 2:budgeted.index("out.mp4")] == ["-threads", "2"]
+    assert budgeted[budgeted.index("out.mp3") - 2:budgeted.index("out.mp3")] == ["-threads", "2"]
+    assert budgeted.count("-threads") == 2
+
+
+def test_null_output_and_existing_threads() -> None:
+    assert apply_thread_budget(["-i", "in.mov", "-f", "null", "-"], 3)[-3:] == ["-threads", "3", "-"]
+    assert apply_thread_budget(["-i", "in.mov", "-threads", "8", "out.mp4"], 3) == ["-i", "in.mov", "-threads", "8", "out.mp4"]
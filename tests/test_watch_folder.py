@@ -0,0 +1,84 @@
+from SimplyFFmpegApplication import WatchFolder as watch_folder_module
+from SimplyFFmpegApplication.WatchFolder import WatchFolder, forced_listing_polls
+
+
+import os
+import time
+
+
+class FakeClock:
+    # Monotonic time moves only when told to, wall time is real for the mtime checks
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return time.time()
+
+
+def make_watch_folder(directory: str, monkeypatch, **kwargs) -> tuple[WatchFolder, FakeClock]:
+    clock: FakeClock = FakeClock()
+    monkeypatch.setattr(watch_folder_module, "time", clock)
+    watch_folder: WatchFolder = WatchFolder(directory, lambda input_file, output_file: None, "mp4", settle_time=2.0, report=lambda message: None, **kwargs)
+    return watch_folder, clock
+
+
+def write(path: str, data: bytes) -> None:
+    with open(path, "ab") as file:
+        file.write(data)
+
+
+def test_file_settles_once_unchanged_for_the_settle_time(tmp_path, monkeypatch) -> None:
+    watch_folder, clock = make_watch_folder(str(tmp_path), monkeypatch)
+    clip: str = os.path.join(tmp_path, "clip.mov")
+    write(clip, b"frames")
+    assert watch_folder.pollOnce() == []
+    clock.now += 1.9
+    assert watch_folder.pollOnce() == []
+    clock.now += 0.1
+    assert watch_folder.pollOnce() == [clip]
+
+
+def test_growing_file_restarts_the_settle_time(tmp_path, monkeypatch) -> None:
+    watch_folder, clock = make_watch_folder(str(tmp_path), monkeypatch)
+    clip: str = os.path.join(tmp_path, "clip.mov")
+    write(clip, b"frames")
+    watch_folder.pollOnce()
+    clock.now += 1.5
+    write(clip, b" and more frames")
+    assert watch_folder.pollOnce() == []
+    clock.now += 1.5
+    assert watch_folder.pollOnce() == []
+    clock.now += 0.5
+    assert watch_folder.pollOnce() == [clip]
+
+
+def test_partial_hidden_empty_and_other_files_are_skipped(tmp_path, monkeypatch) -> None:
+    watch_folder, clock = make_watch_folder(str(tmp_path), monkeypatch, extensions=("mov",))
+    for name in ("clip.mov.part", ".clip.mov", "notes.txt"):
+        write(os.path.join(tmp_path, name), b"data")
+    write(os.path.join(tmp_path, "empty.mov"), b"")
+    watch_folder.pollOnce()
+    clock.now += 10.0
+    assert watch_folder.pollOnce() == []
+
+
+def test_arrival_hidden_by_a_coarse_directory_mtime(tmp_path, monkeypatch) -> None:
+    watch_folder, clock = make_watch_folder(str(tmp_path), monkeypatch)
+    # An old, unchanging directory mtime, as some network shares report
+    old_mtime: float = time.time() - 60.0
+    os.utime(tmp_path, (old_mtime, old_mtime))
+    assert watch_folder.pollOnce() == []
+
+    clip: str = os.path.join(tmp_path, "clip.mov")
+    write(clip, b"frames")
+    os.utime(tmp_path, (old_mtime, old_mtime))
+    for _ in range(forced_listing_polls - 1):
+        clock.now += 5.0
+        assert watch_folder.pollOnce() == []
+    # The forced listing finds it, then it still has to settle
+    assert watch_folder.pollOnce() == []
+    clock.now += 2.0
+    assert watch_folder.pollOnce() == [clip]